@@ -0,0 +1,110 @@
+import hashlib
+import io
+import os
+import tarfile
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils.common.text.converters import to_bytes
+from ansible.plugins.action import ActionBase
+from ansible.plugins.loader import lookup_loader
+
+ARGUMENT_SPEC = dict(
+    base_dir=dict(type='str', required=True),
+    users=dict(type='list', elements='dict', required=True),
+    directories=dict(type='list', elements='str', default=[]),
+    files=dict(type='list', elements='dict', default=[])
+)
+
+
+class ActionModule(ActionBase):
+    # Renders the files of every user on the controller and applies them with
+    # a single transfer and module invocation, instead of a file/template task
+    # (and round trip) per file and user.
+
+    TRANSFERS_FILES = True
+
+    def is_selected(self, user: Dict[str, Any], spec: Dict[str, Any], omit: Optional[str]) -> bool:
+        # Only for the users with one of the attributes set (if any)
+        attributes = spec.get('users_with') or []
+        if 'src_attribute' in spec:
+            attributes = attributes + [spec['src_attribute']]
+        return not attributes or any(user.get(x) not in (None, '', [], omit) for x in attributes)
+
+    def render(self, user: Dict[str, Any], spec: Dict[str, Any], task_vars: Dict[str, Any]) -> bytes:
+        if 'template' in spec:
+            # With the same variables as a template task in the user loop
+            template_path = self._find_needle('templates', spec['template'])
+            lookup = lookup_loader.get('ansible.builtin.template', loader=self._loader, templar=self._templar)
+            return to_bytes(lookup.run([template_path], variables=dict(task_vars, user=user))[0])
+
+        with open(self._find_needle('files', user[spec['src_attribute']]), 'rb') as f:
+            return f.read()
+
+    def write_archive(self, contents: Dict[str, bytes]) -> str:
+        fd, archive_path = tempfile.mkstemp(prefix='intellij-user-files-', suffix='.tar.gz')
+        with os.fdopen(fd, 'wb') as f, tarfile.open(fileobj=f, mode='w:gz') as archive:
+            for digest, content in contents.items():
+                info = tarfile.TarInfo(digest)
+                info.size = len(content)
+                info.mode = 0o600
+                archive.addfile(info, io.BytesIO(content))
+        return archive_path
+
+    def run(self, tmp: Optional[str] = None, task_vars: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        task_vars = task_vars or {}
+        result = super().run(tmp, task_vars)
+        del tmp
+
+        _, args = self.validate_argument_spec(argument_spec=ARGUMENT_SPEC)
+        omit = task_vars.get('omit')
+        for spec in args['files']:
+            if 'dest' not in spec or ('template' in spec) == ('src_attribute' in spec):
+                raise AnsibleActionFail(f'Each file needs a dest and either a template or a src_attribute: {spec}')
+
+        start = time.perf_counter()
+        # Identical renders (e.g. users with the same settings) are only
+        # shipped once
+        contents: Dict[str, bytes] = {}
+        directories: List[Dict[str, Any]] = []
+        files: List[Dict[str, Any]] = []
+        for user in args['users']:
+            owner = dict(username=user['username'], group=user.get('intellij_group') or user['username'])
+            for directory in args['directories']:
+                directories.append(dict(owner, path=directory, mode='0775'))
+            for spec in args['files']:
+                if not self.is_selected(user, spec, omit):
+                    continue
+                content = self.render(user, spec, task_vars)
+                digest = hashlib.sha256(content).hexdigest()
+                contents[digest] = content
+                files.append(dict(owner, path=spec['dest'], content=digest, force=spec.get('force', True), mode=spec.get('mode', '0664')))
+        render_seconds = time.perf_counter() - start
+
+        local_archive = self.write_archive(contents)
+        try:
+            remote_archive = self._connection._shell.join_path(self._connection._shell.tmpdir, 'user-files.tar.gz')
+            self._transfer_file(local_archive, remote_archive)
+            self._fixup_perms2((self._connection._shell.tmpdir, remote_archive))
+
+            module_args = dict(
+                base_dir=args['base_dir'],
+                archive=remote_archive,
+                directories=directories,
+                files=files
+            )
+            result.update(self._execute_module(module_name='intellij_user_files', module_args=module_args, task_vars=task_vars))
+            if not self._play_context.diff:
+                result.pop('diff', None)
+        finally:
+            os.remove(local_archive)
+            self._remove_tmp_path(self._connection._shell.tmpdir)
+
+        result.setdefault('timings', {})['render'] = round(render_seconds, 6)
+        # Rendered on the controller, before the module's phases
+        result['timings_total'] = round(result.get('timings_total', 0.0) + render_seconds, 6)
+        if len(files) > len(contents):
+            result.setdefault('counters', {})['user_files_deduplicated'] = len(files) - len(contents)
+        return result
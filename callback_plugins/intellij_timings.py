@@ -0,0 +1,100 @@
+from collections import defaultdict
+from typing import Any, Dict
+
+from ansible.plugins.callback import CallbackBase
+
+DOCUMENTATION = '''
+---
+name: intellij_timings
+
+type: aggregate
+
+short_description: Summarizes the timings reported by the IntelliJ modules.
+
+description:
+    - >
+        Aggregates the C(timings) and C(counters) returned by the
+        intellij_* modules, per phase and per host, and displays a summary
+        at the end of the playbook.
+    - This callback has to be enabled, e.g. with C(callbacks_enabled).
+
+requirements:
+    - enable in configuration
+
+options:
+    top_hosts:
+        description:
+            - The number of hosts to list, slowest first.
+        default: 10
+        type: int
+        env:
+            - name: INTELLIJ_TIMINGS_TOP_HOSTS
+        ini:
+            - section: callback_intellij_timings
+              key: top_hosts
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'intellij_timings'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self) -> None:
+        super().__init__()
+        # phase -> host -> seconds
+        self.phases: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        # counter -> total
+        self.counters: Dict[str, int] = defaultdict(int)
+        # host -> seconds in any phase
+        self.hosts: Dict[str, float] = defaultdict(float)
+        # host -> module invocations
+        self.invocations: Dict[str, int] = defaultdict(int)
+
+    def record(self, host: str, result: Dict[str, Any]) -> None:
+        # Loops return the module results in a list
+        for item in result.get('results', [result]):
+            # Only the results of the intellij modules (see timing.results)
+            if not isinstance(item, dict) or not isinstance(item.get('timings'), dict) or 'timings_total' not in item:
+                continue
+
+            self.invocations[host] += 1
+            for phase, seconds in item['timings'].items():
+                self.phases[phase][host] += seconds
+            # Nested phases are already included in their parent's time
+            self.hosts[host] += item['timings_total']
+            for name, value in item.get('counters', {}).items():
+                self.counters[name] += value
+
+    def v2_runner_on_ok(self, result: Any) -> None:
+        self.record(result._host.get_name(), result._result)
+
+    def v2_runner_on_failed(self, result: Any, ignore_errors: bool = False) -> None:
+        self.record(result._host.get_name(), result._result)
+
+    def v2_playbook_on_stats(self, stats: Any) -> None:
+        if not self.invocations:
+            return
+
+        self._display.banner('INTELLIJ TIMINGS')
+
+        self._display.display(f'{"phase":<32}{"total (s)":>12}{"max host (s)":>14}  slowest host')
+        for phase, hosts in sorted(self.phases.items(), key=lambda x: -sum(x[1].values())):
+            slowest_host, slowest = max(hosts.items(), key=lambda x: x[1])
+            self._display.display(f'{phase:<32}{sum(hosts.values()):>12.3f}{slowest:>14.3f}  {slowest_host}')
+
+        self._display.display('')
+        self._display.display(f'{"host":<32}{"total (s)":>12}{"modules":>14}')
+        top_hosts = sorted(self.hosts.items(), key=lambda x: -x[1])[:self.get_option('top_hosts')]
+        for host, seconds in top_hosts:
+            self._display.display(f'{host:<32}{seconds:>12.3f}{self.invocations[host]:>14}')
+
+        if self.counters:
+            self._display.display('')
+            self._display.display(f'{"counter":<32}{"total":>12}')
+            for name, value in sorted(self.counters.items()):
+                self._display.display(f'{name:<32}{value:>12}')
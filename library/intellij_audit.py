@@ -0,0 +1,125 @@
+from pathlib import Path
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.audit import audit
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+
+DOCUMENTATION = '''
+---
+module: intellij_audit
+
+short_description: >
+    Reports how the IntelliJ configuration of each user differs from the
+    desired state.
+
+description:
+    - >
+        Reads each user's IntelliJ config and plugins directories once and
+        compares them with the desired state given in the same format as the
+        role's C(users) variable, without changing anything.
+    - >
+        Reports missing and incompatible plugins, plugins that aren't
+        disabled, missing JDKs and JDKs with a different or missing home, and
+        differences in the default JDK, Maven home, inspection profile and
+        code style. Config files that can't be read are reported as errors
+        of the user.
+
+options:
+    intellij_home:
+        description:
+            - This is the path where IntelliJ has been installed.
+        required: true
+    intellij_user_config_dir:
+        description:
+            - >
+                This is the dir where the user's IntelliJ configuration is
+                located (relative to the user's home).
+        required: true
+    intellij_user_plugins_dir:
+        description:
+            - >
+                This is the dir where the user's IntelliJ plugins are located
+                (relative to the user's home).
+        required: true
+    users:
+        description:
+            - The users and their desired configuration (as for the role).
+        required: true
+    default_maven_home:
+        description:
+            - The desired default Maven installation.
+        required: false
+    plugin_index_path:
+        description:
+            - >
+                The plugin index to reuse cached plugin descriptors from (see
+                intellij_install_plugin), it isn't updated.
+        required: false
+    shared_plugins_dir:
+        description:
+            - >
+                The plugins directory shared by all users (when plugins are
+                installed for all users).
+        required: false
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Audit IntelliJ configuration
+  become: yes
+  intellij_audit:
+    intellij_home: '/opt/idea/idea-ultimate-2018.1.1'
+    intellij_user_config_dir: '.IntelliJIdea2018.1/config'
+    intellij_user_plugins_dir: '.IntelliJIdea2018.1/config/plugins'
+    users:
+      - username: bob
+        intellij_plugins:
+          - CheckStyle-IDEA
+  register: audit
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        intellij_home=dict(type='path', required=True),
+        intellij_user_config_dir=dict(type='str', required=True),
+        intellij_user_plugins_dir=dict(type='str', required=True),
+        users=dict(type='list', elements='dict', required=True),
+        default_maven_home=dict(type='str', required=False),
+        plugin_index_path=dict(type='path', required=False),
+        shared_plugins_dir=dict(type='path', required=False)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        report = audit(
+            Path(module.params['intellij_home']),
+            module.params['intellij_user_config_dir'],
+            module.params['intellij_user_plugins_dir'],
+            [x for x in module.params['users'] if x.get('username')],
+            module.params['default_maven_home'] or None,
+            Path(module.params['plugin_index_path']) if module.params['plugin_index_path'] else None,
+            Path(module.params['shared_plugins_dir']) if module.params['shared_plugins_dir'] else None)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    if report['drifted']:
+        msg = f'IntelliJ configuration has drifted for {len(report["users"])} user(s)'
+    else:
+        msg = 'IntelliJ configuration matches the desired state'
+
+    module.exit_json(changed=False, msg=msg, report=report, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_audit', run_module)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.cds import generate_cds_archive
+from ansible.module_utils.intellij.common import IntellijError, resolve_owner
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+
+DOCUMENTATION = '''
+---
+module: intellij_cds_archive
+
+short_description: >
+    Generates a class data sharing archive for the IntelliJ installation.
+
+description:
+    - >
+        Generates an AppCDS archive with the bundled Java runtime of the
+        IntelliJ installation, from a class list recorded with
+        -XX:DumpLoadedClassList, to speed up the start of the IDE.
+    - >
+        The archive is stored in the cds directory of the installation and
+        named after the build number, so it's regenerated when the build
+        changes (or the class list is updated).
+
+options:
+    intellij_home:
+        description:
+            - The root directory of the IntelliJ installation.
+        required: true
+    class_list:
+        description:
+            - The path of the class list.
+        required: true
+    owner:
+        description:
+            - The user who owns the IntelliJ installation.
+        required: true
+    group:
+        description:
+            - The group for the files and directories created.
+        required: true
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Generate CDS archive
+  become: yes
+  intellij_cds_archive:
+    intellij_home: '/opt/idea/idea-community-2024.3'
+    class_list: '/opt/idea/idea.classlist'
+    owner: root
+    group: root
+  register: cds_archive
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        intellij_home=dict(type='path', required=True),
+        class_list=dict(type='path', required=True),
+        owner=dict(type='str', required=True),
+        group=dict(type='str', required=True)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        uid, gid, _ = resolve_owner(module.params['owner'], module.params['group'])
+
+        changed, archive_path = generate_cds_archive(
+            Path(module.params['intellij_home']),
+            Path(module.params['class_list']),
+            uid,
+            gid,
+            lambda args: module.run_command(args),
+            module.check_mode)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    if changed:
+        msg = f'CDS archive {archive_path} has been generated'
+    else:
+        msg = f'CDS archive {archive_path} is up to date'
+
+    module.exit_json(changed=changed, msg=msg, archive_path=str(archive_path), **results())
+
+
+def main() -> None:
+    run_profiled('intellij_cds_archive', run_module)
+
+
+if __name__ == '__main__':
+    main()
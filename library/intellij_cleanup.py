@@ -0,0 +1,132 @@
+from pathlib import Path
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.cleanup import remove_stale_versions
+from ansible.module_utils.intellij.common import IntellijError, user_path
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+
+DOCUMENTATION = '''
+---
+module: intellij_cleanup
+
+short_description: Removes the files of old IntelliJ versions.
+
+description:
+    - >
+        Keeps the given number of the newest versions of the IntelliJ
+        installation and of the given version specific user directories (e.g.
+        caches and plugins) and removes the rest. The version is taken from
+        the directory name (e.g. idea-community-2024.3.1 or IdeaIC2024.3),
+        newer versions than the current version are always kept.
+    - In check mode the directories that would be removed are reported.
+
+options:
+    intellij_home:
+        description:
+            - The root directory of the current IntelliJ installation.
+        required: true
+    intellij_user_dirs:
+        description:
+            - >
+                The version specific directories of the current IntelliJ
+                version, relative to the home directory of each user or
+                absolute (the macros ${user.name} and ${user.home} are
+                expanded). They don't need to exist.
+            - >
+                The directories of other versions are found by replacing the
+                path component named intellij_user_dir (optionally with a
+                leading dot) with its older siblings e.g.
+                ~/.IdeaIC2019.3/system for ~/.IdeaIC2024.3/system. Directories
+                without the component aren't version specific and are left
+                alone.
+        required: false
+        default: []
+    intellij_user_dir:
+        description:
+            - >
+                The name of the version specific directory of the current
+                IntelliJ version e.g. IdeaIC2024.3.
+        required: false
+    users:
+        description:
+            - The usernames of the users to clean up.
+        required: false
+        default: []
+    keep:
+        description:
+            - The number of versions to keep, including the current version.
+        required: true
+    parallelism:
+        description:
+            - The maximum number of directories to remove concurrently.
+        required: false
+        default: 4
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Remove old IntelliJ versions
+  become: yes
+  intellij_cleanup:
+    intellij_home: '/opt/idea/idea-community-2024.3.1'
+    intellij_user_dirs:
+      - '.cache/JetBrains/IdeaIC2024.3'
+      - '.local/share/JetBrains/IdeaIC2024.3'
+      - '.IdeaIC2024.3/system'
+    intellij_user_dir: IdeaIC2024.3
+    users:
+      - bob
+    keep: 2
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        intellij_home=dict(type='path', required=True),
+        intellij_user_dirs=dict(type='list', elements='str', required=False, default=[]),
+        intellij_user_dir=dict(type='str', required=False),
+        users=dict(type='list', elements='str', required=False, default=[]),
+        keep=dict(type='int', required=True),
+        parallelism=dict(type='int', required=False, default=4)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        if module.params['keep'] < 1:
+            raise IntellijError('keep must be at least 1')
+
+        users_dirs = [
+            [user_path(username, user_dir) for user_dir in module.params['intellij_user_dirs']]
+            for username in module.params['users']
+        ]
+        # Defaults to the last component of the first directory
+        version_dirname = module.params['intellij_user_dir']
+        if not version_dirname and module.params['intellij_user_dirs']:
+            version_dirname = Path(module.params['intellij_user_dirs'][0]).name
+
+        report = remove_stale_versions(
+            Path(module.params['intellij_home']), users_dirs, version_dirname or '', module.params['keep'], module.params['parallelism'],
+            module.check_mode)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    changed = bool(report['removed'])
+    if changed:
+        msg = f'Removed {len(report["removed"])} old version directories ({report["reclaimed_bytes"]} bytes)'
+    else:
+        msg = 'There are no old version directories to remove'
+
+    module.exit_json(changed=changed, msg=msg, **report, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_cleanup', run_module)
+
+
+if __name__ == '__main__':
+    main()
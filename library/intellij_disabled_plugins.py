@@ -0,0 +1,98 @@
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.common import IntellijError, resolve_owner, user_path
+from ansible.module_utils.intellij.plugins import update_disabled_plugins
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+
+DOCUMENTATION = '''
+---
+module: intellij_disabled_plugins
+
+short_description: >
+    Disables and enables plugins for the given IntelliJ user.
+
+description:
+    - >
+        Adds plugins to, or removes plugins from, the user's
+        disabled_plugins.txt. Other plugins the user has disabled are left
+        as they are.
+
+options:
+    intellij_user_config_dir:
+        description:
+            - >
+                This is the dir where the user's IntelliJ configuration is
+                located.
+        required: true
+    disabled:
+        description:
+            - The IDs of the plugins to disable.
+        required: false
+        default: []
+    enabled:
+        description:
+            - The IDs of the plugins to enable (takes precedence over disabled).
+        required: false
+        default: []
+    owner:
+        description:
+            - The user who you're configuring IntelliJ for.
+        required: true
+    group:
+        description:
+            - The group for the files and directories created.
+        required: true
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Disable plugins
+  become: yes
+  intellij_disabled_plugins:
+    intellij_user_config_dir: '.IntelliJIdea2018.1/config'
+    disabled:
+      - org.jetbrains.plugins.gradle
+    enabled:
+      - CheckStyle-IDEA
+    owner: bob
+    group: bob
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        intellij_user_config_dir=dict(type='str', required=True),
+        disabled=dict(type='list', elements='str', required=False, default=[]),
+        enabled=dict(type='list', elements='str', required=False, default=[]),
+        owner=dict(type='str', required=True),
+        group=dict(type='str', required=True)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        uid, gid, username = resolve_owner(module.params['owner'], module.params['group'])
+        intellij_user_config_dir = user_path(username, module.params['intellij_user_config_dir'])
+
+        changed, diff = update_disabled_plugins(
+            intellij_user_config_dir, module.params['disabled'], module.params['enabled'], uid, gid, module.check_mode)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    if changed:
+        msg = 'Disabled plugins have been updated'
+    else:
+        msg = 'Disabled plugins were already up to date'
+
+    module.exit_json(changed=changed, msg=msg, diff=diff, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_disabled_plugins', run_module)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+from pathlib import Path
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+from ansible.module_utils.intellij.tuning import (compute_host_limits, limits_conf_values, read_sysctl, read_sysctl_conf, read_user_nofile,
+                                                  sysctl_conf_values, verify_host_limits)
+
+DOCUMENTATION = '''
+---
+module: intellij_host_tuning
+
+short_description: >
+    Computes the kernel and user limits for hosts running IntelliJ and
+    reports the effective values.
+
+description:
+    - >
+        Computes the inotify, memory map and open file limits needed by the
+        given number of IntelliJ users, with projects of the given size, and
+        compares them with the effective values of the host (the open file
+        limits are read from a new login session for each user).
+    - >
+        Also returns the kernel settings to write to the sysctl drop-in as
+        C(sysctl_conf): the higher of the effective and the needed value of
+        each setting, leaving out the settings that are already high enough
+        (unless the drop-in already sets them).
+    - >
+        Also returns the open file limits to write to the limits drop-in for
+        each user as C(limits_conf): the higher of the effective and the
+        needed soft and hard limits, leaving out the limits that are
+        unlimited.
+    - This module doesn't change anything.
+
+options:
+    memtotal_mb:
+        description:
+            - The total memory of the host in MB.
+        required: true
+    users:
+        description:
+            - The usernames of the users running IntelliJ on the host.
+        required: false
+        default: []
+    project_files:
+        description:
+            - >
+                The expected number of files and directories in the projects
+                each user has open.
+        required: false
+        default: 100000
+    sysctl_conf:
+        description:
+            - The path of the sysctl drop-in managed by the role.
+        required: false
+        default: /etc/sysctl.d/60-intellij.conf
+    verify:
+        description:
+            - Whether to report the effective values.
+        required: false
+        default: true
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Compute host limits
+  intellij_host_tuning:
+    memtotal_mb: '{{ ansible_facts.memtotal_mb }}'
+    users:
+      - bob
+      - alice
+    project_files: 250000
+    verify: no
+  register: host_limits
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        memtotal_mb=dict(type='int', required=True),
+        users=dict(type='list', elements='str', required=False, default=[]),
+        project_files=dict(type='int', required=False, default=100000),
+        sysctl_conf=dict(type='path', required=False, default='/etc/sysctl.d/60-intellij.conf'),
+        verify=dict(type='bool', required=False, default=True)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    limits = compute_host_limits(module.params['memtotal_mb'], len(module.params['users']), module.params['project_files'])
+    limits['sysctl_conf'] = sysctl_conf_values(
+        limits['sysctl'],
+        {key: read_sysctl(key) for key in limits['sysctl']},
+        read_sysctl_conf(Path(module.params['sysctl_conf'])))
+    limits['limits_conf'] = {
+        username: limits_conf_values(limits['limits']['nofile'], read_user_nofile(lambda args: module.run_command(args), username))
+        for username in module.params['users']
+    }
+
+    if not module.params['verify']:
+        module.exit_json(changed=False, msg='Host limits have been computed', **limits, **results())
+
+    report = verify_host_limits(limits, module.params['users'], lambda args: module.run_command(args))
+
+    if report['ok']:
+        msg = 'The effective host limits are sufficient'
+    else:
+        msg = 'Some effective host limits are lower than needed'
+
+    module.exit_json(changed=False, msg=msg, report=report, **limits, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_host_tuning', run_module)
+
+
+if __name__ == '__main__':
+    main()
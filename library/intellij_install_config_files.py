@@ -0,0 +1,115 @@
+from pathlib import Path
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.config_files import install_config_files
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+
+DOCUMENTATION = '''
+---
+module: intellij_install_config_files
+
+short_description: >
+    Installs the code styles and inspection profiles of the IntelliJ users.
+
+description:
+    - >
+        Installs the intellij_codestyles and intellij_inspection_profiles of
+        each user to the codestyles and inspection directories of the user's
+        IntelliJ configuration.
+    - >
+        Each distinct URL is downloaded once (concurrently, up to the given
+        limit) into the download cache, where the files are stored named
+        after their content hash. Files with a src on the Ansible controller
+        (i.e. without remote_src) aren't installed by this module.
+    - >
+        Files that already have the same content aren't written (only
+        their owner and mode are fixed). The files are copied, owned by the
+        user with mode 0664.
+    - >
+        In check mode URLs that aren't in the download cache are downloaded
+        to compare their content, but aren't stored.
+
+options:
+    intellij_user_config_dir:
+        description:
+            - >
+                This is the dir where the user's IntelliJ configuration is
+                located.
+        required: true
+    users:
+        description:
+            - >
+                The users, each with a username, optionally an intellij_group,
+                and lists of intellij_codestyles and
+                intellij_inspection_profiles (each with a name and either a
+                url, or a src and remote_src).
+        required: true
+    download_cache:
+        description:
+            - The directory to cache downloads in.
+        required: true
+    parallelism:
+        description:
+            - The maximum number of files to download concurrently.
+        required: false
+        default: 4
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Install code styles and inspection profiles
+  become: yes
+  intellij_install_config_files:
+    intellij_user_config_dir: '.config/JetBrains/IdeaIC2024.3'
+    users:
+      - username: bob
+        intellij_codestyles:
+          - name: GoogleStyle
+            url: 'https://raw.githubusercontent.com/google/styleguide/gh-pages/intellij-java-google-style.xml'
+        intellij_inspection_profiles:
+          - name: Example
+            src: /example/Example.xml
+            remote_src: true
+    download_cache: '/tmp/downloads'
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        intellij_user_config_dir=dict(type='str', required=True),
+        users=dict(type='list', elements='dict', required=True),
+        download_cache=dict(type='path', required=True),
+        parallelism=dict(type='int', required=False, default=4)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        changed, installed = install_config_files(
+            module.params['intellij_user_config_dir'],
+            module.params['users'],
+            Path(module.params['download_cache']),
+            module.params['parallelism'],
+            module.check_mode)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    if changed:
+        msg = f'Installed {len(installed)} code styles and inspection profiles'
+    else:
+        msg = 'Code styles and inspection profiles were already up to date'
+
+    module.exit_json(changed=changed, msg=msg, installed=installed, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_install_config_files', run_module)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+from pathlib import Path
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.inventory import update_inventory_fact
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+
+DOCUMENTATION = '''
+---
+module: intellij_inventory_facts
+
+short_description: >
+    Records the installed IntelliJ build, plugins and JDKs as a local fact.
+
+description:
+    - >
+        Writes a JSON local fact (for /etc/ansible/facts.d) with the build
+        number of the IntelliJ installation, and for each user the installed
+        plugins (id, name and version) and the registered JDKs (name, home and
+        version).
+    - >
+        Plugin descriptors are cached in the plugin index (not in the fact)
+        and only read again when the plugin has changed.
+
+options:
+    fact_path:
+        description:
+            - The path of the fact file to write.
+        required: false
+        default: /etc/ansible/facts.d/intellij_inventory.fact
+    intellij_home:
+        description:
+            - This is the path where IntelliJ has been installed.
+        required: true
+    intellij_user_config_dir:
+        description:
+            - >
+                This is the dir where the user's IntelliJ configuration is
+                located (relative to the user's home).
+        required: true
+    intellij_user_plugins_dir:
+        description:
+            - >
+                This is the dir where the user's IntelliJ plugins are located
+                (relative to the user's home).
+        required: true
+    users:
+        description:
+            - The usernames of the users to record the plugins and JDKs of.
+        required: false
+        default: []
+    shared_plugins_dir:
+        description:
+            - >
+                The plugins directory shared by all users (when plugins are
+                installed for all users).
+        required: false
+    plugin_index_path:
+        description:
+            - >
+                The plugin index to cache the plugin descriptors in (see
+                intellij_install_plugin), so only the descriptors of plugins
+                that have changed are read.
+        required: false
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Update IntelliJ inventory facts
+  become: yes
+  intellij_inventory_facts:
+    intellij_home: '/opt/idea/idea-ultimate-2018.1.1'
+    intellij_user_config_dir: '.IntelliJIdea2018.1/config'
+    intellij_user_plugins_dir: '.IntelliJIdea2018.1/config/plugins'
+    users:
+      - bob
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        fact_path=dict(type='path', required=False, default='/etc/ansible/facts.d/intellij_inventory.fact'),
+        intellij_home=dict(type='path', required=True),
+        intellij_user_config_dir=dict(type='str', required=True),
+        intellij_user_plugins_dir=dict(type='str', required=True),
+        users=dict(type='list', elements='str', required=False, default=[]),
+        shared_plugins_dir=dict(type='path', required=False),
+        plugin_index_path=dict(type='path', required=False)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        changed, inventory = update_inventory_fact(
+            Path(module.params['fact_path']),
+            Path(module.params['intellij_home']),
+            module.params['intellij_user_config_dir'],
+            module.params['intellij_user_plugins_dir'],
+            module.params['users'],
+            Path(module.params['shared_plugins_dir']) if module.params['shared_plugins_dir'] else None,
+            Path(module.params['plugin_index_path']) if module.params['plugin_index_path'] else None,
+            module.check_mode)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    if changed:
+        msg = 'IntelliJ inventory facts have been updated'
+    else:
+        msg = 'IntelliJ inventory facts were already up to date'
+
+    module.exit_json(changed=changed, msg=msg, inventory=inventory, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_inventory_facts', run_module)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.metrics import export_metrics
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+
+DOCUMENTATION = '''
+---
+module: intellij_metrics
+
+short_description: >
+    Writes IntelliJ IDEA provisioning metrics for the node_exporter textfile
+    collector.
+
+description:
+    - >
+        Writes the duration of the provisioning run, the time spent in each
+        phase of the IntelliJ modules, the plugins installed, skipped and
+        failed, the bytes downloaded, the download cache size and hit ratio,
+        and the installed IntelliJ build to C(intellij.prom) in the given
+        directory.
+    - The file is replaced atomically so node_exporter never reads a partial file.
+
+options:
+    textfile_dir:
+        description:
+            - The directory node_exporter's textfile collector reads from.
+        required: true
+    start_time:
+        description:
+            - The time (seconds since the epoch) the provisioning run started.
+        required: true
+    failed:
+        description:
+            - Whether the provisioning run failed.
+        required: false
+        default: false
+    intellij_home:
+        description:
+            - The IntelliJ IDEA installation to report the build number of.
+        required: false
+    download_cache:
+        description:
+            - The directory plugins are downloaded to.
+        required: false
+    plugin_results:
+        description:
+            - The registered result of the intellij_install_plugin task.
+        required: false
+    module_results:
+        description:
+            - The registered results of the other IntelliJ module tasks.
+        required: false
+        default: []
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Write provisioning metrics
+  become: yes
+  intellij_metrics:
+    textfile_dir: /var/lib/node_exporter/textfile_collector
+    start_time: '{{ start_time }}'
+    intellij_home: '/opt/idea/idea-ultimate-2018.1.1'
+    download_cache: '/tmp/downloads'
+    plugin_results: '{{ install_plugins_result }}'
+    module_results:
+      - '{{ configure_jdks_result }}'
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        textfile_dir=dict(type='path', required=True),
+        start_time=dict(type='float', required=True),
+        failed=dict(type='bool', required=False, default=False),
+        intellij_home=dict(type='path', required=False),
+        download_cache=dict(type='path', required=False),
+        plugin_results=dict(type='raw', required=False),
+        module_results=dict(type='list', elements='raw', required=False, default=[])
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    textfile_dir = Path(module.params['textfile_dir'])
+    intellij_home = Path(module.params['intellij_home']) if module.params['intellij_home'] else None
+    download_cache = Path(module.params['download_cache']) if module.params['download_cache'] else None
+
+    try:
+        path, metrics = export_metrics(
+            textfile_dir,
+            module.params['start_time'],
+            module.params['failed'],
+            intellij_home,
+            download_cache,
+            module.params['plugin_results'],
+            module.params['module_results'],
+            module.check_mode)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    module.exit_json(changed=True, msg=f'Metrics written to {path}', metrics=metrics, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_metrics', run_module)
+
+
+if __name__ == '__main__':
+    main()
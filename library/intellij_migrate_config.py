@@ -0,0 +1,109 @@
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.common import IntellijError, resolve_owner, user_path
+from ansible.module_utils.intellij.migration import migrate_config
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+
+DOCUMENTATION = '''
+---
+module: intellij_migrate_config
+
+short_description: >
+    Migrates the given IntelliJ user's configuration from the previous
+    IntelliJ version.
+
+description:
+    - >
+        If the user's config directory doesn't exist yet, the selected files
+        and directories are copied (or hardlinked) from the config directory
+        of the most recent earlier version of the same product (e.g.
+        IdeaIC2024.2 for IdeaIC2024.3). Nothing is changed once the config
+        directory exists.
+    - >
+        Config directories in the layout used before IntelliJ 2020.1 (e.g.
+        ~/.IdeaIC2019.3/config) are migrated from when there's no earlier
+        version in the current layout (~/.config/JetBrains/IdeaIC2020.1).
+
+options:
+    intellij_user_config_dir:
+        description:
+            - >
+                This is the dir where the user's IntelliJ configuration is
+                located.
+        required: true
+    items:
+        description:
+            - >
+                The files and directories to migrate, relative to the config
+                directory.
+        required: true
+    mode:
+        description:
+            - >
+                Whether to copy the files or hardlink them (files are copied
+                if they can't be hardlinked).
+        choices: ['copy', 'hardlink']
+        default: copy
+        required: false
+    owner:
+        description:
+            - The user who you're configuring IntelliJ for.
+        required: true
+    group:
+        description:
+            - The group for the files and directories created.
+        required: true
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Migrate config from the previous version
+  become: yes
+  intellij_migrate_config:
+    intellij_user_config_dir: '.config/JetBrains/IdeaIC2024.3'
+    items:
+      - codestyles
+      - inspection
+      - options
+    owner: bob
+    group: bob
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        intellij_user_config_dir=dict(type='str', required=True),
+        items=dict(type='list', elements='str', required=True),
+        mode=dict(type='str', choices=['copy', 'hardlink'], default='copy'),
+        owner=dict(type='str', required=True),
+        group=dict(type='str', required=True)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        uid, gid, username = resolve_owner(module.params['owner'], module.params['group'])
+        intellij_user_config_dir = user_path(username, module.params['intellij_user_config_dir'])
+
+        migrated = migrate_config(
+            intellij_user_config_dir, module.params['items'], uid, gid, module.params['mode'] == 'hardlink', module.check_mode)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    if migrated is None:
+        module.exit_json(changed=False, msg='No config to migrate', **results())
+
+    msg = f'Config has been migrated from {migrated["previous_config_dir"]}'
+
+    module.exit_json(changed=True, msg=msg, **migrated, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_migrate_config', run_module)
+
+
+if __name__ == '__main__':
+    main()
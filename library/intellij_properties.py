@@ -0,0 +1,116 @@
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.common import IntellijError, resolve_owner, user_path
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.properties import create_user_dirs, update_properties
+from ansible.module_utils.intellij.timing import results
+
+DOCUMENTATION = '''
+---
+module: intellij_properties
+
+short_description: Sets IntelliJ platform properties (idea.properties).
+
+description:
+    - >
+        Sets the given properties in an idea.properties file; either the
+        user's (in their config directory) or the one of the IntelliJ
+        installation (shared by all users). Other properties in the file are
+        left as they are.
+    - >
+        Also creates the given directories (e.g. the idea.system.path and
+        idea.log.path) for the owner.
+
+options:
+    properties_file:
+        description:
+            - >
+                The path of the idea.properties file, relative to the owner's
+                home directory or absolute. If not specified only the
+                directories are created.
+        required: false
+    properties:
+        description:
+            - >
+                The properties to set (a null value removes the property). The
+                IntelliJ macros ${user.name} and ${user.home} may be used in
+                the values.
+        required: false
+        default: {}
+    directories:
+        description:
+            - >
+                The directories to create for the owner (with any missing
+                parent directories), relative to the owner's home directory
+                or absolute. The macros ${user.name} and ${user.home} are
+                expanded for the owner.
+        required: false
+        default: []
+    owner:
+        description:
+            - The user who owns the files and directories.
+        required: true
+    group:
+        description:
+            - The group for the files and directories created.
+        required: true
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Move caches and logs to local disk
+  become: yes
+  intellij_properties:
+    properties_file: '.config/JetBrains/IdeaIC2024.3/idea.properties'
+    properties:
+      idea.system.path: '/var/tmp/intellij-${user.name}/system'
+      idea.log.path: '/var/tmp/intellij-${user.name}/log'
+      idea.max.intellisense.filesize: 5000
+    directories:
+      - '/var/tmp/intellij-${user.name}/system'
+      - '/var/tmp/intellij-${user.name}/log'
+    owner: bob
+    group: bob
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        properties_file=dict(type='str', required=False),
+        properties=dict(type='dict', required=False, default={}),
+        directories=dict(type='list', elements='str', required=False, default=[]),
+        owner=dict(type='str', required=True),
+        group=dict(type='str', required=True)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    changed = False
+    diff = {}
+    try:
+        uid, gid, username = resolve_owner(module.params['owner'], module.params['group'])
+
+        if module.params['properties_file']:
+            changed, diff = update_properties(
+                user_path(username, module.params['properties_file']), module.params['properties'], uid, gid, module.check_mode)
+
+        created = create_user_dirs(username, module.params['directories'], uid, gid, module.check_mode)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    if changed or created:
+        msg = 'IntelliJ properties have been updated'
+    else:
+        msg = 'IntelliJ properties were already up to date'
+
+    module.exit_json(changed=changed or bool(created), msg=msg, diff=diff, created=created, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_properties', run_module)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+from pathlib import Path
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.common import IntellijError, resolve_owner, user_path
+from ansible.module_utils.intellij.index_cache import seed_index_cache
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+
+DOCUMENTATION = '''
+---
+module: intellij_seed_index_cache
+
+short_description: >
+    Seeds the shared index cache of the given IntelliJ user from a local
+    mirror.
+
+description:
+    - >
+        Copies (or hardlinks) the shared indexes downloaded by the IDE on
+        another host from a local mirror into the shared-index directory of
+        the user's IDE system directory, so the IDE finds them there instead
+        of downloading them again.
+    - >
+        The mirror has a directory for each build number (e.g.
+        243.26053.27) with a copy of the shared-index directory of a host
+        running that build. The IDE only uses the indexes it would have
+        downloaded itself (e.g. for the same JDKs), the others are ignored.
+        This module doesn't change the IDE's download settings.
+    - >
+        Files that are already in the shared-index directory (including
+        symlinks) are left as they are, and symlinked directories are
+        refused. A build missing from the mirror is reported rather than
+        failing the module.
+
+options:
+    intellij_home:
+        description:
+            - The root directory of the IntelliJ installation.
+        required: true
+    intellij_user_system_dir:
+        description:
+            - >
+                This is the dir where the user's IntelliJ caches and indexes
+                are located.
+        required: true
+    source:
+        description:
+            - The root directory of the local mirror.
+        required: true
+    mode:
+        description:
+            - >
+                Whether to copy the files or hardlink them (files are copied
+                if they can't be hardlinked).
+        choices: ['copy', 'hardlink']
+        default: copy
+        required: false
+    owner:
+        description:
+            - The user who you're configuring IntelliJ for.
+        required: true
+    group:
+        description:
+            - The group for the files and directories created.
+        required: true
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Seed index cache
+  become: yes
+  intellij_seed_index_cache:
+    intellij_home: '/opt/idea/idea-community-2024.3'
+    intellij_user_system_dir: '.cache/JetBrains/IdeaIC2024.3'
+    source: '/mnt/mirror/intellij-shared-index'
+    owner: bob
+    group: bob
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        intellij_home=dict(type='path', required=True),
+        intellij_user_system_dir=dict(type='str', required=True),
+        source=dict(type='path', required=True),
+        mode=dict(type='str', choices=['copy', 'hardlink'], default='copy'),
+        owner=dict(type='str', required=True),
+        group=dict(type='str', required=True)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        uid, gid, username = resolve_owner(module.params['owner'], module.params['group'])
+
+        report = seed_index_cache(
+            Path(module.params['intellij_home']),
+            user_path(username, module.params['intellij_user_system_dir']),
+            Path(module.params['source']),
+            uid,
+            gid,
+            module.params['mode'] == 'hardlink',
+            module.check_mode)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    changed = report['seeded'] > 0
+    if changed:
+        msg = f"{report['seeded']} index cache files have been seeded"
+    elif report['missing']:
+        msg = f"Build {report['missing']} is missing from the mirror"
+    else:
+        msg = 'Index cache was already up to date'
+
+    module.exit_json(changed=changed, msg=msg, **report, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_seed_index_cache', run_module)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.common import IntellijError, resolve_owner, user_path
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.project_defaults import gradle_properties, gradle_settings, set_default_gradle
+from ansible.module_utils.intellij.timing import results
+
+DOCUMENTATION = '''
+---
+module: intellij_set_default_gradle
+
+short_description: >
+    Set the default Gradle settings for the given IntelliJ user.
+
+description:
+    - >
+        Set the Gradle settings for new projects for the given IntelliJ user.
+        Settings that aren't specified are left as they are.
+    - >
+        delegated_build and parallel_model_fetch are set for new projects
+        (DefaultGradleProjectSettings and GradleSettings in
+        project.default.xml), offline and daemon_vm_options are IDE wide
+        (GradleSystemSettings in gradle.settings.xml) and
+        parallel_execution applies to all the user's Gradle builds
+        (org.gradle.parallel in ~/.gradle/gradle.properties).
+    - >
+        The JVM Gradle runs with isn't set, IntelliJ uses the project JDK
+        for new projects (see intellij_set_default_jdk).
+
+options:
+    intellij_user_config_dir:
+        description:
+            - >
+                This is the dir where the user's IntelliJ configuration is
+                located.
+        required: true
+    delegated_build:
+        description:
+            - >
+                Whether to build and run using Gradle (rather than the
+                IntelliJ build system).
+        required: false
+    parallel_model_fetch:
+        description:
+            - Whether to fetch the Gradle models in parallel when syncing.
+        required: false
+    parallel_execution:
+        description:
+            - >
+                Whether Gradle builds independent projects in parallel (set
+                as org.gradle.parallel in the user's
+                ~/.gradle/gradle.properties, so it applies to all the user's
+                Gradle builds).
+        required: false
+    offline:
+        description:
+            - Whether Gradle works offline.
+        required: false
+    daemon_vm_options:
+        description:
+            - The options for the Gradle daemon JVM e.g. -Xmx2g.
+        required: false
+    owner:
+        description:
+            - The user who you're configuring IntelliJ for.
+        required: true
+    group:
+        description:
+            - The group for the files and directories created.
+        required: true
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Set default Gradle settings
+  become: yes
+  intellij_set_default_gradle:
+    intellij_user_config_dir: '.config/JetBrains/IdeaIC2024.3'
+    delegated_build: no
+    parallel_model_fetch: yes
+    parallel_execution: yes
+    daemon_vm_options: '-Xmx2g'
+    owner: bob
+    group: bob
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        intellij_user_config_dir=dict(type='str', required=True),
+        delegated_build=dict(type='bool', required=False),
+        parallel_model_fetch=dict(type='bool', required=False),
+        parallel_execution=dict(type='bool', required=False),
+        offline=dict(type='bool', required=False),
+        daemon_vm_options=dict(type='str', required=False),
+        owner=dict(type='str', required=True),
+        group=dict(type='str', required=True)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        uid, gid, username = resolve_owner(module.params['owner'], module.params['group'])
+        intellij_user_config_dir = user_path(username, module.params['intellij_user_config_dir'])
+
+        settings = gradle_settings(
+            module.params['delegated_build'],
+            module.params['parallel_model_fetch'],
+            module.params['offline'],
+            module.params['daemon_vm_options'])
+
+        properties = gradle_properties(module.params['parallel_execution'])
+
+        changed, diff = set_default_gradle(
+            intellij_user_config_dir, uid, gid, settings, user_path(username, '.gradle'), properties, module.check_mode)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    if changed:
+        msg = 'Gradle settings have been updated'
+    else:
+        msg = 'Gradle settings were already up to date'
+
+    module.exit_json(changed=changed, msg=msg, diff=diff, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_set_default_gradle', run_module)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+from pathlib import Path
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+from ansible.module_utils.intellij.user_files import apply_user_files
+
+DOCUMENTATION = '''
+---
+module: intellij_user_files
+
+short_description: >
+    Creates the directories and files of the IntelliJ users in a single step.
+
+description:
+    - >
+        The action plugin renders the templates (and reads the files) for
+        every user on the controller and transfers them to the host in a
+        single archive, with each distinct content included once. The module
+        then creates the directories and files of every user, and sets their
+        owner and permissions (reporting a diff of the changes with
+        --diff).
+    - >
+        The paths are relative to the base_dir in each user's home
+        directory. The directories get the permissions 0775 and the files
+        0664 (unless the file specifies a mode); the owner is the user, the
+        group the user's intellij_group (defaults to the username).
+    - >
+        The archive, directories and files options of the module are set by
+        the action plugin.
+
+options:
+    base_dir:
+        description:
+            - >
+                The directory (relative to each user's home directory) the
+                paths are relative to.
+        required: true
+    users:
+        description:
+            - >
+                The users, each with a username and optionally an
+                intellij_group. The templates are rendered with the task's
+                variables and the user as the user variable.
+        required: true
+    directories:
+        description:
+            - >
+                The directories to create for each user ('' for base_dir
+                itself).
+        required: false
+        default: []
+    files:
+        description:
+            - >
+                The files to create for each user, each with a dest and either
+                a template (from the role's templates) or a src_attribute (the
+                user attribute with the path of the file on the controller to
+                copy). Optionally with users_with (the file is only created
+                for the users with one of these attributes set), force
+                (whether to replace a file with different content, defaults
+                to true) and mode.
+        required: false
+        default: []
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Configure user files
+  become: yes
+  intellij_user_files:
+    base_dir: '.config/JetBrains/IdeaIC2024.3'
+    users:
+      - username: bob
+        intellij_disabled_plugins:
+          - org.jetbrains.plugins.gradle
+    directories:
+      - ''
+      - options
+    files:
+      - dest: disabled_plugins.txt
+        template: disabled_plugins.txt.j2
+        users_with:
+          - intellij_disabled_plugins
+        force: false
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        base_dir=dict(type='str', required=True),
+        archive=dict(type='path', required=True),
+        directories=dict(type='list', elements='dict', required=False, default=[]),
+        files=dict(type='list', elements='dict', required=False, default=[])
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        changed, paths, diff = apply_user_files(
+            module.params['base_dir'],
+            Path(module.params['archive']),
+            module.params['directories'],
+            module.params['files'],
+            module.check_mode,
+            module._diff)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    if changed:
+        msg = f'Updated {len(paths)} user directories and files'
+    else:
+        msg = 'User directories and files were already up to date'
+
+    if module._diff:
+        module.exit_json(changed=changed, msg=msg, paths=paths, diff=diff, **results())
+    module.exit_json(changed=changed, msg=msg, paths=paths, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_user_files', run_module)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+from pathlib import Path
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.common import IntellijError, resolve_owner, user_path
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+from ansible.module_utils.intellij.vmoptions import GC_OPTIONS, shared_archive_options, size_vmoptions, update_vmoptions
+
+DOCUMENTATION = '''
+---
+module: intellij_vmoptions
+
+short_description: Sets the JVM options for the given IntelliJ user.
+
+description:
+    - >
+        Sizes the heap, the code cache and the garbage collector of the IDE to
+        the memory and processors of the host shared between the users who
+        run the IDE concurrently, and writes them to the vmoptions file in the
+        user's config directory. Other options in the file are left as they
+        are.
+    - >
+        The options set by this module replace any option in the file that
+        sets the same thing (e.g. C(-Xmx), or C(-XX:+UseZGC) for C(gc)), so
+        a user's own changes to them are overwritten on every run.
+    - >
+        The derived heap size is a third of each user's share of the memory,
+        at least 1024 MB and at most 16 GB, but never more than the share
+        itself (with a warning when the share is less than 1024 MB).
+
+options:
+    intellij_user_config_dir:
+        description:
+            - >
+                This is the dir where the user's IntelliJ configuration is
+                located.
+        required: true
+    vmoptions_filename:
+        description:
+            - The name of the vmoptions file.
+        required: false
+        default: idea64.vmoptions
+    memtotal_mb:
+        description:
+            - The total memory of the host in MB.
+        required: true
+    processor_count:
+        description:
+            - The number of processors of the host.
+        required: true
+    concurrent_users:
+        description:
+            - The number of users running the IDE on the host at the same time.
+        required: false
+        default: 1
+    heap_size:
+        description:
+            - The maximum heap size e.g. 4g (derived from the host if not set).
+        required: false
+    reserved_code_cache_size:
+        description:
+            - >
+                The size of the code cache e.g. 512m (derived from the heap
+                size if not set).
+        required: false
+    gc:
+        description:
+            - The garbage collector (derived from the host if not set).
+        choices: ['g1', 'parallel', 'serial', 'shenandoah', 'zgc']
+        required: false
+    parallel_gc_threads:
+        description:
+            - >
+                The number of parallel garbage collection threads (derived
+                from the host for the g1 and parallel collectors if not set).
+        required: false
+    shared_archive_file:
+        description:
+            - >
+                The path of the class data sharing archive to start the IDE
+                with. When not set, or the archive doesn't exist, any
+                C(-XX:SharedArchiveFile) option is removed from the file
+                (unless it's given in C(options)).
+        required: false
+    options:
+        description:
+            - Additional JVM options to set.
+        required: false
+        default: []
+    owner:
+        description:
+            - The user who you're configuring IntelliJ for.
+        required: true
+    group:
+        description:
+            - The group for the files and directories created.
+        required: true
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Set JVM options
+  become: yes
+  intellij_vmoptions:
+    intellij_user_config_dir: '.config/JetBrains/IdeaIC2024.3'
+    memtotal_mb: '{{ ansible_facts.memtotal_mb }}'
+    processor_count: '{{ ansible_facts.processor_vcpus }}'
+    concurrent_users: 4
+    options:
+      - '-Dsun.io.useCanonCaches=false'
+    owner: bob
+    group: bob
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        intellij_user_config_dir=dict(type='str', required=True),
+        vmoptions_filename=dict(type='str', required=False, default='idea64.vmoptions'),
+        memtotal_mb=dict(type='int', required=True),
+        processor_count=dict(type='int', required=True),
+        concurrent_users=dict(type='int', required=False, default=1),
+        heap_size=dict(type='str', required=False),
+        reserved_code_cache_size=dict(type='str', required=False),
+        gc=dict(type='str', required=False, choices=sorted(GC_OPTIONS)),
+        parallel_gc_threads=dict(type='int', required=False),
+        shared_archive_file=dict(type='path', required=False),
+        options=dict(type='list', elements='str', required=False, default=[]),
+        owner=dict(type='str', required=True),
+        group=dict(type='str', required=True)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        uid, gid, username = resolve_owner(module.params['owner'], module.params['group'])
+        intellij_user_config_dir = user_path(username, module.params['intellij_user_config_dir'])
+
+        options, warnings = size_vmoptions(
+            module.params['memtotal_mb'],
+            module.params['processor_count'],
+            module.params['concurrent_users'],
+            module.params['heap_size'],
+            module.params['reserved_code_cache_size'],
+            module.params['gc'],
+            module.params['parallel_gc_threads'])
+        archive_options, remove_options = shared_archive_options(
+            Path(module.params['shared_archive_file']) if module.params['shared_archive_file'] else None, module.check_mode)
+        options += archive_options + module.params['options']
+        for warning in warnings:
+            module.warn(warning)
+
+        changed, diff = update_vmoptions(
+            intellij_user_config_dir / module.params['vmoptions_filename'], options, uid, gid, module.check_mode, remove_options)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    if changed:
+        msg = 'JVM options have been updated'
+    else:
+        msg = 'JVM options were already up to date'
+
+    module.exit_json(changed=changed, msg=msg, diff=diff, vmoptions=options, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_vmoptions', run_module)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.profiling import run_profiled
+from ansible.module_utils.intellij.timing import results
+from ansible.module_utils.intellij.warmup import warmup_projects
+
+DOCUMENTATION = '''
+---
+module: intellij_warmup
+
+short_description: Builds the IntelliJ indexes of the users' projects.
+
+description:
+    - >
+        Runs the headless warmup command of the IDE for each of the users'
+        projects, so the projects are indexed before they're first opened.
+    - >
+        The projects of different users are warmed up concurrently (up to
+        the given limit), the projects of each user one at a time.
+    - >
+        The status (ok, failed, timeout, missing, up_to_date or pending in
+        check mode) and duration of each project is reported. Failures are
+        reported rather than failing the module.
+    - >
+        Projects that have been warmed up by the same build of the IDE, and
+        whose directory hasn't been modified since, are skipped (status
+        up_to_date). The stamps are stored in the user's system directory.
+
+options:
+    intellij_home:
+        description:
+            - The root directory of the IntelliJ installation.
+        required: true
+    users:
+        description:
+            - >
+                The users, each with a username and a list of
+                intellij_warmup_projects (the project directories, relative
+                to the user's home directory or absolute).
+        required: true
+    intellij_user_system_dir:
+        description:
+            - >
+                This is the dir where the user's IntelliJ caches and indexes
+                are located (relative to the user's home directory or
+                absolute).
+        required: true
+    parallelism:
+        description:
+            - The maximum number of projects to warm up concurrently.
+        required: false
+        default: 2
+    timeout:
+        description:
+            - The maximum time in seconds to warm up each project.
+        required: false
+        default: 1800
+
+author:
+    - John Freeman (GantSign Ltd.)
+'''
+
+EXAMPLES = '''
+- name: Warm up projects
+  become: yes
+  intellij_warmup:
+    intellij_home: '/opt/idea/idea-community-2024.3'
+    users:
+      - username: bob
+        intellij_warmup_projects:
+          - 'src/example'
+    intellij_user_system_dir: '.cache/JetBrains/IdeaIC2024.3'
+    parallelism: 4
+    timeout: 600
+'''
+
+
+def run_module() -> None:
+
+    module_args = dict(
+        intellij_home=dict(type='path', required=True),
+        users=dict(type='list', elements='dict', required=True),
+        intellij_user_system_dir=dict(type='str', required=True),
+        parallelism=dict(type='int', required=False, default=2),
+        timeout=dict(type='int', required=False, default=1800)
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    try:
+        projects = warmup_projects(
+            Path(module.params['intellij_home']),
+            module.params['users'],
+            module.params['intellij_user_system_dir'],
+            module.params['parallelism'],
+            module.params['timeout'],
+            module.check_mode)
+    except IntellijError as e:
+        module.fail_json(msg=str(e), **results())
+
+    warmed_up = len([x for x in projects if x['status'] in ('ok', 'pending')])
+    up_to_date = len([x for x in projects if x['status'] == 'up_to_date'])
+    msg = f'Warmed up {warmed_up} of {len(projects)} projects ({up_to_date} up to date)'
+
+    module.exit_json(changed=warmed_up > 0, msg=msg, projects=projects, **results())
+
+
+def main() -> None:
+    run_profiled('intellij_warmup', run_module)
+
+
+if __name__ == '__main__':
+    main()
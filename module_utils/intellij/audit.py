@@ -0,0 +1,176 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ansible.module_utils.intellij.common import IntellijError, user_path
+from ansible.module_utils.intellij.inventory import list_jdks, list_plugins
+from ansible.module_utils.intellij.plugins import get_build_number, is_compatible, load_plugin_index
+from ansible.module_utils.intellij.timing import phase
+from ansible.module_utils.intellij.xmlutil import find_named, load_document
+
+
+def get_option(elem: Any, name: str) -> Optional[str]:
+    if elem is None:
+        return None
+    option = find_named(elem, 'option', name)
+    return None if option is None else option.get('value')
+
+
+def find_path(elem: Any, *steps: tuple) -> Any:
+    # Each step is (tag, name) where name may be None for unnamed elements
+    for tag, name in steps:
+        if elem is None:
+            return None
+        elem = elem.find(f'./{tag}') if name is None else find_named(elem, tag, name)
+    return elem
+
+
+def compare(drift: Dict[str, Any], key: str, expected: Optional[str], actual: Optional[str]) -> None:
+    if expected not in (None, '') and expected != actual:
+        drift[key] = {'expected': expected, 'actual': actual}
+
+
+def audit_plugins(
+        drift: Dict[str, Any],
+        plugins_dir: Path,
+        build_number: Optional[str],
+        desired: List[str],
+        cached: Dict[str, Dict[str, Any]],
+        shared_plugins: List[Dict[str, Any]]) -> None:
+    installed = list_plugins(plugins_dir, cached) + shared_plugins
+    installed_ids = {x['id'] for x in installed}
+
+    missing = [x for x in desired if x not in installed_ids]
+    if missing:
+        drift['missing_plugins'] = missing
+
+    if build_number is None:
+        return
+
+    incompatible = [
+        x['id'] for x in installed
+        if x['id'] in desired and not is_compatible(build_number, x.get('since_build'), x.get('until_build'))
+    ]
+    if incompatible:
+        drift['incompatible_plugins'] = incompatible
+
+
+def audit_jdks(drift: Dict[str, Any], config_dir: Path, desired: List[Dict[str, str]]) -> None:
+    configured = {x['name']: x for x in list_jdks(config_dir)}
+
+    missing = []
+    mismatched = {}
+    not_found = []
+    for jdk in desired:
+        actual = configured.get(jdk['name'])
+        if actual is None:
+            missing.append(jdk['name'])
+        elif actual['home'] != str(Path(jdk['home']).expanduser()):
+            mismatched[jdk['name']] = {'expected': jdk['home'], 'actual': actual['home']}
+        elif not Path(actual['home']).is_dir():
+            not_found.append(jdk['name'])
+
+    if missing:
+        drift['missing_jdks'] = missing
+    if mismatched:
+        drift['jdk_home_mismatch'] = mismatched
+    if not_found:
+        drift['jdk_home_not_found'] = not_found
+
+
+def audit_disabled_plugins(drift: Dict[str, Any], config_dir: Path, desired: List[str]) -> None:
+    try:
+        disabled = set((config_dir / 'disabled_plugins.txt').read_text().split())
+    except OSError:
+        disabled = set()
+
+    not_disabled = [x for x in desired if x not in disabled]
+    if not_disabled:
+        drift['plugins_not_disabled'] = not_disabled
+
+
+def audit_defaults(drift: Dict[str, Any], config_dir: Path, user: Dict[str, Any], default_maven_home: Optional[str]) -> None:
+    options_dir = config_dir / 'options'
+
+    project_default_root, _ = load_document(options_dir / 'project.default.xml')
+    default_project = find_path(project_default_root, ('component', 'ProjectManager'), ('defaultProject', None))
+
+    project_root_manager = find_path(default_project, ('component', 'ProjectRootManager'))
+    compare(drift, 'default_jdk', user.get('intellij_default_jdk'),
+            None if project_root_manager is None else project_root_manager.get('project-jdk-name'))
+
+    maven_settings = find_path(default_project, ('component', 'MavenImportPreferences'), ('option', 'generalSettings'),
+                               ('MavenGeneralSettings', None))
+    if default_maven_home:
+        default_maven_home = str(Path(default_maven_home).expanduser())
+    compare(drift, 'default_maven_home', default_maven_home, get_option(maven_settings, 'mavenHome'))
+
+    profile_manager = find_path(default_project, ('component', 'InspectionProjectProfileManager'))
+    compare(drift, 'default_inspection_profile', user.get('intellij_default_inspection_profile'),
+            get_option(profile_manager, 'PROJECT_PROFILE'))
+
+    code_style_root, _ = load_document(options_dir / 'code.style.schemes.xml')
+    compare(drift, 'default_codestyle', user.get('intellij_default_codestyle'),
+            get_option(find_path(code_style_root, ('component', 'CodeStyleSchemeSettings')), 'CURRENT_SCHEME_NAME'))
+
+
+def audit_user(
+        user: Dict[str, Any],
+        intellij_user_config_dir: str,
+        intellij_user_plugins_dir: str,
+        build_number: Optional[str],
+        default_maven_home: Optional[str],
+        cached: Dict[str, Dict[str, Any]],
+        shared_plugins: List[Dict[str, Any]]) -> Dict[str, Any]:
+    username = user['username']
+    config_dir = user_path(username, intellij_user_config_dir)
+    plugins_dir = user_path(username, intellij_user_plugins_dir)
+
+    drift: Dict[str, Any] = {}
+    audit_plugins(drift, plugins_dir, build_number, user.get('intellij_plugins') or [], cached, shared_plugins)
+    audit_disabled_plugins(drift, config_dir, user.get('intellij_disabled_plugins') or [])
+
+    # Config files that can't be read (e.g. an unsupported root element) are
+    # findings too, the other users are still audited
+    errors = []
+    for audit_config in [
+            lambda: audit_jdks(drift, config_dir, user.get('intellij_jdks') or []),
+            lambda: audit_defaults(drift, config_dir, user, default_maven_home)]:
+        try:
+            audit_config()
+        except IntellijError as e:
+            errors.append(str(e))
+    if errors:
+        drift['errors'] = errors
+    return drift
+
+
+def audit(
+        intellij_home: Path,
+        intellij_user_config_dir: str,
+        intellij_user_plugins_dir: str,
+        users: List[Dict[str, Any]],
+        default_maven_home: Optional[str] = None,
+        plugin_index_path: Optional[Path] = None,
+        shared_plugins_dir: Optional[Path] = None) -> Dict[str, Any]:
+    try:
+        build_number = get_build_number(intellij_home)
+    except (IntellijError, OSError, ValueError, KeyError):
+        build_number = None
+
+    # Reuse the plugin descriptors cached in the plugin index (read-only)
+    cached = load_plugin_index(plugin_index_path) if plugin_index_path is not None else {}
+
+    report: Dict[str, Any] = {'home': str(intellij_home), 'build_number': build_number, 'users': {}}
+    if build_number is None:
+        report['error'] = f'IntelliJ IDEA not found in {intellij_home}'
+
+    with phase('audit'):
+        shared_plugins = list_plugins(shared_plugins_dir, cached) if shared_plugins_dir is not None else []
+        for user in users:
+            drift = audit_user(
+                user, intellij_user_config_dir, intellij_user_plugins_dir, build_number, default_maven_home, cached, shared_plugins)
+            if drift:
+                report['users'][user['username']] = drift
+
+    report['drifted'] = bool(report['users']) or build_number is None
+    return report
@@ -0,0 +1,85 @@
+import json
+import os
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from ansible.module_utils.intellij.common import IntellijError, make_dirs
+from ansible.module_utils.intellij.plugins import get_build_number
+from ansible.module_utils.intellij.timing import phase
+
+RunCommand = Callable[[List[str]], Tuple[int, str, str]]
+
+CDS_DIRNAME = 'cds'
+
+
+def get_launch_info(intellij_home: Path) -> Tuple[Path, List[Path]]:
+    product_info_path = intellij_home / 'product-info.json'
+    if not product_info_path.is_file():
+        raise IntellijError(f'File not found: {product_info_path}')
+
+    with open(product_info_path, 'r', encoding='utf-8') as product_info_file:
+        product_info = json.load(product_info_file)
+
+    launches = [x for x in product_info.get('launch', []) if x.get('os', 'Linux') == 'Linux']
+    if not launches or 'bootClassPathJarNames' not in launches[0]:
+        raise IntellijError(f'Unable to find the boot class path in: {product_info_path}')
+    launch = launches[0]
+
+    java = intellij_home / launch.get('javaExecutablePath', 'jbr/bin/java')
+    class_path = [intellij_home / 'lib' / x for x in launch['bootClassPathJarNames']]
+    return java, class_path
+
+
+def cds_archive_path(intellij_home: Path, build_number: str) -> Path:
+    return intellij_home / CDS_DIRNAME / f'idea-{build_number}.jsa'
+
+
+def generate_cds_archive(
+        intellij_home: Path,
+        class_list: Path,
+        uid: int,
+        gid: int,
+        run_command: RunCommand,
+        check_mode: bool = False) -> Tuple[bool, Path]:
+    # The archive is only valid for the JVM and class path it was created with,
+    # both of which change with the build
+    archive_path = cds_archive_path(intellij_home, get_build_number(intellij_home))
+
+    if not class_list.is_file():
+        raise IntellijError(f'File not found: {class_list}')
+
+    if archive_path.is_file() and archive_path.stat().st_mtime >= class_list.stat().st_mtime:
+        return False, archive_path
+
+    java, class_path = get_launch_info(intellij_home)
+    if not java.is_file():
+        raise IntellijError(f'Unable to find the bundled Java runtime: {java}')
+
+    if check_mode:
+        return True, archive_path
+
+    make_dirs(archive_path.parent, 0o775, uid, gid)
+    temp_path = archive_path.with_name(f'.{archive_path.name}.tmp')
+    with phase('cds'):
+        rc, out, err = run_command([
+            str(java),
+            '-Xshare:dump',
+            f'-XX:SharedClassListFile={class_list}',
+            f'-XX:SharedArchiveFile={temp_path}',
+            '-cp', os.pathsep.join(str(x) for x in class_path)
+        ])
+    if rc != 0 or not temp_path.is_file():
+        if temp_path.exists():
+            temp_path.unlink()
+        raise IntellijError(f'Failed to generate the CDS archive: {(err or out).strip()}')
+
+    os.chown(temp_path, uid, gid)
+    temp_path.chmod(0o644)
+    os.replace(temp_path, archive_path)
+
+    # Archives for earlier builds
+    for stale_path in archive_path.parent.glob('idea-*.jsa'):
+        if stale_path != archive_path:
+            stale_path.unlink()
+
+    return True, archive_path
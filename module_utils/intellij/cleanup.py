@@ -0,0 +1,75 @@
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ansible.module_utils.intellij.common import directory_size, previous_version_dirs, previous_versions
+from ansible.module_utils.intellij.timing import count, phase
+
+
+def stale_version_dirs(current_dir: Path, keep: int) -> List[Path]:
+    # The current version counts towards the versions kept, newer versions
+    # (e.g. after a downgrade) are always kept
+    return [x for x in previous_version_dirs(current_dir)[max(keep - 1, 0):] if not x.is_symlink()]
+
+
+def split_version_dir(path: Path, version_dirname: str) -> Optional[Tuple[Path, Path]]:
+    # e.g. ~/.IdeaIC2019.3/config/plugins -> ~/.IdeaIC2019.3, config/plugins
+    if not version_dirname:
+        return None
+    for parent in [path] + list(path.parents):
+        if parent.name.lstrip('.') == version_dirname:
+            return parent, path.relative_to(parent)
+    return None
+
+
+def stale_user_dirs(user_dirs: List[Path], version_dirname: str, keep: int) -> List[Path]:
+    # The same directory of older versions (with the version in the same
+    # place in the path), the versions found in any of the user's
+    # directories count towards the versions kept e.g. with a keep of 2 the
+    # caches of 2019.3 (~/.IdeaIC2019.3/system) are removed once there's a
+    # 2024.2 (~/.cache/JetBrains/IdeaIC2024.2)
+    candidates = []
+    for user_dir in user_dirs:
+        split = split_version_dir(user_dir, version_dirname)
+        if split is None:
+            # Not version specific
+            continue
+        version_dir, relative_path = split
+        for version, previous_dir in previous_versions(version_dir):
+            path = previous_dir / relative_path
+            if path.is_dir() and not path.is_symlink():
+                candidates.append((version, path))
+
+    kept = sorted({x for x, _ in candidates}, reverse=True)[:max(keep - 1, 0)]
+    return sorted({x for version, x in candidates if version not in kept})
+
+
+def remove_dir(path: Path, check_mode: bool) -> Dict[str, Any]:
+    size = directory_size(path)
+    if not check_mode:
+        shutil.rmtree(str(path))
+    return {'path': str(path), 'bytes': size}
+
+
+def remove_stale_versions(
+        intellij_home: Path,
+        users_dirs: List[List[Path]],
+        version_dirname: str,
+        keep: int,
+        parallelism: int = 4,
+        check_mode: bool = False) -> Dict[str, Any]:
+    # users_dirs has the version specific directories of each user
+    stale_dirs = stale_version_dirs(intellij_home, keep)
+    for user_dirs in users_dirs:
+        stale_dirs += stale_user_dirs(user_dirs, version_dirname, keep)
+
+    with phase('cleanup'), ThreadPoolExecutor(max_workers=max(parallelism, 1)) as executor:
+        removed = list(executor.map(lambda x: remove_dir(x, check_mode), stale_dirs))
+
+    reclaimed_bytes = sum(x['bytes'] for x in removed)
+    if removed and not check_mode:
+        count('dirs_removed', len(removed))
+        count('bytes_reclaimed', reclaimed_bytes)
+
+    return {'removed': removed, 'reclaimed_bytes': reclaimed_bytes}
@@ -0,0 +1,155 @@
+import grp
+import os
+import pwd
+import re
+import shutil
+import stat
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+from ansible.module_utils.intellij.timing import phase
+
+
+class IntellijError(Exception):
+    """Raised when the IntelliJ installation or configuration can't be updated."""
+
+
+def resolve_owner(owner: str, group: str) -> Tuple[int, int, str]:
+    try:
+        uid = int(owner)
+    except ValueError:
+        try:
+            uid = pwd.getpwnam(owner).pw_uid
+        except KeyError:
+            raise IntellijError(f"User '{owner}' does not exist")
+
+    try:
+        username = pwd.getpwuid(uid).pw_name
+    except KeyError:
+        raise IntellijError(f"User '{owner}' does not exist")
+
+    try:
+        gid = int(group)
+    except ValueError:
+        try:
+            gid = grp.getgrnam(group).gr_gid
+        except KeyError:
+            raise IntellijError(f"Group '{group}' does not exist")
+
+    return uid, gid, username
+
+
+def expand_user_macros(username: str, text: str) -> str:
+    # The macros supported by IntelliJ in idea.properties
+    if '${user.home}' in text:
+        text = text.replace('${user.home}', str(Path('~' + username).expanduser()))
+    return text.replace('${user.name}', username)
+
+
+def user_path(username: str, path: str) -> Path:
+    return Path('~' + username, expand_user_macros(username, path)).expanduser()
+
+
+def make_dirs(path: Path, mode: int, uid: int, gid: int) -> None:
+    dirs_to_create = []
+
+    while not path.exists():
+        dirs_to_create.append(path)
+        if path.parent == path:
+            # Reached the root directory
+            break
+        path = path.parent
+
+    dirs_to_create.reverse()
+
+    for dir_path in dirs_to_create:
+        if not dir_path.exists():
+            dir_path.mkdir(mode=mode, exist_ok=True)
+            os.chown(str(dir_path), uid, gid)
+
+
+def write_file(path: Path, text: str, uid: int, gid: int, mode: int = 0o664, encoding: str = 'iso-8859-1') -> None:
+    # Keep the permissions of an existing file, new files get the given mode
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        pass
+
+    with phase('write'):
+        fd, tempname = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.')
+        try:
+            with os.fdopen(fd, 'w', encoding=encoding) as f:
+                f.write(text)
+            os.chown(tempname, uid, gid)
+            os.chmod(tempname, mode)
+            os.replace(tempname, str(path))
+        except BaseException:
+            os.remove(tempname)
+            raise
+
+
+def previous_versions(path: Path) -> List[Tuple[Tuple[int, ...], Path]]:
+    # Only directories named after the version are supported e.g.
+    # ~/.config/JetBrains/IdeaIC2024.3 -> IdeaIC2024.2, IdeaIC2024.1, ...
+    # /opt/idea/idea-community-2024.3.1 -> idea-community-2024.2.5, ...
+    # ~/.IdeaIC2019.3 -> .IdeaIC2019.2, ...
+    pattern = re.compile(r'^(?P<product>\.?[A-Za-z][A-Za-z-]*?)-?(?P<version>[0-9]+(?:\.[0-9]+)*)$')
+
+    def version(matcher: 're.Match[str]') -> Tuple[int, ...]:
+        return tuple(int(x) for x in matcher.group('version').split('.'))
+
+    matcher = pattern.match(path.name)
+    if not matcher or not path.parent.is_dir():
+        return []
+
+    previous = []
+    for sibling in path.parent.iterdir():
+        sibling_matcher = pattern.match(sibling.name)
+        if (sibling_matcher and sibling_matcher.group('product') == matcher.group('product')
+                and version(sibling_matcher) < version(matcher) and sibling.is_dir()):
+            previous.append((version(sibling_matcher), sibling))
+
+    return sorted(previous, reverse=True)
+
+
+def previous_version_dirs(path: Path) -> List[Path]:
+    return [x for _, x in previous_versions(path)]
+
+
+def directory_size(path: Path) -> int:
+    size = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                size += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def copy_path(src: Path, dest: Path, uid: int, gid: int, hardlink: bool = False) -> int:
+    files_copied = 0
+
+    def copy_file(src_file: str, dest_file: str) -> None:
+        nonlocal files_copied
+        files_copied += 1
+        if hardlink:
+            try:
+                os.link(src_file, dest_file)
+                return
+            except OSError:
+                # e.g. the directories are on different file systems
+                pass
+        shutil.copy2(src_file, dest_file)
+
+    if src.is_dir():
+        shutil.copytree(str(src), str(dest), symlinks=True, copy_function=copy_file)
+        for dirpath, dirnames, filenames in os.walk(dest):
+            for name in dirnames + filenames:
+                os.lchown(os.path.join(dirpath, name), uid, gid)
+    else:
+        copy_file(str(src), str(dest))
+    os.lchown(dest, uid, gid)
+
+    return files_copied
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ansible.module_utils.intellij.common import IntellijError, make_dirs, resolve_owner, user_path
+from ansible.module_utils.intellij.http import CIRCUIT_STATE_FILENAME, http_request
+from ansible.module_utils.intellij.timing import count, phase
+from ansible.module_utils.parsing.convert_bool import boolean
+
+# User list attribute -> directory in the user's config directory
+CONFIG_FILE_DIRS = {
+    'intellij_codestyles': 'codestyles',
+    'intellij_inspection_profiles': 'inspection'
+}
+
+CONTENT_PREFIX = 'intellij-config-'
+
+CONFIG_FILE_MODE = 0o664
+
+
+def file_sha256(path: Path) -> str:
+    hash_object = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            hash_object.update(chunk)
+    return hash_object.hexdigest()
+
+
+def content_path(download_cache: Path, digest: str) -> Path:
+    return download_cache / f'{CONTENT_PREFIX}{digest}.xml'
+
+
+def content_digest(path: Path) -> str:
+    # e.g. intellij-config-<sha256>.xml -> <sha256>
+    return path.name[len(CONTENT_PREFIX):-len('.xml')]
+
+
+def download_config_file(url: str, download_cache: Path, check_mode: bool) -> Tuple[Optional[Path], str]:
+    # Each URL is a symlink to the file named after its content, so the same
+    # file from different URLs is only stored once
+    url_link = download_cache / f'{CONTENT_PREFIX}url-{hashlib.sha256(url.encode()).hexdigest()}'
+    if url_link.is_file():
+        count('download_cache_hits')
+        path = url_link.resolve()
+        return path, content_digest(path)
+
+    status_code, resp, info = http_request(url, 'GET', 20, 'all', circuit_state=download_cache / CIRCUIT_STATE_FILENAME)
+
+    if 200 <= status_code < 300 and check_mode:
+        # Only hashed to compare with the installed files, the cache is left
+        # as it is
+        hash_object = hashlib.sha256()
+        try:
+            for chunk in iter(lambda: resp.read(65536), b''):
+                hash_object.update(chunk)
+        finally:
+            resp.close()
+        return None, hash_object.hexdigest()
+
+    if 200 <= status_code < 300:
+        # Download next to the destination so the final rename is atomic
+        fd, tempname = tempfile.mkstemp(dir=str(download_cache), prefix=f'.{CONTENT_PREFIX}')
+        hash_object = hashlib.sha256()
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: resp.read(65536), b''):
+                    hash_object.update(chunk)
+                    f.write(chunk)
+                count('downloads')
+                count('bytes_downloaded', f.tell())
+        except Exception as e:
+            os.remove(tempname)
+            raise IntellijError(f'Failed to create temporary content file: {e}')
+        finally:
+            resp.close()
+        os.chmod(tempname, 0o644)
+        path = content_path(download_cache, hash_object.hexdigest())
+        os.replace(tempname, str(path))
+
+        temp_link = url_link.with_name(f'.{url_link.name}.tmp')
+        if temp_link.is_symlink():
+            temp_link.unlink()
+        temp_link.symlink_to(path.name)
+        os.replace(str(temp_link), str(url_link))
+        return path, hash_object.hexdigest()
+
+    if resp:
+        resp.close()
+    raise IntellijError(f'Error downloading url "{url}": {info["msg"]}')
+
+
+def install_config_file(source: Optional[Path], digest: str, dest_path: Path, uid: int, gid: int, check_mode: bool) -> bool:
+    # The source is only None in check mode (content not downloaded)
+    if dest_path.is_file() and not dest_path.is_symlink():
+        dest_stat = dest_path.stat()
+        if (source is None or dest_stat.st_size == source.stat().st_size) and file_sha256(dest_path) == digest:
+            if (dest_stat.st_uid, dest_stat.st_gid, stat.S_IMODE(dest_stat.st_mode)) == (uid, gid, CONFIG_FILE_MODE):
+                return False
+            if dest_stat.st_nlink == 1:
+                # Files with the same content only need their owner and mode
+                # fixing (linked files are replaced by a copy instead)
+                if not check_mode:
+                    os.chown(dest_path, uid, gid, follow_symlinks=False)
+                    os.chmod(dest_path, CONFIG_FILE_MODE)
+                return True
+    if check_mode:
+        return True
+
+    # The directory belongs to the user, so the temporary file needs a name
+    # that can't be predicted (or planted as a symlink)
+    fd, tempname = tempfile.mkstemp(dir=str(dest_path.parent), prefix=f'.{dest_path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as f, open(source, 'rb') as source_file:
+            shutil.copyfileobj(source_file, f)
+        os.chown(tempname, uid, gid)
+        os.chmod(tempname, CONFIG_FILE_MODE)
+        os.replace(tempname, str(dest_path))
+    except BaseException:
+        os.remove(tempname)
+        raise
+    return True
+
+
+def config_file_source(config_file: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    # Files on the Ansible controller (src without remote_src) are left to the
+    # copy module
+    if 'src' in config_file:
+        return ('src', config_file['src']) if boolean(config_file.get('remote_src', False)) else None
+    if 'url' in config_file:
+        return 'url', config_file['url']
+    return None
+
+
+def install_config_files(
+        intellij_user_config_dir: str,
+        users: List[Dict[str, Any]],
+        download_cache: Path,
+        parallelism: int = 4,
+        check_mode: bool = False) -> Tuple[bool, List[Dict[str, str]]]:
+    user_entries = [
+        [
+            (dirname, config_file['name'], source)
+            for attribute, dirname in CONFIG_FILE_DIRS.items()
+            for config_file in user.get(attribute) or []
+            for source in [config_file_source(config_file)] if source
+        ]
+        for user in users
+    ]
+
+    urls = sorted({x[2][1] for entries in user_entries for x in entries if x[2][0] == 'url'})
+    paths = sorted({x[2][1] for entries in user_entries for x in entries if x[2][0] == 'src'})
+    if urls and not check_mode and not download_cache.is_dir():
+        download_cache.mkdir(mode=0o775, parents=True)
+
+    # Each distinct URL is only downloaded (and each file only hashed) once
+    sources: Dict[Tuple[str, str], Tuple[Optional[Path], str]] = {}
+    with phase('download'), ThreadPoolExecutor(max_workers=max(parallelism, 1)) as executor:
+        for url, content in zip(urls, executor.map(lambda x: download_config_file(x, download_cache, check_mode), urls)):
+            sources[('url', url)] = content
+
+    with phase('hash'):
+        for path in paths:
+            if not Path(path).is_file():
+                raise IntellijError(f'File not found: {path}')
+            sources[('src', path)] = (Path(path), file_sha256(Path(path)))
+
+    changed = False
+    installed: List[Dict[str, str]] = []
+    with phase('install'):
+        for user, entries in zip(users, user_entries):
+            username = user['username']
+            uid, gid, _ = resolve_owner(username, user.get('intellij_group') or username)
+            config_dir = user_path(username, intellij_user_config_dir)
+            for dirname in CONFIG_FILE_DIRS.values():
+                if (config_dir / dirname).is_symlink():
+                    raise IntellijError(f'Refusing to use {config_dir / dirname}: it is a symlink')
+                if not (config_dir / dirname).is_dir():
+                    changed = True
+                    if not check_mode:
+                        make_dirs(config_dir / dirname, 0o775, uid, gid)
+                        # Not restricted by the umask
+                        (config_dir / dirname).chmod(0o775)
+
+            for dirname, name, source in entries:
+                dest_path = config_dir / dirname / f'{name}.xml'
+                content = sources[source]
+                if install_config_file(content[0], content[1], dest_path, uid, gid, check_mode):
+                    installed.append({'username': username, 'path': str(dest_path)})
+
+    if installed and not check_mode:
+        count('config_files_installed', len(installed))
+    return changed or bool(installed), installed
@@ -0,0 +1,187 @@
+import email.utils
+import http.client
+import json
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ansible.module_utils.intellij.timing import count, phase
+from ansible.module_utils.urls import ConnectionError as UrlConnectionError, SSLValidationError, open_url
+
+HTTP_AGENT = 'ansible-httpget'
+
+# Responses that may succeed when retried (e.g. 404 won't)
+RETRY_STATUSES = frozenset([408, 429, 500, 502, 503, 504])
+THROTTLE_STATUSES = frozenset([429, 503])
+
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 20.0
+
+# Waiting longer than this for a rate limit to pass is slower than failing
+# and retrying the run later
+RETRY_AFTER_MAX_SECONDS = 60.0
+
+# After this many failed requests in a row to a host, requests to the host
+# fail straight away until the reset time has passed (then one request is let
+# through to test the host)
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECONDS = 30.0
+
+CIRCUIT_STATE_FORMAT = 1
+
+# Kept in the download directory, so the circuits are shared by the module
+# invocations of a run (each in its own process) and the runs that follow
+CIRCUIT_STATE_FILENAME = 'intellij-http-circuits.json'
+
+Response = Tuple[int, Any, Dict[str, str]]
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.lock = threading.Lock()
+        # host -> failures in a row and the (wall clock) time the circuit
+        # opened, for the requests made without a state file
+        self.circuits: Dict[str, Dict[str, float]] = {}
+
+    def load(self, state_path: Optional[Path]) -> Dict[str, Dict[str, float]]:
+        if state_path is None:
+            return self.circuits
+        try:
+            state = json.loads(state_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(state, dict) or state.get('format') != CIRCUIT_STATE_FORMAT:
+            return {}
+        return state.get('hosts', {})
+
+    def save(self, state_path: Optional[Path], circuits: Dict[str, Dict[str, float]]) -> None:
+        if state_path is None or not state_path.parent.is_dir():
+            return
+        fd, tempname = tempfile.mkstemp(dir=str(state_path.parent), prefix='.intellij-http-circuits-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'format': CIRCUIT_STATE_FORMAT, 'hosts': circuits}, f, indent=2, sort_keys=True)
+            os.chmod(tempname, 0o644)
+            os.replace(tempname, str(state_path))
+        except BaseException:
+            os.remove(tempname)
+            raise
+
+    def allow(self, host: str, state_path: Optional[Path] = None) -> bool:
+        with self.lock:
+            circuits = self.load(state_path)
+            opened = circuits.get(host, {}).get('opened')
+            if opened is None:
+                return True
+            if 0 <= time.time() - opened < self.reset_seconds:
+                return False
+            # Half open, fails straight away again unless this request succeeds
+            circuits[host] = {'failures': self.failure_threshold - 1, 'opened': time.time()}
+            self.save(state_path, circuits)
+            return True
+
+    def record(self, host: str, success: bool, state_path: Optional[Path] = None) -> None:
+        with self.lock:
+            circuits = self.load(state_path)
+            if success:
+                if circuits.pop(host, None) is not None:
+                    self.save(state_path, circuits)
+                return
+            circuit = circuits.setdefault(host, {'failures': 0})
+            circuit['failures'] = circuit.get('failures', 0) + 1
+            if circuit['failures'] >= self.failure_threshold:
+                circuit['opened'] = time.time()
+            self.save(state_path, circuits)
+
+
+_circuit_breaker = CircuitBreaker()
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    # Either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_time = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_time is None:
+        return None
+    return max(retry_time.timestamp() - time.time(), 0.0)
+
+
+def backoff_seconds(attempt: int) -> float:
+    # Exponential backoff with full jitter, so many hosts retrying at the same
+    # time don't all hit the server together again
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+def send_request(url: str, method: str, timeout: int, follow_redirects: str) -> Response:
+    count('http_requests')
+    try:
+        # The time until the response headers are received
+        with phase('http'):
+            resp = open_url(url, method=method, timeout=timeout, follow_redirects=follow_redirects, http_agent=HTTP_AGENT)
+    except urllib.error.HTTPError as e:
+        headers = e.headers or {}
+        return e.code, None, {'msg': str(e), 'location': headers.get('Location', ''), 'retry_after': headers.get('Retry-After', '')}
+    except (urllib.error.URLError, socket.error, UrlConnectionError, SSLValidationError, http.client.HTTPException, ValueError) as e:
+        # e.g. connection resets, TLS failures and truncated responses, like fetch_url
+        return -1, None, {'msg': f'Request failed: {e}'}
+
+    return resp.getcode(), resp, {'msg': 'OK', 'location': resp.headers.get('Location', '')}
+
+
+def http_request(
+        url: str,
+        method: str,
+        timeout: int,
+        follow_redirects: str,
+        max_attempts: int = MAX_ATTEMPTS,
+        circuit_state: Optional[Path] = None) -> Response:
+    host = urllib.parse.urlsplit(url).netloc
+
+    attempt = 1
+    while True:
+        if not _circuit_breaker.allow(host, circuit_state):
+            count('http_circuit_open')
+            return -1, None, {'msg': f'Too many failed requests to {host}, not retrying for {CIRCUIT_RESET_SECONDS:.0f} seconds'}
+
+        status_code, resp, info = send_request(url, method, timeout, follow_redirects)
+        retry = status_code == -1 or status_code in RETRY_STATUSES
+        # Rate limiting isn't a failure of the host
+        if status_code != 429:
+            _circuit_breaker.record(host, not retry, circuit_state)
+        if status_code in THROTTLE_STATUSES:
+            count('http_throttled')
+        if not retry or attempt >= max_attempts:
+            return status_code, resp, info
+
+        delay = backoff_seconds(attempt)
+        if status_code in THROTTLE_STATUSES:
+            retry_after = retry_after_seconds(info.get('retry_after'))
+            if retry_after is not None and retry_after > RETRY_AFTER_MAX_SECONDS:
+                info['msg'] = f"{info['msg']} (retry after {retry_after:.0f} seconds)"
+                return status_code, resp, info
+            if retry_after is not None:
+                # Plus some jitter, so the hosts told to wait don't all come back together
+                delay = retry_after + random.uniform(0, BACKOFF_BASE_SECONDS)
+
+        count('http_retries')
+        with phase('http_backoff'):
+            time.sleep(delay)
+        attempt += 1
@@ -0,0 +1,92 @@
+import os
+import shutil
+import stat
+from pathlib import Path
+from typing import Any, Dict
+
+from ansible.module_utils.intellij.common import IntellijError, make_dirs
+from ansible.module_utils.intellij.plugins import get_build_number
+from ansible.module_utils.intellij.timing import count, phase
+
+SHARED_INDEX_DIRNAME = 'shared-index'
+
+
+def seed_index_file(source_path: Path, dest_path: Path, uid: int, gid: int) -> bool:
+    # The directory belongs to the user, so the file is only created if
+    # nothing (not even a dangling symlink) is there already
+    try:
+        fd = os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+    except FileExistsError:
+        return False
+    try:
+        source_stat = source_path.stat()
+        with os.fdopen(fd, 'wb') as f, open(source_path, 'rb') as source_file:
+            shutil.copyfileobj(source_file, f)
+            os.fchown(f.fileno(), uid, gid)
+            os.fchmod(f.fileno(), stat.S_IMODE(source_stat.st_mode))
+            f.flush()
+            os.utime(f.fileno(), ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    except BaseException:
+        os.remove(dest_path)
+        raise
+    return True
+
+
+def check_index_dir(path: Path) -> None:
+    if path.is_symlink():
+        raise IntellijError(f'Refusing to use {path}: it is a symlink')
+
+
+def seed_index_dir(source_dir: Path, index_dir: Path, uid: int, gid: int, hardlink: bool, check_mode: bool) -> int:
+    # Files already in the index cache (e.g. downloaded by the IDE) are kept
+    seeded = 0
+    check_index_dir(index_dir)
+    for dirpath, _, filenames in os.walk(source_dir):
+        dest_dir = index_dir / Path(dirpath).relative_to(source_dir)
+        check_index_dir(dest_dir)
+        for filename in filenames:
+            dest_path = dest_dir / filename
+            if os.path.lexists(dest_path):
+                continue
+            if check_mode:
+                seeded += 1
+                continue
+            make_dirs(dest_dir, 0o775, uid, gid)
+            if hardlink:
+                # Hardlinks share the mirror's file (and owner) between users
+                try:
+                    os.link(Path(dirpath) / filename, dest_path)
+                    seeded += 1
+                    continue
+                except FileExistsError:
+                    continue
+                except OSError:
+                    # e.g. the directories are on different file systems
+                    pass
+            if seed_index_file(Path(dirpath) / filename, dest_path, uid, gid):
+                seeded += 1
+    return seeded
+
+
+def seed_index_cache(
+        intellij_home: Path,
+        intellij_user_system_dir: Path,
+        source: Path,
+        uid: int,
+        gid: int,
+        hardlink: bool = False,
+        check_mode: bool = False) -> Dict[str, Any]:
+    # The mirror has a copy of the shared-index directory for each build, as
+    # downloaded by the IDE (it only attaches the indexes it would have
+    # downloaded itself) e.g. <source>/243.26053.27/...
+    build_number = get_build_number(intellij_home)
+    build_dir = source / build_number
+    if not build_dir.is_dir():
+        return {'seeded': 0, 'missing': build_number}
+
+    with phase('seed_index_cache'):
+        seeded = seed_index_dir(build_dir, intellij_user_system_dir / SHARED_INDEX_DIRNAME, uid, gid, hardlink, check_mode)
+
+    if seeded and not check_mode:
+        count('index_cache_files_seeded', seeded)
+    return {'seeded': seeded, 'missing': None}
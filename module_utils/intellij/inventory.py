@@ -0,0 +1,150 @@
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ansible.module_utils.intellij.common import IntellijError, user_path, write_file
+from ansible.module_utils.intellij.jdk import index_jdks
+from ansible.module_utils.intellij.plugins import get_build_number, load_plugin_index, plugin_stamp, read_plugin_descriptor, save_plugin_index
+from ansible.module_utils.intellij.timing import count, phase
+from ansible.module_utils.intellij.xmlutil import find_or_create, load_document
+
+INVENTORY_FORMAT = 1
+
+
+def load_inventory(fact_path: Path) -> Dict[str, Any]:
+    try:
+        inventory = json.loads(fact_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(inventory, dict) or inventory.get('format') != INVENTORY_FORMAT:
+        return {}
+    return inventory
+
+
+def list_plugins(
+        plugins_dir: Path,
+        cached: Dict[str, Dict[str, Any]],
+        index_path: Optional[Path] = None,
+        check_mode: bool = False) -> List[Dict[str, Any]]:
+    # The descriptors are cached in the plugin index (see index_plugins), so
+    # the stamps aren't part of the inventory
+    if not plugins_dir.is_dir():
+        return []
+
+    entries = {}
+    plugins = []
+    for plugin_path in sorted(plugins_dir.iterdir()):
+        if plugin_path.name.startswith('.'):
+            continue
+        if not (plugin_path.is_dir() or plugin_path.suffix == '.jar'):
+            # Not listed, but kept in the index (index_plugins indexes it)
+            if str(plugin_path) in cached:
+                entries[str(plugin_path)] = cached[str(plugin_path)]
+            continue
+
+        stamp = plugin_stamp(plugin_path)
+        entry = cached.get(str(plugin_path))
+        if entry is not None and entry.get('stamp') == stamp:
+            count('plugin_descriptors_avoided')
+        else:
+            try:
+                descriptor = read_plugin_descriptor(plugin_path)
+            except (OSError, ValueError, SyntaxError, zipfile.BadZipFile):
+                descriptor = None
+            count('plugin_descriptors_read')
+            entry = {'stamp': stamp, 'descriptor': descriptor}
+        entries[str(plugin_path)] = entry
+
+        # An unreadable plugin is still listed, just without its details
+        descriptor = entry['descriptor'] or {}
+        plugins.append({
+            'id': descriptor.get('id'),
+            'name': descriptor.get('name'),
+            'version': descriptor.get('version'),
+            'since_build': descriptor.get('since_build'),
+            'until_build': descriptor.get('until_build'),
+            'path': str(plugin_path)
+        })
+
+    stale = {k: v for k, v in cached.items() if Path(k).parent == plugins_dir}
+    if index_path is not None and entries != stale and not check_mode and index_path.parent.is_dir():
+        save_plugin_index(index_path, plugins_dir, entries)
+    return plugins
+
+
+def list_jdks(intellij_user_config_dir: Path) -> List[Dict[str, Optional[str]]]:
+    jdk_table_path = intellij_user_config_dir / 'options' / 'jdk.table.xml'
+    jdk_table_root, _ = load_document(jdk_table_path)
+    project_jdk_table = find_or_create(jdk_table_root, 'component', 'ProjectJdkTable')
+
+    jdks = []
+    for jdk_name, jdk in index_jdks(project_jdk_table).items():
+        home_node = jdk.find('./homePath')
+        version_node = jdk.find('./version')
+        jdks.append({
+            'name': jdk_name,
+            'home': home_node.get('value') if home_node is not None else None,
+            'version': version_node.get('value') if version_node is not None else None
+        })
+    return jdks
+
+
+def build_inventory(
+        intellij_home: Path,
+        intellij_user_config_dir: str,
+        intellij_user_plugins_dir: str,
+        usernames: List[str],
+        shared_plugins_dir: Optional[Path] = None,
+        plugin_index_path: Optional[Path] = None,
+        check_mode: bool = False) -> Dict[str, Any]:
+    try:
+        build_number = get_build_number(intellij_home)
+    except (IntellijError, OSError, ValueError, KeyError):
+        build_number = None
+
+    cached = load_plugin_index(plugin_index_path) if plugin_index_path is not None else {}
+
+    users = {}
+    with phase('inventory'):
+        for username in usernames:
+            users[username] = {
+                'plugins': list_plugins(user_path(username, intellij_user_plugins_dir), cached, plugin_index_path, check_mode),
+                'jdks': list_jdks(user_path(username, intellij_user_config_dir))
+            }
+
+    inventory = {
+        'format': INVENTORY_FORMAT,
+        'home': str(intellij_home),
+        'build_number': build_number,
+        'users': users
+    }
+    if shared_plugins_dir is not None:
+        inventory['shared_plugins'] = list_plugins(shared_plugins_dir, cached, plugin_index_path, check_mode)
+    return inventory
+
+
+def update_inventory_fact(
+        fact_path: Path,
+        intellij_home: Path,
+        intellij_user_config_dir: str,
+        intellij_user_plugins_dir: str,
+        usernames: List[str],
+        shared_plugins_dir: Optional[Path] = None,
+        plugin_index_path: Optional[Path] = None,
+        check_mode: bool = False) -> Tuple[bool, Dict[str, Any]]:
+    previous = load_inventory(fact_path)
+
+    inventory = build_inventory(
+        intellij_home, intellij_user_config_dir, intellij_user_plugins_dir, usernames, shared_plugins_dir, plugin_index_path, check_mode)
+
+    changed = inventory != previous
+    if changed and not check_mode:
+        if not fact_path.parent.is_dir():
+            raise IntellijError(f'Directory not found: {fact_path.parent}')
+        write_file(fact_path, json.dumps(inventory, indent=2, sort_keys=True) + '\n', os.getuid(), os.getgid(),
+                   mode=0o644, encoding='utf-8')
+
+    return changed, inventory
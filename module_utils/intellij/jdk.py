@@ -0,0 +1,433 @@
+import json
+import os
+import pwd
+import subprocess
+import tempfile
+import xml.sax.saxutils
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ansible.module_utils.intellij.common import IntellijError, make_dirs, write_file
+from ansible.module_utils.intellij.timing import count, phase
+from ansible.module_utils.intellij.xmlutil import etree, find_or_create, load_document, pretty_print, replace_child
+
+JDK_CATALOG_FORMAT = 1
+
+JDK_INFO_FIELDS = ('version', 'class_roots', 'source_roots')
+
+
+def run_java(args: List[str], cwd: Optional[Path] = None) -> Tuple[int, str, str]:
+    count('java_processes')
+    process = subprocess.run(
+        args,
+        cwd=None if cwd is None else str(cwd),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    return process.returncode, process.stdout, process.stderr
+
+
+def get_java_version(jdk_home: Path) -> str:
+    executable = jdk_home / 'bin' / 'java'
+    if not executable.is_file():
+        raise IntellijError(f'File not found: {executable}')
+
+    rc, out, err = run_java([str(executable), '-version'])
+    if rc != 0:
+        raise IntellijError(f'Error while querying Java version: {out + err}')
+    return err.splitlines()[0]
+
+
+def get_specification_version(jdk_home: Path) -> str:
+    javac = jdk_home / 'bin' / 'javac'
+    if not javac.is_file():
+        raise IntellijError(f'File not found: {javac}')
+
+    java = jdk_home / 'bin' / 'java'
+    if not java.is_file():
+        raise IntellijError(f'File not found: {java}')
+
+    with tempfile.TemporaryDirectory() as dirpath:
+        dirpath = Path(dirpath)
+        src_file = dirpath / 'SpecificationVersion.java'
+        src_file.write_text('''
+public class SpecificationVersion {
+    public static void main(String[] args) {
+        System.out.print(System.getProperty("java.specification.version"));
+    }
+}
+''')
+        rc, out, err = run_java([str(javac), 'SpecificationVersion.java'], cwd=dirpath)
+        if rc != 0 or err:
+            raise IntellijError(f'Error while querying Java specification version: {out}{err}')
+
+        rc, out, err = run_java([str(java), 'SpecificationVersion'], cwd=dirpath)
+        if rc != 0 or err:
+            raise IntellijError(f'Error while querying Java specification version: {out}{err}')
+
+        return out.strip()
+
+
+def read_release(jdk_home: Path) -> Dict[str, str]:
+    # The release file of the JDK e.g. JAVA_VERSION="17.0.2"
+    release = {}
+    try:
+        text = (jdk_home / 'release').read_text(encoding='utf-8', errors='replace')
+    except OSError:
+        return release
+    for line in text.splitlines():
+        key, sep, value = line.partition('=')
+        if sep:
+            release[key.strip()] = value.strip().strip('"')
+    return release
+
+
+def get_class_path(jdk_home: Path) -> List[str]:
+    jre_lib = jdk_home / 'jre' / 'lib'
+
+    jre_ext = jre_lib / 'ext'
+
+    jmods = jdk_home / 'jmods'
+
+    if jre_ext.is_dir():
+
+        files = list(jre_lib.iterdir()) + list(jre_ext.iterdir())
+
+        files = [x for x in files if x.is_file() and x.suffix == '.jar']
+
+        files = sorted(files)
+
+        return [f'jar://{str(x)}!/' for x in files]
+
+    elif jmods.is_dir():
+
+        files = list(jmods.iterdir())
+
+        files = [x for x in files if x.is_file() and x.suffix == '.jmod']
+
+        module_names = [x.stem for x in files]
+
+        module_names = sorted(module_names)
+
+        return [f'jrt://{jdk_home}!/{x}' for x in module_names]
+
+    elif (jdk_home / 'lib' / 'modules').is_file() and read_release(jdk_home).get('MODULES'):
+        # e.g. Debian JDKs without the jmods package, the modules in the
+        # runtime image are listed in the release file
+        module_names = sorted(read_release(jdk_home)['MODULES'].split())
+
+        return [f'jrt://{jdk_home}!/{x}' for x in module_names]
+
+    else:
+        raise IntellijError(
+            f"Unsupported JDK directory layout: {jdk_home}. If you're "
+            "using Java > 9 you may need to install the "
+            "jmods package e.g. yum install "
+            "java-11-openjdk-jmods."
+        )
+
+
+def get_source_path(jdk_home: Path) -> List[str]:
+    jmod_src = jdk_home / 'lib' / 'src.zip'
+
+    if jmod_src.is_file():
+
+        with zipfile.ZipFile(jmod_src, 'r') as srczip:
+            files = srczip.namelist()
+
+        files = [x for x in files if x.endswith('/module-info.java')]
+
+        module_names = [x[:-len('/module-info.java')] for x in files]
+
+        module_names = sorted(module_names)
+
+        return [f'jar://{jmod_src}!/{x}' for x in module_names]
+
+    elif jdk_home.is_dir():
+
+        files = list(jdk_home.iterdir())
+
+        files = [x for x in files if x.is_file() and x.name.endswith('src.zip')]
+
+        files = sorted(files)
+
+        return [f'jar://{x}!/' for x in files]
+
+    else:
+        raise IntellijError(f'Directory not found: {jdk_home}')
+
+
+JDK_INFO_PROVIDERS: Dict[str, Callable[[Path], Any]] = {
+    'version': get_java_version,
+    'specification_version': get_specification_version,
+    'class_roots': get_class_path,
+    'source_roots': get_source_path
+}
+
+
+def jdk_stamp(jdk_home: Path) -> List[Optional[List[int]]]:
+    # The directories whose contents determine the class and source roots,
+    # any JDK (re)install or package update will change at least one of these.
+    paths = [
+        jdk_home,
+        jdk_home / 'bin' / 'java',
+        jdk_home / 'release',
+        jdk_home / 'lib',
+        jdk_home / 'lib' / 'src.zip',
+        jdk_home / 'jmods',
+        jdk_home / 'jre' / 'lib',
+        jdk_home / 'jre' / 'lib' / 'ext'
+    ]
+
+    stamp = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            stamp.append(None)
+        else:
+            stamp.append([stat.st_ino, stat.st_mtime_ns])
+    return stamp
+
+
+def load_jdk_catalog(catalog_path: Path) -> Dict[str, Any]:
+    try:
+        catalog = json.loads(catalog_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(catalog, dict) or catalog.get('format') != JDK_CATALOG_FORMAT:
+        return {}
+
+    return catalog.get('jdks', {})
+
+
+def save_jdk_catalog_entry(catalog_path: Path, jdk_home: Path, entry: Dict[str, Any]) -> None:
+    # Re-read the catalog so entries written by other modules aren't lost
+    jdks = load_jdk_catalog(catalog_path)
+    jdks[str(jdk_home)] = entry
+
+    if not catalog_path.parent.is_dir():
+        catalog_path.parent.mkdir(mode=0o775, parents=True)
+
+    fd, tempname = tempfile.mkstemp(dir=str(catalog_path.parent), prefix='.jdk-catalog-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'format': JDK_CATALOG_FORMAT, 'jdks': jdks}, f, indent=2, sort_keys=True)
+        os.chmod(tempname, 0o644)
+        os.replace(tempname, str(catalog_path))
+    except BaseException:
+        os.remove(tempname)
+        raise
+
+
+def get_jdk_info(
+        jdk_home: Path,
+        catalog_path: Optional[Path] = None,
+        fields: Iterable[str] = JDK_INFO_FIELDS,
+        check_mode: bool = False) -> Dict[str, Any]:
+    stamp = jdk_stamp(jdk_home)
+
+    entry = None
+    if catalog_path is not None:
+        entry = load_jdk_catalog(catalog_path).get(str(jdk_home))
+    if entry is None or entry.get('stamp') != stamp:
+        entry = {'stamp': stamp}
+
+    updated = False
+    for field in fields:
+        if field in entry:
+            count('jdk_probes_avoided')
+        else:
+            with phase(f'jdk_{field}'):
+                entry[field] = JDK_INFO_PROVIDERS[field](jdk_home)
+            updated = True
+
+    if updated and catalog_path is not None and not check_mode:
+        save_jdk_catalog_entry(catalog_path, jdk_home, entry)
+
+    return entry
+
+
+def root_elements(urls: List[str]) -> str:
+    elements = [f'<root url={xml.sax.saxutils.quoteattr(x)} type="simple" />' for x in urls]
+    return "\n".join(elements)
+
+
+def create_jdk_xml(jdk_name: str, jdk_home: Path, jdk_info: Dict[str, Any]) -> Any:
+    java_version = jdk_info['version']
+    class_path = root_elements(jdk_info['class_roots'])
+    source_path = root_elements(jdk_info['source_roots'])
+
+    return etree.fromstring(f'''
+<jdk version="2">
+  <name value={xml.sax.saxutils.quoteattr(jdk_name)} />
+  <type value="JavaSDK" />
+  <version value={xml.sax.saxutils.quoteattr(java_version)} />
+  <homePath value={xml.sax.saxutils.quoteattr(str(jdk_home))} />
+  <roots>
+    <annotationsPath>
+      <root type="composite">
+        <root url="jar://$APPLICATION_HOME_DIR$/lib/jdkAnnotations.jar!/"
+              type="simple" />
+      </root>
+    </annotationsPath>
+    <classPath>
+      <root type="composite">{class_path}</root>
+    </classPath>
+    <javadocPath>
+      <root type="composite" />
+    </javadocPath>
+    <sourcePath>
+      <root type="composite">{source_path}</root>
+    </sourcePath>
+  </roots>
+  <additional />
+</jdk>''')
+
+
+def is_supported_jdk(jdk_home: Path) -> bool:
+    # A JDK rather than a JRE, with the release file every JDK build has
+    return (
+        (jdk_home / 'bin' / 'java').is_file()
+        and (jdk_home / 'bin' / 'javac').is_file()
+        and (jdk_home / 'release').is_file()
+    )
+
+
+def scan_jdk_root(root: Path) -> List[Path]:
+    if not root.is_dir():
+        return []
+
+    return sorted(x for x in root.iterdir() if x.is_dir() and is_supported_jdk(x))
+
+
+def discover_jdks(roots: List[Path], exclude: List[Path], taken_names: Iterable[str] = ()) -> List[Tuple[str, Path]]:
+    with phase('discover'), ThreadPoolExecutor(max_workers=max(1, len(roots))) as executor:
+        candidates = [x for homes in executor.map(scan_jdk_root, roots) for x in homes]
+
+    # Distributions install aliases (e.g. /usr/lib/jvm/default-java) as
+    # symlinks; prefer the real directory and only register each JDK once.
+    candidates.sort(key=lambda x: (x.is_symlink(), str(x)))
+
+    seen = {x.resolve() for x in exclude}
+    names = set(taken_names)
+    jdks = []
+    for jdk_home in candidates:
+        real_home = jdk_home.resolve()
+        if real_home in seen:
+            continue
+        seen.add(real_home)
+        # Different JDKs with the same directory name under different roots
+        # e.g. /usr/lib/jvm/jdk-17 and /opt/java/jdk-17 -> jdk-17 (/opt/java)
+        jdk_name = jdk_home.name
+        if jdk_name in names:
+            jdk_name = f'{jdk_home.name} ({jdk_home.parent})'
+        if jdk_name in names:
+            raise IntellijError(f'More than one JDK named "{jdk_name}"')
+        names.add(jdk_name)
+        jdks.append((jdk_name, jdk_home))
+    return jdks
+
+
+def jdk_home_exists(jdk: Any, user_home: Path) -> bool:
+    type_node = jdk.find('./type')
+    if type_node is None or type_node.attrib.get('value') != 'JavaSDK':
+        return True
+
+    path_node = jdk.find('./homePath')
+    if path_node is None or path_node.attrib.get('value') is None:
+        return True
+
+    path = path_node.attrib['value'].replace('$USER_HOME$', str(user_home))
+    if '$' in path:
+        # Other path macros can only be resolved by IntelliJ
+        return True
+
+    return Path(path).is_dir()
+
+
+def index_jdks(project_jdk_table: Any) -> Dict[str, Any]:
+    jdks = {}
+    for jdk in project_jdk_table.findall('./jdk'):
+        name_node = jdk.find('./name')
+        if name_node is not None and name_node.attrib.get('value') is not None:
+            jdks.setdefault(name_node.attrib['value'], jdk)
+    return jdks
+
+
+def configure_jdks(
+        intellij_user_config_dir: Path,
+        jdks: List[Tuple[str, Path]],
+        uid: int,
+        gid: int,
+        catalog_path: Optional[Path] = None,
+        remove_missing: bool = False,
+        check_mode: bool = False) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+    options_dir = intellij_user_config_dir / 'options'
+    jdk_table_path = options_dir / 'jdk.table.xml'
+
+    jdk_table_root, before = load_document(jdk_table_path)
+
+    project_jdk_table = find_or_create(jdk_table_root, 'component', 'ProjectJdkTable')
+
+    # Index the existing JDKs by name once rather than searching per JDK
+    existing_jdks = index_jdks(project_jdk_table)
+
+    result = {'added': [], 'updated': [], 'removed': []}
+
+    for jdk_name, jdk_home in jdks:
+        jdk_info = get_jdk_info(jdk_home, catalog_path, check_mode=check_mode)
+        new_jdk = create_jdk_xml(jdk_name, jdk_home, jdk_info)
+
+        old_jdk = existing_jdks.get(jdk_name)
+        if old_jdk is None:
+            project_jdk_table.append(new_jdk)
+            result['added'].append(jdk_name)
+        elif pretty_print(old_jdk) != pretty_print(new_jdk):
+            replace_child(project_jdk_table, old_jdk, new_jdk)
+            result['updated'].append(jdk_name)
+        existing_jdks[jdk_name] = new_jdk
+
+    if remove_missing:
+        configured_names = {jdk_name for jdk_name, _ in jdks}
+        user_home = Path(pwd.getpwuid(uid).pw_dir)
+        for jdk_name, jdk in existing_jdks.items():
+            if jdk_name not in configured_names and not jdk_home_exists(jdk, user_home):
+                project_jdk_table.remove(jdk)
+                result['removed'].append(jdk_name)
+
+    changed = any(result.values())
+
+    after = pretty_print(jdk_table_root)
+
+    if changed and not check_mode:
+        make_dirs(options_dir, 0o775, uid, gid)
+        write_file(jdk_table_path, after, uid, gid)
+
+    return result, {'before': before, 'after': after}
+
+
+def find_jdk_home(intellij_user_config_dir: Path, jdk_name: str) -> Path:
+    jdk_table_path = intellij_user_config_dir / 'options' / 'jdk.table.xml'
+    if not jdk_table_path.is_file():
+        raise IntellijError(f'File not found: {jdk_table_path}')
+
+    jdk_table_root, _ = load_document(jdk_table_path)
+    project_jdk_table = find_or_create(jdk_table_root, 'component', 'ProjectJdkTable')
+    jdk = index_jdks(project_jdk_table).get(jdk_name)
+    if jdk is None:
+        raise IntellijError(f'Unable to find JDK with name "{jdk_name}" in jdk.table.xml')
+
+    path_node = jdk.find('./homePath')
+    if path_node is None:
+        raise IntellijError(f'Invalid XML: homePath missing for JDK: {jdk_name}')
+
+    path = path_node.attrib.get('value')
+    if path is None:
+        raise IntellijError(f'Invalid XML: homePath/@value missing for JDK: {jdk_name}')
+
+    return Path(path)
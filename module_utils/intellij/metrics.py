@@ -0,0 +1,144 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ansible.module_utils.intellij.common import IntellijError, directory_size
+from ansible.module_utils.intellij.plugins import get_build_number
+
+METRICS_FILENAME = 'intellij.prom'
+
+Sample = Tuple[Dict[str, str], float]
+
+
+def iter_module_results(registered: Any) -> Iterator[Dict[str, Any]]:
+    # A registered loop task holds one result per item
+    if not isinstance(registered, dict):
+        return
+    for result in registered.get('results', [registered]):
+        if isinstance(result, dict) and not result.get('skipped'):
+            yield result
+
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def format_metric(name: str, help_text: str, samples: List[Sample]) -> str:
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+    for labels, value in samples:
+        label_text = ','.join(f'{key}="{escape_label(str(label))}"' for key, label in sorted(labels.items()))
+        lines.append(f'{name}{{{label_text}}} {format_value(value)}' if label_text else f'{name} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def collect_metrics(
+        start_time: float,
+        end_time: float,
+        failed: bool,
+        intellij_home: Optional[Path],
+        download_cache: Optional[Path],
+        plugin_results: Any,
+        module_results: List[Any]) -> str:
+    timings: Dict[str, float] = {}
+    counters: Dict[str, int] = {}
+    plugins = {'installed': 0, 'skipped': 0, 'failed': 0}
+
+    for registered in [plugin_results] + module_results:
+        for result in iter_module_results(registered):
+            failed = failed or bool(result.get('failed'))
+            for phase, seconds in result.get('timings', {}).items():
+                timings[phase] = timings.get(phase, 0.0) + seconds
+            for name, value in result.get('counters', {}).items():
+                counters[name] = counters.get(name, 0) + value
+
+    # The download counters of the plugin installs only (config files are
+    # downloaded into the same cache)
+    plugin_counters: Dict[str, int] = {}
+    for result in iter_module_results(plugin_results):
+        if result.get('failed'):
+            plugins['failed'] += 1
+        elif result.get('changed'):
+            plugins['installed'] += 1
+        else:
+            plugins['skipped'] += 1
+        for name, value in result.get('counters', {}).items():
+            plugin_counters[name] = plugin_counters.get(name, 0) + value
+
+    cache_hits = plugin_counters.get('download_cache_hits', 0)
+    cache_lookups = cache_hits + plugin_counters.get('downloads', 0)
+
+    metrics = [
+        format_metric('intellij_provisioning_duration_seconds', 'Duration of the last IntelliJ IDEA provisioning run.',
+                      [({}, round(end_time - start_time, 3))]),
+        format_metric('intellij_provisioning_timestamp_seconds', 'Time the last IntelliJ IDEA provisioning run finished.',
+                      [({}, round(end_time))]),
+        format_metric('intellij_provisioning_success', 'Whether the last IntelliJ IDEA provisioning run succeeded.',
+                      [({}, 0 if failed else 1)]),
+        format_metric('intellij_provisioning_phase_duration_seconds', 'Time spent in each phase of the IntelliJ IDEA modules.',
+                      [({'phase': phase}, round(seconds, 6)) for phase, seconds in sorted(timings.items())]),
+        format_metric('intellij_plugins', 'Number of IntelliJ IDEA plugins by result of the last run.',
+                      [({'state': state}, value) for state, value in plugins.items()]),
+        format_metric('intellij_plugin_download_bytes', 'Bytes of IntelliJ IDEA plugins downloaded by the last run.',
+                      [({}, plugin_counters.get('bytes_downloaded', 0))]),
+        format_metric('intellij_plugin_download_cache_hit_ratio', 'Fraction of IntelliJ IDEA plugins found in the download cache.',
+                      [({}, round(cache_hits / cache_lookups, 4) if cache_lookups else 1)]),
+        format_metric('intellij_http_requests', 'HTTP requests made by the IntelliJ IDEA modules, by kind.',
+                      [({'kind': kind}, counters.get(f'http_{kind}', 0)) for kind in ('requests', 'retries', 'throttled', 'circuit_open')])
+    ]
+
+    if download_cache is not None and download_cache.is_dir():
+        metrics.append(format_metric('intellij_download_cache_bytes', 'Size of the IntelliJ IDEA download cache.',
+                                     [({}, directory_size(download_cache))]))
+
+    if intellij_home is not None:
+        try:
+            build_number = get_build_number(intellij_home)
+        except (IntellijError, OSError, ValueError, KeyError):
+            build_number = None
+        if build_number is not None:
+            metrics.append(format_metric('intellij_build_info', 'Installed IntelliJ IDEA build.',
+                                         [({'build': build_number, 'home': str(intellij_home)}, 1)]))
+
+    return ''.join(metrics)
+
+
+def write_textfile(textfile_dir: Path, text: str) -> Path:
+    path = textfile_dir / METRICS_FILENAME
+    # node_exporter may read the directory at any time, so never expose a
+    # partially written file (it ignores files not ending with .prom).
+    fd, tempname = tempfile.mkstemp(dir=str(textfile_dir), prefix=f'.{METRICS_FILENAME}.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.chmod(tempname, 0o644)
+        os.replace(tempname, str(path))
+    except BaseException:
+        os.remove(tempname)
+        raise
+    return path
+
+
+def export_metrics(
+        textfile_dir: Path,
+        start_time: float,
+        failed: bool,
+        intellij_home: Optional[Path],
+        download_cache: Optional[Path],
+        plugin_results: Any,
+        module_results: List[Any],
+        check_mode: bool = False) -> Tuple[Path, str]:
+    if not textfile_dir.is_dir():
+        raise IntellijError(f'Directory not found: {textfile_dir}')
+
+    text = collect_metrics(start_time, time.time(), failed, intellij_home, download_cache, plugin_results, module_results)
+
+    path = textfile_dir / METRICS_FILENAME
+    if not check_mode:
+        write_textfile(textfile_dir, text)
+    return path, text
@@ -0,0 +1,65 @@
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ansible.module_utils.intellij.common import copy_path, make_dirs, previous_version_dirs
+from ansible.module_utils.intellij.timing import count, phase
+
+
+def previous_config_dirs(intellij_user_config_dir: Path) -> List[Path]:
+    # Newest first, including the pre-2020.1 layout where each version has a
+    # dir in the home directory e.g. for ~/.config/JetBrains/IdeaIC2024.3:
+    # ~/.config/JetBrains/IdeaIC2024.2, ..., ~/.IdeaIC2019.3/config, ...
+    if intellij_user_config_dir.name == 'config':
+        # Itself in the pre-2020.1 layout e.g. ~/.IdeaIC2019.3/config
+        previous = []
+        legacy_version_dir = intellij_user_config_dir.parent
+    else:
+        previous = previous_version_dirs(intellij_user_config_dir)
+        jetbrains_dir = intellij_user_config_dir.parent
+        if jetbrains_dir.name != 'JetBrains' or jetbrains_dir.parent.name != '.config':
+            return previous
+        legacy_version_dir = jetbrains_dir.parent.parent / f'.{intellij_user_config_dir.name}'
+
+    return previous + [x / 'config' for x in previous_version_dirs(legacy_version_dir) if (x / 'config').is_dir()]
+
+
+def migrate_config(
+        intellij_user_config_dir: Path,
+        items: List[str],
+        uid: int,
+        gid: int,
+        hardlink: bool = False,
+        check_mode: bool = False) -> Optional[Dict[str, object]]:
+    # Like IntelliJ's own import, only a config dir that doesn't exist yet
+    # (i.e. the IDE hasn't been started and the role hasn't configured it) is
+    # migrated
+    if intellij_user_config_dir.exists():
+        return None
+
+    previous_dirs = previous_config_dirs(intellij_user_config_dir)
+    if not previous_dirs:
+        return None
+    previous_dir = previous_dirs[0]
+
+    migrated = [item for item in items if (previous_dir / item).exists()]
+
+    if not check_mode:
+        # Copy into a temporary dir first so an interrupted migration isn't
+        # mistaken for a complete one next time
+        staging_dir = intellij_user_config_dir.with_name(f'.{intellij_user_config_dir.name}.migrating')
+        if staging_dir.exists():
+            shutil.rmtree(str(staging_dir))
+
+        with phase('migrate'):
+            try:
+                for item in migrated:
+                    make_dirs((staging_dir / item).parent, 0o775, uid, gid)
+                    count('config_files_migrated', copy_path(previous_dir / item, staging_dir / item, uid, gid, hardlink))
+                make_dirs(staging_dir, 0o775, uid, gid)
+                staging_dir.rename(intellij_user_config_dir)
+            except BaseException:
+                shutil.rmtree(str(staging_dir), ignore_errors=True)
+                raise
+
+    return {'previous_config_dir': str(previous_dir), 'items': migrated}
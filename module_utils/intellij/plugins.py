@@ -0,0 +1,471 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import urllib.parse
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ansible.module_utils.intellij.common import IntellijError, copy_path, make_dirs, previous_version_dirs, write_file
+from ansible.module_utils.intellij.http import CIRCUIT_STATE_FILENAME, http_request
+from ansible.module_utils.intellij.timing import count, phase
+from ansible.module_utils.intellij.xmlutil import parse
+
+
+def get_root_dirname_from_zip(zipfile_path: Path) -> str:
+    if not zipfile_path.is_file():
+        raise IntellijError(f'File not found: {zipfile_path}')
+
+    with zipfile.ZipFile(zipfile_path, 'r') as z:
+        files = z.namelist()
+
+    if not files:
+        raise IntellijError(f'Plugin is empty: {zipfile_path}')
+
+    return files[0].split('/')[0]
+
+
+def extract_zip(output_dir: Path, zipfile_path: Path, uid: int, gid: int) -> None:
+    if not zipfile_path.is_file():
+        raise IntellijError(f'File not found: {zipfile_path}')
+
+    with phase('extract'), zipfile.ZipFile(zipfile_path, 'r') as z:
+        z.extractall(output_dir)
+        files = z.namelist()
+    count('files_extracted', len(files))
+
+    output_dir_resolved = output_dir.resolve()
+
+    with phase('chown'):
+        # Entries share parent directories, only chown each directory once
+        chowned = set()
+        for file_entry in files:
+            absolute_file = (output_dir / file_entry).resolve()
+            while absolute_file != output_dir_resolved and absolute_file not in chowned:
+                os.chown(absolute_file, uid, gid)
+                chowned.add(absolute_file)
+                absolute_file = absolute_file.parent
+            if absolute_file in chowned:
+                count('chown_calls_avoided', len(absolute_file.relative_to(output_dir_resolved).parts))
+        count('chown_calls', len(chowned))
+
+
+def parse_plugin_descriptor(xml: Any) -> Dict[str, Optional[str]]:
+    root = parse(xml)
+
+    def text(tag: str) -> Optional[str]:
+        elem = root.find(f'./{tag}')
+        return elem.text.strip() if elem is not None and elem.text else None
+
+    idea_version = root.find('./idea-version')
+    if idea_version is None:
+        idea_version = {}
+
+    return {
+        # Plugins without an id are identified by their name
+        'id': text('id') or text('name'),
+        'name': text('name'),
+        'version': text('version'),
+        'since_build': idea_version.get('since-build'),
+        'until_build': idea_version.get('until-build')
+    }
+
+
+def read_descriptor_from_jar(jar_path: Path) -> Optional[Dict[str, Optional[str]]]:
+    with zipfile.ZipFile(jar_path, 'r') as jar:
+        try:
+            with jar.open('META-INF/plugin.xml') as xml:
+                return parse_plugin_descriptor(xml)
+        except KeyError:
+            return None
+
+
+def read_plugin_descriptor(plugin_path: Path) -> Optional[Dict[str, Optional[str]]]:
+    if plugin_path.is_file():
+        return read_descriptor_from_jar(plugin_path) if plugin_path.suffix == '.jar' else None
+
+    unpacked = plugin_path / 'META-INF' / 'plugin.xml'
+    if unpacked.is_file():
+        return parse_plugin_descriptor(unpacked)
+
+    lib = plugin_path / 'lib'
+    if not lib.is_dir():
+        return None
+
+    # The descriptor is usually in the jar named after the plugin directory
+    jars = sorted(lib.glob('*.jar'), key=lambda x: (x.stem != plugin_path.name, x.name))
+    for jar_path in jars:
+        descriptor = read_descriptor_from_jar(jar_path)
+        if descriptor is not None:
+            return descriptor
+    return None
+
+
+def build_components(build: str) -> Tuple[int, ...]:
+    # e.g. 'IC-243.26053.27' -> (243, 26053, 27), '243.*' -> (243,)
+    components = []
+    for component in re.sub(r'^[A-Z]+-', '', build.strip()).split('.'):
+        if not component.isdigit():
+            break
+        components.append(int(component))
+    return tuple(components)
+
+
+def is_compatible(build_number: str, since_build: Optional[str], until_build: Optional[str]) -> bool:
+    build = build_components(build_number)
+    if since_build and build < build_components(since_build):
+        return False
+    if until_build:
+        until = build_components(until_build)
+        # Missing components (or a wildcard) match any value
+        if build[:len(until)] > until:
+            return False
+    return True
+
+
+def get_build_number_from_xml(intellij_home: Path, xml: Any) -> str:
+    info_root = parse(xml)
+    build = info_root.find('./build/[@number]')
+    if build is None:
+        build = info_root.find('./{http://jetbrains.org/intellij/schema/application-info}build/''[@number]')
+    if build is None:
+        raise IntellijError(f'Unable to determine IntelliJ version from path: {intellij_home} (unsupported schema - missing build element)')
+
+    build_number = build.get('number')
+    if build_number is None:
+        raise IntellijError(f'Unable to determine IntelliJ version from path: {intellij_home} (unsupported schema - missing build number value)')
+
+    return build_number
+
+
+def get_build_number_from_jar(intellij_home: Path) -> Optional[str]:
+    resources_jar = intellij_home / 'lib' / 'resources.jar'
+
+    if not resources_jar.is_file():
+        return None
+
+    with zipfile.ZipFile(resources_jar, 'r') as resource_zip:
+        try:
+            with resource_zip.open('idea/IdeaApplicationInfo.xml') as xml:
+                return get_build_number_from_xml(intellij_home, xml)
+        except KeyError:
+            try:
+                with resource_zip.open('idea/ApplicationInfo.xml') as xml:
+                    return get_build_number_from_xml(intellij_home, xml)
+            except KeyError:
+                raise IntellijError(f'Unable to determine IntelliJ version from path: {intellij_home} (XML info file not found in "lib/resources.jar")')
+
+
+def get_build_number_from_json(intellij_home: Path) -> str:
+    product_info_path = intellij_home / 'product-info.json'
+
+    if not product_info_path.is_file():
+        raise IntellijError(f'Unable to determine IntelliJ version from path: {intellij_home} ("product-info.json" not found)')
+
+    with product_info_path.open() as product_info_file:
+        product_info = json.load(product_info_file)
+        return product_info['buildNumber']
+
+
+def get_build_number(intellij_home: Path) -> str:
+    with phase('build_number'):
+        return get_build_number_from_jar(intellij_home) or get_build_number_from_json(intellij_home)
+
+
+def get_plugin_info(plugin_manager_url: str, build_number: str, plugin_id: str, circuit_state: Optional[Path] = None) -> Tuple[str, str]:
+    params = {'action': 'download', 'build': build_number, 'id': plugin_id}
+
+    query_params = urllib.parse.urlencode(params)
+
+    url = f'{plugin_manager_url}?{query_params}'
+
+    with phase('plugin_info'):
+        status_code, resp, info = http_request(url, 'HEAD', 3, 'none', circuit_state=circuit_state)
+    if resp:
+        resp.close()
+
+    if status_code == 404:
+        raise IntellijError(f'Unable to find plugin "{plugin_id}" for build "{build_number}"')
+    if status_code == -1 or status_code >= 400:
+        raise IntellijError(f'Error querying url "{url}": {info.get("msg", "Unknown error")}')
+
+    location = info.get('location')
+    if not location:
+        raise IntellijError(f'Unsupported HTTP response for: {url} (status={status_code})')
+
+    if location.startswith('http'):
+        plugin_url = location
+    else:
+        plugin_url = urllib.parse.urljoin(plugin_manager_url, location)
+
+    jar_pattern = re.compile(r'/(?P<file_name>[^/]+\.jar)(?:\?.*)$')
+    jar_matcher = jar_pattern.search(plugin_url)
+
+    if jar_matcher:
+        file_name = jar_matcher.group('file_name')
+    else:
+        versioned_pattern = re.compile(r'(?P<plugin_id>[0-9]+)/(?P<update_id>[0-9]+)/(?P<file_name>[^/]+)(?:\?.*)$')
+
+        versioned_matcher = versioned_pattern.search(plugin_url)
+        if versioned_matcher:
+            plugin_id = versioned_matcher.group('plugin_id')
+            update_id = versioned_matcher.group('update_id')
+            file_name = versioned_matcher.group('file_name')
+            file_name = f'{plugin_id}-{update_id}-{file_name}'
+        else:
+            hash_object = hashlib.sha256(plugin_url.encode())
+            file_name = f'{plugin_id}-{hash_object.hexdigest()}.zip'
+
+    return plugin_url, file_name
+
+
+def download_plugin(plugin_url: str, file_name: str, download_cache: Path) -> Path:
+    if not download_cache.is_dir():
+        download_cache.mkdir(mode=0o775, parents=True)
+
+    download_path = download_cache / file_name
+
+    if download_path.is_file():
+        count('download_cache_hits')
+        return download_path
+
+    with phase('download'):
+        status_code, resp, info = http_request(plugin_url, 'GET', 20, 'all', circuit_state=download_cache / CIRCUIT_STATE_FILENAME)
+
+        if 200 <= status_code < 300:
+            # Download next to the destination so the final rename is atomic
+            fd, tempname = tempfile.mkstemp(dir=str(download_cache), prefix=f'.{file_name}.')
+
+            with os.fdopen(fd, 'wb') as f:
+                try:
+                    shutil.copyfileobj(resp, f)
+                except Exception as e:
+                    os.remove(tempname)
+                    resp.close()
+                    raise IntellijError(f'Failed to create temporary content file: {e}')
+                count('downloads')
+                count('bytes_downloaded', f.tell())
+            resp.close()
+            os.chmod(tempname, 0o644)
+            os.replace(tempname, str(download_path))
+            return download_path
+
+    if resp:
+        resp.close()
+    raise IntellijError(f'Error downloading url "{plugin_url}": {info["msg"]}')
+
+
+PLUGIN_INDEX_FORMAT = 1
+
+PLUGIN_INDEX_FILENAME = 'intellij-plugin-index.json'
+
+# Each module invocation runs in its own process, so each plugins directory
+# is only indexed once per invocation
+_plugin_indexes: Dict[Path, Dict[str, Tuple[Path, Dict[str, Optional[str]]]]] = {}
+
+
+def plugin_stamp(plugin_path: Path) -> List[Optional[List[int]]]:
+    # Installing, updating or removing a plugin replaces the jar or the jars
+    # in the plugin's lib directory
+    stamp = []
+    for path in (plugin_path, plugin_path / 'lib'):
+        try:
+            stat = path.stat()
+        except OSError:
+            stamp.append(None)
+        else:
+            stamp.append([stat.st_ino, stat.st_size, stat.st_mtime_ns])
+    return stamp
+
+
+def load_plugin_index(index_path: Path) -> Dict[str, Any]:
+    try:
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(index, dict) or index.get('format') != PLUGIN_INDEX_FORMAT:
+        return {}
+
+    return index.get('plugins', {})
+
+
+def save_plugin_index(index_path: Path, plugins_dir: Path, entries: Dict[str, Any]) -> None:
+    # Re-read the index so the entries of other plugin directories aren't lost
+    plugins = {k: v for k, v in load_plugin_index(index_path).items() if Path(k).parent != plugins_dir}
+    plugins.update(entries)
+
+    fd, tempname = tempfile.mkstemp(dir=str(index_path.parent), prefix='.intellij-plugin-index-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'format': PLUGIN_INDEX_FORMAT, 'plugins': plugins}, f, indent=2, sort_keys=True)
+        os.chmod(tempname, 0o644)
+        os.replace(tempname, str(index_path))
+    except BaseException:
+        os.remove(tempname)
+        raise
+
+
+def index_plugins(
+        plugins_dir: Path,
+        index_path: Optional[Path] = None,
+        check_mode: bool = False) -> Dict[str, Tuple[Path, Dict[str, Optional[str]]]]:
+    # plugin ID -> (plugin path, descriptor); the descriptors are cached in the
+    # index file, so only new or changed plugins have their jars opened
+    if plugins_dir in _plugin_indexes:
+        return _plugin_indexes[plugins_dir]
+
+    cached = load_plugin_index(index_path) if index_path is not None else {}
+    entries = {}
+    plugins = {}
+    if plugins_dir.is_dir():
+        for plugin_path in sorted(plugins_dir.iterdir()):
+            if plugin_path.name.startswith('.'):
+                continue
+            stamp = plugin_stamp(plugin_path)
+            entry = cached.get(str(plugin_path))
+            if entry is not None and entry.get('stamp') == stamp:
+                count('plugin_descriptors_cached')
+            else:
+                try:
+                    descriptor = read_plugin_descriptor(plugin_path)
+                except (OSError, ValueError, SyntaxError, zipfile.BadZipFile):
+                    descriptor = None
+                entry = {'stamp': stamp, 'descriptor': descriptor}
+            entries[str(plugin_path)] = entry
+            descriptor = entry['descriptor']
+            if descriptor is not None and descriptor['id'] not in plugins:
+                plugins[descriptor['id']] = (plugin_path, descriptor)
+
+    stale = {k: v for k, v in cached.items() if Path(k).parent == plugins_dir}
+    if index_path is not None and entries != stale and not check_mode and index_path.parent.is_dir():
+        save_plugin_index(index_path, plugins_dir, entries)
+
+    _plugin_indexes[plugins_dir] = plugins
+    return plugins
+
+
+def find_plugin(
+        plugins_dir: Path,
+        plugin_id: str,
+        index_path: Optional[Path] = None,
+        check_mode: bool = False) -> Optional[Tuple[Path, Dict[str, Optional[str]]]]:
+    return index_plugins(plugins_dir, index_path, check_mode).get(plugin_id)
+
+
+def carry_over_plugin(
+        plugins_dir: Path,
+        plugin_id: str,
+        build_number: str,
+        uid: int,
+        gid: int,
+        hardlink: bool = False,
+        index_path: Optional[Path] = None,
+        check_mode: bool = False) -> Optional[bool]:
+    installed = find_plugin(plugins_dir, plugin_id, index_path, check_mode)
+    if installed is not None:
+        _, descriptor = installed
+        if is_compatible(build_number, descriptor['since_build'], descriptor['until_build']):
+            count('plugin_downloads_avoided')
+            return False
+        # Let the plugin repository decide what to do with an incompatible plugin
+        return None
+
+    for previous_dir in previous_version_dirs(plugins_dir):
+        previous = find_plugin(previous_dir, plugin_id, index_path, check_mode)
+        if previous is None:
+            continue
+
+        plugin_path, descriptor = previous
+        if not is_compatible(build_number, descriptor['since_build'], descriptor['until_build']):
+            # An older version of the plugin is even less likely to be compatible
+            return None
+
+        if not check_mode:
+            make_dirs(plugins_dir, 0o775, uid, gid)
+            copy_path(plugin_path, plugins_dir / plugin_path.name, uid, gid, hardlink)
+        count('plugins_carried_over')
+        count('plugin_downloads_avoided')
+        return True
+
+    return None
+
+
+def install_plugin(
+        plugin_manager_url: str,
+        intellij_home: Path,
+        plugins_dir: Path,
+        uid: int,
+        gid: int,
+        plugin_id: str,
+        download_cache: Path,
+        check_mode: bool = False,
+        carry_over: str = 'none') -> bool:
+    build_number = get_build_number(intellij_home)
+
+    if carry_over != 'none':
+        with phase('carry_over'):
+            carried_over = carry_over_plugin(
+                plugins_dir, plugin_id, build_number, uid, gid, carry_over == 'hardlink', download_cache / PLUGIN_INDEX_FILENAME, check_mode)
+        if carried_over is not None:
+            return carried_over
+
+    plugin_url, file_name = get_plugin_info(plugin_manager_url, build_number, plugin_id, download_cache / CIRCUIT_STATE_FILENAME)
+
+    plugin_path = download_plugin(plugin_url, file_name, download_cache)
+
+    if not check_mode:
+        make_dirs(plugins_dir, 0o775, uid, gid)
+
+    if plugin_path.suffix == '.jar':
+        dest_path = plugins_dir / plugin_path.name
+        if dest_path.exists():
+            return False
+
+        if not check_mode:
+            shutil.copy(plugin_path, dest_path)
+            os.chown(dest_path, uid, gid)
+            dest_path.chmod(0o664)
+        return True
+    else:
+        root_dirname = get_root_dirname_from_zip(plugin_path)
+        plugin_dir = plugins_dir / root_dirname
+
+        if plugin_dir.exists():
+            return False
+
+        if not check_mode:
+            extract_zip(plugins_dir, plugin_path, uid, gid)
+        return True
+
+
+def update_disabled_plugins(
+        intellij_user_config_dir: Path,
+        disabled: List[str],
+        enabled: List[str],
+        uid: int,
+        gid: int,
+        check_mode: bool = False) -> Tuple[bool, Dict[str, str]]:
+    disabled_plugins_path = intellij_user_config_dir / 'disabled_plugins.txt'
+
+    try:
+        before = disabled_plugins_path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        before = ''
+
+    # Keep the existing order (and any plugins disabled by the user)
+    plugin_ids = [x.strip() for x in before.splitlines() if x.strip()]
+    plugin_ids += [x for x in disabled if x not in plugin_ids]
+    plugin_ids = [x for x in plugin_ids if x not in enabled]
+
+    after = ''.join(f'{x}\n' for x in plugin_ids)
+
+    changed = after != before
+    if changed and not check_mode:
+        make_dirs(intellij_user_config_dir, 0o775, uid, gid)
+        write_file(disabled_plugins_path, after, uid, gid, encoding='utf-8')
+
+    return changed, {'before': before, 'after': after}
@@ -0,0 +1,49 @@
+import cProfile
+import os
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+# Set (e.g. with the play's environment keyword) to profile the modules on the
+# managed host without editing the module payload.
+PROFILE_DIR_ENV = 'INTELLIJ_PROFILE_DIR'
+PROFILE_MEMORY_ENV = 'INTELLIJ_PROFILE_MEMORY'
+
+
+def write_memory_report(path: Path, snapshot: tracemalloc.Snapshot, peak: int, limit: int = 25) -> None:
+    lines = [f'Peak traced memory: {peak} bytes', '', f'Top {limit} allocation sites still allocated at exit:']
+    lines += [str(stat) for stat in snapshot.statistics('lineno')[:limit]]
+    path.write_text('\n'.join(lines) + '\n')
+
+
+def run_profiled(module_name: str, run_module: Callable[[], None]) -> None:
+    profile_dir = os.environ.get(PROFILE_DIR_ENV)
+    if not profile_dir:
+        run_module()
+        return
+
+    trace_memory = os.environ.get(PROFILE_MEMORY_ENV, '').lower() in ('1', 'true', 'yes', 'on')
+
+    output_dir = Path(profile_dir).expanduser()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_prefix = output_dir / f'{module_name}-{time.strftime("%Y%m%dT%H%M%S")}-{os.getpid()}'
+
+    if trace_memory:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        # The module exits with SystemExit from exit_json/fail_json
+        run_module()
+    finally:
+        profiler.disable()
+        profiler.dump_stats(f'{output_prefix}.pstats')
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, tracemalloc.__file__)
+            ])
+            tracemalloc.stop()
+            write_memory_report(Path(f'{output_prefix}.memory.txt'), snapshot, peak)
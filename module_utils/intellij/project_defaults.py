@@ -0,0 +1,222 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ansible.module_utils.intellij.common import make_dirs, write_file
+from ansible.module_utils.intellij.jdk import find_jdk_home, get_jdk_info
+from ansible.module_utils.intellij.properties import update_properties
+from ansible.module_utils.intellij.xmlutil import default_project, find_or_create, load_document, pretty_print, set_attrib, set_option
+
+
+def update_options_file(
+        intellij_user_config_dir: Path,
+        filename: str,
+        uid: int,
+        gid: int,
+        update: Callable[[Any], bool],
+        check_mode: bool = False) -> Tuple[bool, Dict[str, str]]:
+    options_dir = intellij_user_config_dir / 'options'
+    options_path = options_dir / filename
+
+    root, before = load_document(options_path)
+
+    changed = update(root)
+
+    after = pretty_print(root)
+
+    if changed and not check_mode:
+        make_dirs(options_dir, 0o775, uid, gid)
+        write_file(options_path, after, uid, gid)
+
+    return changed, {'before': before, 'after': after}
+
+
+def update_project_default(
+        intellij_user_config_dir: Path,
+        uid: int,
+        gid: int,
+        update: Callable[[Any], bool],
+        check_mode: bool = False) -> Tuple[bool, Dict[str, str]]:
+    return update_options_file(
+        intellij_user_config_dir, 'project.default.xml', uid, gid, lambda x: update(default_project(x)), check_mode)
+
+
+def set_default_jdk(
+        intellij_user_config_dir: Path,
+        jdk_name: str,
+        uid: int,
+        gid: int,
+        catalog_path: Optional[Path] = None,
+        check_mode: bool = False) -> Tuple[bool, Dict[str, str]]:
+    default_jdk_home = find_jdk_home(intellij_user_config_dir, jdk_name)
+    jdk_info = get_jdk_info(default_jdk_home, catalog_path, fields=['specification_version'], check_mode=check_mode)
+    language_level = jdk_info['specification_version']
+
+    def update(default_project: Any) -> bool:
+        project_root_manager = find_or_create(default_project, 'component', 'ProjectRootManager')
+
+        return any([
+            set_attrib(project_root_manager, 'version', '2'),
+            set_attrib(project_root_manager, 'languageLevel', f'JDK_{language_level.replace(".", "_")}'),
+            set_attrib(project_root_manager, 'default', 'true'),
+            set_attrib(project_root_manager, 'assert-keyword', 'true'),
+            set_attrib(project_root_manager, 'jdk-15', 'true'),
+            set_attrib(project_root_manager, 'project-jdk-name', jdk_name),
+            set_attrib(project_root_manager, 'project-jdk-type', 'JavaSDK')
+        ])
+
+    return update_project_default(intellij_user_config_dir, uid, gid, update, check_mode)
+
+
+def maven_settings(
+        threads: Optional[str] = None,
+        work_offline: Optional[bool] = None,
+        importer_heap_size: Optional[str] = None,
+        importer_vm_options: Optional[str] = None,
+        use_workspace_import: Optional[bool] = None,
+        download_sources: Optional[bool] = None,
+        download_docs: Optional[bool] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+    def flag(value: bool) -> str:
+        return 'true' if value else 'false'
+
+    general_settings = {}
+    if threads is not None:
+        general_settings['threads'] = threads
+    if work_offline is not None:
+        general_settings['workOffline'] = flag(work_offline)
+
+    importing_settings = {}
+    if importer_heap_size is not None or importer_vm_options is not None:
+        vm_options = [f'-Xmx{importer_heap_size}'] if importer_heap_size else []
+        if importer_vm_options:
+            vm_options.append(importer_vm_options)
+        importing_settings['vmOptionsForImporter'] = ' '.join(vm_options)
+    if use_workspace_import is not None:
+        importing_settings['workspaceImportEnabled'] = flag(use_workspace_import)
+    if download_sources is not None:
+        importing_settings['downloadSourcesAutomatically'] = flag(download_sources)
+    if download_docs is not None:
+        importing_settings['downloadDocsAutomatically'] = flag(download_docs)
+
+    return general_settings, importing_settings
+
+
+def set_default_maven(
+        intellij_user_config_dir: Path,
+        maven_home: Optional[Path],
+        uid: int,
+        gid: int,
+        general_settings: Optional[Dict[str, str]] = None,
+        importing_settings: Optional[Dict[str, str]] = None,
+        check_mode: bool = False) -> Tuple[bool, Dict[str, str]]:
+    general_settings = dict(general_settings or {})
+    if maven_home is not None:
+        general_settings['mavenHome'] = str(maven_home.expanduser())
+
+    def update(default_project: Any) -> bool:
+        mvn_import_prefs = find_or_create(default_project, 'component', 'MavenImportPreferences')
+
+        changes = []
+        if general_settings:
+            general = find_or_create(find_or_create(mvn_import_prefs, 'option', 'generalSettings'), 'MavenGeneralSettings')
+            changes += [set_option(general, key, value) for key, value in sorted(general_settings.items())]
+        if importing_settings:
+            importing = find_or_create(find_or_create(mvn_import_prefs, 'option', 'importingSettings'), 'MavenImportingSettings')
+            changes += [set_option(importing, key, value) for key, value in sorted(importing_settings.items())]
+        return any(changes)
+
+    return update_project_default(intellij_user_config_dir, uid, gid, update, check_mode)
+
+
+def gradle_settings(
+        delegated_build: Optional[bool] = None,
+        parallel_model_fetch: Optional[bool] = None,
+        offline: Optional[bool] = None,
+        daemon_vm_options: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+    # Component -> options, in the components IntelliJ reads them from:
+    # DefaultGradleProjectSettings and GradleSettings are project components
+    # (set for new projects in the default project) and GradleSystemSettings
+    # is an application component
+    def flag(value: bool) -> str:
+        return 'true' if value else 'false'
+
+    settings: Dict[str, Dict[str, str]] = {'DefaultGradleProjectSettings': {}, 'GradleSettings': {}, 'GradleSystemSettings': {}}
+    if delegated_build is not None:
+        settings['DefaultGradleProjectSettings']['delegatedBuild'] = flag(delegated_build)
+    if parallel_model_fetch is not None:
+        settings['GradleSettings']['parallelModelFetch'] = flag(parallel_model_fetch)
+    if offline is not None:
+        settings['GradleSystemSettings']['offlineWork'] = flag(offline)
+    if daemon_vm_options is not None:
+        settings['GradleSystemSettings']['gradleVmOptions'] = daemon_vm_options
+
+    return settings
+
+
+def gradle_properties(parallel_execution: Optional[bool] = None) -> Dict[str, Any]:
+    # Gradle (rather than IntelliJ) settings, in the user's gradle.properties
+    properties = {}
+    if parallel_execution is not None:
+        properties['org.gradle.parallel'] = parallel_execution
+    return properties
+
+
+GRADLE_SYSTEM_SETTINGS_FILENAME = 'gradle.settings.xml'
+
+GRADLE_PROPERTIES_FILENAME = 'gradle.properties'
+
+
+def set_default_gradle(
+        intellij_user_config_dir: Path,
+        uid: int,
+        gid: int,
+        settings: Dict[str, Dict[str, str]],
+        gradle_user_home: Optional[Path] = None,
+        properties: Optional[Dict[str, Any]] = None,
+        check_mode: bool = False) -> Tuple[bool, List[Dict[str, str]]]:
+    def update_project(default_project: Any) -> bool:
+        changes = []
+        for component_name in ('DefaultGradleProjectSettings', 'GradleSettings'):
+            if settings.get(component_name):
+                component = find_or_create(default_project, 'component', component_name)
+                changes += [set_option(component, key, value) for key, value in sorted(settings[component_name].items())]
+        return any(changes)
+
+    def update_application(root: Any) -> bool:
+        component = find_or_create(root, 'component', 'GradleSystemSettings')
+        return any([set_option(component, key, value) for key, value in sorted(settings['GradleSystemSettings'].items())])
+
+    project_changed, project_diff = update_project_default(intellij_user_config_dir, uid, gid, update_project, check_mode)
+    diffs = [dict(project_diff, before_header='project.default.xml', after_header='project.default.xml')]
+
+    system_changed = False
+    if settings.get('GradleSystemSettings'):
+        system_changed, system_diff = update_options_file(
+            intellij_user_config_dir, GRADLE_SYSTEM_SETTINGS_FILENAME, uid, gid, update_application, check_mode)
+        diffs.append(dict(system_diff, before_header=GRADLE_SYSTEM_SETTINGS_FILENAME, after_header=GRADLE_SYSTEM_SETTINGS_FILENAME))
+
+    properties_changed = False
+    if properties:
+        properties_changed, properties_diff = update_properties(
+            gradle_user_home / GRADLE_PROPERTIES_FILENAME, properties, uid, gid, check_mode)
+        diffs.append(dict(properties_diff, before_header=GRADLE_PROPERTIES_FILENAME, after_header=GRADLE_PROPERTIES_FILENAME))
+
+    return project_changed or system_changed or properties_changed, diffs
+
+
+def set_default_inspection_profile(
+        intellij_user_config_dir: Path,
+        profile_name: str,
+        uid: int,
+        gid: int,
+        check_mode: bool = False) -> Tuple[bool, Dict[str, str]]:
+
+    def update(default_project: Any) -> bool:
+        profile_manager = find_or_create(default_project, 'component', 'InspectionProjectProfileManager')
+
+        return any([
+            set_option(profile_manager, 'PROJECT_PROFILE', profile_name),
+            set_option(profile_manager, 'USE_PROJECT_PROFILE', 'false'),
+            set_attrib(find_or_create(profile_manager, 'version'), 'value', '1.0')
+        ])
+
+    return update_project_default(intellij_user_config_dir, uid, gid, update, check_mode)
@@ -0,0 +1,139 @@
+import os
+import pwd
+import re
+import stat
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ansible.module_utils.intellij.common import IntellijError, make_dirs, user_path, write_file
+
+
+def property_key(line: str) -> Optional[str]:
+    stripped = line.strip()
+    if not stripped or stripped[0] in '#!':
+        return None
+    return re.split(r'(?<!\\)[=:\s]', stripped, maxsplit=1)[0]
+
+
+def format_property_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+def merge_properties(text: str, properties: Dict[str, Any]) -> str:
+    # A value of None removes the property
+    pending = dict(properties)
+
+    merged = []
+    for line in text.splitlines():
+        key = property_key(line)
+        if key is None or key not in properties:
+            merged.append(line)
+        elif key in pending:
+            value = pending.pop(key)
+            if value is not None:
+                merged.append(f'{key}={format_property_value(value)}')
+        # else: a duplicate of a managed property
+
+    merged.extend(f'{key}={format_property_value(value)}' for key, value in pending.items() if value is not None)
+    return '\n'.join(merged) + '\n'
+
+
+def update_properties(
+        properties_path: Path,
+        properties: Dict[str, Any],
+        uid: int,
+        gid: int,
+        check_mode: bool = False) -> Tuple[bool, Dict[str, str]]:
+    try:
+        before = properties_path.read_text(encoding='iso-8859-1')
+    except FileNotFoundError:
+        before = ''
+
+    after = merge_properties(before, properties)
+
+    changed = before != after
+    if changed and not check_mode:
+        make_dirs(properties_path.parent, 0o775, uid, gid)
+        write_file(properties_path, after, uid, gid)
+
+    return changed, {'before': before, 'after': after}
+
+
+def check_ancestors(path: Path, ancestors: List[Path], uid: int) -> None:
+    # A directory in a directory other users can write to (e.g.
+    # /var/tmp/intellij-bob in /var/tmp) could have been created by another
+    # user, the role mustn't create or chown anything through it
+    for ancestor in ancestors:
+        if ancestor.parent == ancestor or not ancestor.parent.stat().st_mode & stat.S_IWOTH:
+            continue
+        ancestor_stat = ancestor.lstat()
+        if stat.S_ISLNK(ancestor_stat.st_mode) or ancestor_stat.st_uid not in (0, uid):
+            raise IntellijError(f'Refusing to use {path}: {ancestor} is a symlink or owned by another user')
+
+
+def check_user_dir(path: Path, uid: int) -> None:
+    path_stat = path.lstat()
+    if stat.S_ISLNK(path_stat.st_mode):
+        raise IntellijError(f'Refusing to use {path}: it is a symlink')
+    if not stat.S_ISDIR(path_stat.st_mode):
+        raise IntellijError(f'Refusing to use {path}: it is not a directory')
+    if path_stat.st_uid != uid:
+        raise IntellijError(f'Refusing to use {path}: it is owned by another user (uid {path_stat.st_uid})')
+    check_ancestors(path, list(path.parents), uid)
+
+
+def create_user_dir(path: Path, home: Path, uid: int, gid: int) -> None:
+    missing = []
+    parent = path.parent
+    while not os.path.lexists(parent):
+        missing.append(parent)
+        parent = parent.parent
+
+    for missing_dir in reversed(missing):
+        # Missing parents in the user's home directory belong to the user;
+        # elsewhere they're owned by root and readable by all, so each user
+        # can get to their own directory (e.g. /local/intellij/bob when
+        # /local/intellij is created for alice first)
+        if home in missing_dir.parents:
+            missing_dir.mkdir(mode=0o775)
+            os.chown(missing_dir, uid, gid)
+            missing_dir.chmod(0o775)
+        else:
+            missing_dir.mkdir(mode=0o755)
+            os.chown(missing_dir, 0, 0)
+            missing_dir.chmod(0o755)
+
+    # The IDE's caches are private to the user
+    path.mkdir(mode=0o700)
+    os.chown(path, uid, gid)
+    path.chmod(0o700)
+
+
+def create_user_dirs(username: str, directories: List[str], uid: int, gid: int, check_mode: bool = False) -> List[str]:
+    home = Path(pwd.getpwnam(username).pw_dir)
+
+    created = []
+    for directory in directories:
+        path = user_path(username, directory)
+        if os.path.lexists(path):
+            # e.g. pre-created or a symlink planted by another user
+            check_user_dir(path, uid)
+            continue
+
+        existing = path.parent
+        while not os.path.lexists(existing):
+            existing = existing.parent
+        if not existing.is_dir():
+            raise IntellijError(f'Refusing to use {path}: {existing} is not a directory')
+        check_ancestors(path, [existing] + list(existing.parents), uid)
+
+        if not check_mode:
+            try:
+                create_user_dir(path, home, uid, gid)
+            except FileExistsError as e:
+                # Created by someone else since it was checked
+                raise IntellijError(f'Refusing to use {path}: {e.filename} was created concurrently')
+        created.append(str(path))
+    return created
@@ -0,0 +1,59 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+# Each module invocation runs in its own process, so the timings and counters
+# are collected module wide and returned with the module result.
+_lock = threading.Lock()
+_timings: Dict[str, float] = {}
+_counters: Dict[str, int] = {}
+
+# Phases nest (e.g. http within download) and run concurrently in worker
+# threads, so the total is the time at least one phase was running rather
+# than the sum of the phases.
+_active_phases = 0
+_busy_start = 0.0
+_busy_seconds = 0.0
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    global _active_phases, _busy_start, _busy_seconds
+    start = time.perf_counter()
+    with _lock:
+        if _active_phases == 0:
+            _busy_start = start
+        _active_phases += 1
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        with _lock:
+            _timings[name] = _timings.get(name, 0.0) + end - start
+            _active_phases -= 1
+            if _active_phases == 0:
+                _busy_seconds += end - _busy_start
+
+
+def count(name: str, value: int = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def results() -> Dict[str, Any]:
+    with _lock:
+        return {
+            'timings': {name: round(seconds, 6) for name, seconds in _timings.items()},
+            'timings_total': round(_busy_seconds, 6),
+            'counters': dict(_counters)
+        }
+
+
+def reset() -> None:
+    global _active_phases, _busy_seconds
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+        _active_phases = 0
+        _busy_seconds = 0.0
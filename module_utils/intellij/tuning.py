@@ -0,0 +1,130 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# The kernel needs about 1KB of (unswappable) memory for each inotify watch
+INOTIFY_WATCH_KB = 1
+
+# Each IDE instance (and file watcher process) needs its own inotify instances
+INOTIFY_INSTANCES = 1024
+
+# The JetBrains Runtime memory maps every jar and index file
+MAX_MAP_COUNT = 262144
+
+RunCommand = Callable[[List[str]], Tuple[int, str, str]]
+
+
+def compute_host_limits(memtotal_mb: int, user_count: int, project_files: int) -> Dict[str, Dict[str, int]]:
+    user_count = max(user_count, 1)
+
+    # Enough to watch every file and directory of the user's projects, at
+    # least the 524288 recommended by JetBrains but no more than 10% of the
+    # memory for all the users together
+    memory_watches = memtotal_mb * 1024 // 10 // INOTIFY_WATCH_KB // user_count
+    max_user_watches = max(min(max(project_files * 2, 524288), memory_watches), 8192)
+
+    nofile = max(65536, project_files)
+
+    return {
+        'sysctl': {
+            'fs.inotify.max_user_watches': max_user_watches,
+            'fs.inotify.max_user_instances': INOTIFY_INSTANCES,
+            'vm.max_map_count': MAX_MAP_COUNT
+        },
+        'limits': {
+            'nofile': nofile
+        }
+    }
+
+
+def read_sysctl(key: str) -> Optional[int]:
+    try:
+        return int((Path('/proc/sys') / key.replace('.', '/')).read_text().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def read_sysctl_conf(path: Path) -> Dict[str, int]:
+    values = {}
+    try:
+        lines = path.read_text().splitlines()
+    except FileNotFoundError:
+        return values
+    for line in lines:
+        key, sep, value = line.partition('=')
+        if not sep or key.lstrip().startswith(('#', ';')):
+            continue
+        try:
+            values[key.strip()] = int(value.split()[0])
+        except (ValueError, IndexError):
+            continue
+    return values
+
+
+def sysctl_conf_values(
+        minimums: Dict[str, int],
+        effective: Dict[str, Optional[int]],
+        managed: Dict[str, int]) -> Dict[str, int]:
+    # Never lower a value that is already higher (e.g. vm.max_map_count is
+    # 1048576 on some distributions) and leave out the values that are already
+    # high enough, unless they come from our drop-in (they'd be lost on reboot)
+    values = {}
+    for key, minimum in minimums.items():
+        current = effective.get(key)
+        if key not in managed and at_least(current, minimum):
+            continue
+        values[key] = max(current or 0, managed.get(key, 0), minimum)
+    return values
+
+
+def read_user_nofile(run_command: RunCommand, username: str) -> Dict[str, Any]:
+    # The limits.d settings only apply to new login sessions
+    rc, out, _ = run_command(['runuser', '--login', username, '--shell', '/bin/sh', '--command', 'ulimit -Sn; ulimit -Hn'])
+    values = out.split()
+    if rc != 0 or len(values) != 2:
+        return {'soft': None, 'hard': None}
+    return {'soft': parse_limit(values[0]), 'hard': parse_limit(values[1])}
+
+
+def limits_conf_values(minimum: int, effective: Dict[str, Optional[int]]) -> Dict[str, int]:
+    # Never lower a limit that is already higher (e.g. systemd raises the hard
+    # limit to 524288) and leave out the limits that are unlimited
+    values = {}
+    for key in ('hard', 'soft'):
+        current = effective.get(key)
+        if current == -1:
+            continue
+        values[key] = max(current or 0, minimum)
+    # The soft limit can't be higher than the hard limit
+    if 'hard' in values and 'soft' in values:
+        values['soft'] = min(values['soft'], values['hard'])
+    return values
+
+
+def parse_limit(value: str) -> Optional[int]:
+    if value == 'unlimited':
+        return -1
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def at_least(effective: Optional[int], expected: int) -> bool:
+    return effective is not None and (effective == -1 or effective >= expected)
+
+
+def verify_host_limits(limits: Dict[str, Dict[str, int]], usernames: List[str], run_command: RunCommand) -> Dict[str, Any]:
+    sysctl = {}
+    for key, expected in limits['sysctl'].items():
+        effective = read_sysctl(key)
+        sysctl[key] = {'expected': expected, 'effective': effective, 'ok': at_least(effective, expected)}
+
+    nofile = {}
+    for username in usernames:
+        effective = read_user_nofile(run_command, username)
+        expected = limits['limits']['nofile']
+        nofile[username] = dict(
+            effective, expected=expected, ok=at_least(effective['soft'], expected) and at_least(effective['hard'], expected))
+
+    ok = all(x['ok'] for x in sysctl.values()) and all(x['ok'] for x in nofile.values())
+    return {'sysctl': sysctl, 'nofile': nofile, 'ok': ok}
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import stat
+import tarfile
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from ansible.module_utils.intellij.common import IntellijError, make_dirs, resolve_owner, user_path
+from ansible.module_utils.intellij.timing import count, phase
+
+
+def read_archive(archive_path: Path) -> Dict[str, bytes]:
+    # The archive has a file for each distinct content, named after its hash
+    contents = {}
+    with phase('extract'), tarfile.open(archive_path, 'r:*') as archive:
+        for member in archive.getmembers():
+            if not member.isfile():
+                continue
+            f = archive.extractfile(member)
+            if f is not None:
+                contents[member.name] = f.read()
+    for name, content in contents.items():
+        if hashlib.sha256(content).hexdigest() != name:
+            raise IntellijError(f'Corrupt content in archive: {name}')
+    return contents
+
+
+def ensure_attributes(path: Path, uid: int, gid: int, mode: int, check_mode: bool) -> bool:
+    path_stat = path.stat()
+    if path_stat.st_uid == uid and path_stat.st_gid == gid and stat.S_IMODE(path_stat.st_mode) == mode:
+        return False
+    if not check_mode:
+        os.chown(path, uid, gid)
+        path.chmod(mode)
+    return True
+
+
+def ensure_directory(path: Path, uid: int, gid: int, mode: int, check_mode: bool) -> bool:
+    if not path.is_dir():
+        if not check_mode:
+            make_dirs(path, mode, uid, gid)
+            path.chmod(mode)
+        return True
+    return ensure_attributes(path, uid, gid, mode, check_mode)
+
+
+def ensure_file(path: Path, content: bytes, force: bool, uid: int, gid: int, mode: int, check_mode: bool) -> bool:
+    if path.is_file():
+        if not force:
+            # Left for the user to change
+            return False
+        if path.stat().st_size == len(content) and path.read_bytes() == content:
+            return ensure_attributes(path, uid, gid, mode, check_mode)
+    if check_mode:
+        return True
+
+    make_dirs(path.parent, 0o775, uid, gid)
+    with phase('write'):
+        fd, tempname = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.chown(tempname, uid, gid)
+            os.chmod(tempname, mode)
+            os.replace(tempname, str(path))
+        except BaseException:
+            os.remove(tempname)
+            raise
+    return True
+
+
+def describe_path(path: Path) -> Dict[str, Any]:
+    try:
+        path_stat = path.stat()
+    except FileNotFoundError:
+        return {'path': str(path), 'state': 'absent'}
+    return {
+        'path': str(path),
+        'state': 'directory' if stat.S_ISDIR(path_stat.st_mode) else 'file',
+        'owner': path_stat.st_uid,
+        'group': path_stat.st_gid,
+        'mode': f'{stat.S_IMODE(path_stat.st_mode):04o}'
+    }
+
+
+def read_text(path: Path) -> str:
+    try:
+        return path.read_bytes().decode('utf-8', errors='replace')
+    except (FileNotFoundError, IsADirectoryError):
+        return ''
+
+
+def apply_user_files(
+        base_dir: str,
+        archive_path: Path,
+        directories: List[Dict[str, Any]],
+        files: List[Dict[str, Any]],
+        check_mode: bool = False,
+        diff: bool = False) -> Tuple[bool, List[str], List[Dict[str, Any]]]:
+    contents = read_archive(archive_path)
+    owners: Dict[Tuple[str, str], Tuple[int, int, str]] = {}
+
+    def resolve(entry: Dict[str, Any]) -> Tuple[int, int, Path]:
+        key = (entry['username'], entry['group'])
+        if key not in owners:
+            owners[key] = resolve_owner(*key)
+        uid, gid, username = owners[key]
+        return uid, gid, user_path(username, base_dir) / entry['path']
+
+    changed_paths = []
+    diffs: List[Dict[str, Any]] = []
+    for directory in directories:
+        uid, gid, path = resolve(directory)
+        mode = int(directory['mode'], 8)
+        before = describe_path(path) if diff else {}
+        if ensure_directory(path, uid, gid, mode, check_mode):
+            changed_paths.append(str(path))
+            if diff:
+                diffs.append({'before': before, 'after': dict(path=str(path), state='directory', owner=uid, group=gid, mode=f'{mode:04o}')})
+
+    for file in files:
+        uid, gid, path = resolve(file)
+        if file['content'] not in contents:
+            raise IntellijError(f"Content for {path} missing from archive: {file['content']}")
+        content = contents[file['content']]
+        mode = int(file['mode'], 8)
+        before_text = read_text(path) if diff else ''
+        before = describe_path(path) if diff else {}
+        if ensure_file(path, content, file['force'], uid, gid, mode, check_mode):
+            changed_paths.append(str(path))
+            if diff:
+                after_text = content.decode('utf-8', errors='replace')
+                if before_text != after_text:
+                    diffs.append({'before': before_text, 'after': after_text, 'before_header': str(path), 'after_header': str(path)})
+                else:
+                    diffs.append({'before': before, 'after': dict(path=str(path), state='file', owner=uid, group=gid, mode=f'{mode:04o}')})
+
+    if changed_paths and not check_mode:
+        count('user_files_changed', len(changed_paths))
+    return bool(changed_paths), changed_paths, diffs
@@ -0,0 +1,141 @@
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ansible.module_utils.intellij.common import IntellijError, make_dirs, write_file
+
+GC_OPTIONS = {
+    'g1': '-XX:+UseG1GC',
+    'parallel': '-XX:+UseParallelGC',
+    'serial': '-XX:+UseSerialGC',
+    'shenandoah': '-XX:+UseShenandoahGC',
+    'zgc': '-XX:+UseZGC'
+}
+
+
+def option_key(option: str) -> str:
+    # Options that set the same thing share a key e.g. -Xmx2g/-Xmx4096m and
+    # -XX:+UseZGC/-XX:+UseG1GC (only one garbage collector can be selected)
+    option = option.strip()
+    if re.match(r'^-XX:[+-]Use[A-Za-z0-9]*GC$', option):
+        return '-XX:UseGC'
+    matcher = re.match(r'^(-Xm[sx]|-Xss|-XX:[+-]?[A-Za-z0-9]+|-D[^=]+)', option)
+    if matcher:
+        return re.sub(r'^-XX:[+-]', '-XX:', matcher.group(1))
+    return option
+
+
+def round_down(value: int, multiple: int) -> int:
+    return value - value % multiple
+
+
+def parse_size_mb(size: str) -> int:
+    matcher = re.match(r'^([0-9]+)([kKmMgG]?)$', size.strip())
+    if not matcher:
+        raise IntellijError(f'Invalid size: {size}')
+    value = int(matcher.group(1))
+    unit = matcher.group(2).lower()
+    return {'': value // (1024 * 1024), 'k': value // 1024, 'm': value, 'g': value * 1024}[unit]
+
+
+MIN_HEAP_MB = 1024
+MAX_HEAP_MB = 16384
+
+# The collectors that take -XX:ParallelGCThreads (ZGC and Shenandoah mostly
+# use their own concurrent threads)
+PARALLEL_GCS = ('g1', 'parallel')
+
+
+SHARED_ARCHIVE_FILE_OPTION = '-XX:SharedArchiveFile'
+
+
+def shared_archive_options(shared_archive_file: Optional[Path], check_mode: bool = False) -> Tuple[List[str], List[str]]:
+    # Options to set and options to remove: the JVM can't use an archive that
+    # has been removed (or was generated for another build)
+    if shared_archive_file and (check_mode or shared_archive_file.is_file()):
+        return [f'{SHARED_ARCHIVE_FILE_OPTION}={shared_archive_file}'], []
+    return [], [SHARED_ARCHIVE_FILE_OPTION]
+
+
+def size_vmoptions(
+        memtotal_mb: int,
+        processor_count: int,
+        concurrent_users: int = 1,
+        heap_size: Optional[str] = None,
+        reserved_code_cache_size: Optional[str] = None,
+        gc: Optional[str] = None,
+        parallel_gc_threads: Optional[int] = None) -> Tuple[List[str], List[str]]:
+    concurrent_users = max(concurrent_users, 1)
+    warnings = []
+
+    # A third of each user's share of memory (the rest is for the OS, the
+    # build tools and the applications being developed), but never more than
+    # the share itself
+    if not heap_size:
+        share_mb = memtotal_mb // concurrent_users
+        heap_mb = min(max(round_down(share_mb // 3, 256), MIN_HEAP_MB), MAX_HEAP_MB)
+        if share_mb < MIN_HEAP_MB:
+            heap_mb = max(round_down(share_mb, 64), 64)
+            warnings.append(
+                f'Each user\'s share of memory ({share_mb} MB of {memtotal_mb} MB for {concurrent_users} concurrent users) is less than '
+                f'the minimum heap size of {MIN_HEAP_MB} MB, so the heap is limited to {heap_mb} MB; set a heap size or reduce the '
+                'number of concurrent users')
+        heap_size = f'{heap_mb}m'
+
+    heap_mb = parse_size_mb(heap_size)
+    if not reserved_code_cache_size:
+        reserved_code_cache_size = '1024m' if heap_mb >= 4096 else '512m'
+
+    if not gc:
+        gc = 'g1' if processor_count >= 2 and heap_mb >= 1792 else 'serial'
+
+    options = [f'-Xmx{heap_size}', f'-XX:ReservedCodeCacheSize={reserved_code_cache_size}', GC_OPTIONS[gc]]
+
+    if parallel_gc_threads:
+        options.append(f'-XX:ParallelGCThreads={parallel_gc_threads}')
+    elif gc in PARALLEL_GCS:
+        options.append(f'-XX:ParallelGCThreads={max(processor_count // concurrent_users, 1)}')
+
+    return options, warnings
+
+
+def merge_vmoptions(text: str, options: List[str], remove_options: Sequence[str] = ()) -> str:
+    lines = text.splitlines()
+    pending = {option_key(x): x for x in options}
+    removed = {option_key(x) for x in remove_options} - set(pending)
+
+    merged = []
+    for line in lines:
+        key = option_key(line) if line.strip() and not line.lstrip().startswith('#') else None
+        if key in pending:
+            merged.append(pending.pop(key))
+        elif key in removed:
+            continue
+        elif key is None or key not in {option_key(x) for x in options}:
+            merged.append(line)
+        # else: a duplicate of a managed option
+
+    merged.extend(pending.values())
+    return '\n'.join(merged) + '\n'
+
+
+def update_vmoptions(
+        vmoptions_path: Path,
+        options: List[str],
+        uid: int,
+        gid: int,
+        check_mode: bool = False,
+        remove_options: Sequence[str] = ()) -> Tuple[bool, Dict[str, str]]:
+    try:
+        before = vmoptions_path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        before = ''
+
+    after = merge_vmoptions(before, options, remove_options)
+
+    changed = before != after
+    if changed and not check_mode:
+        make_dirs(vmoptions_path.parent, 0o775, uid, gid)
+        write_file(vmoptions_path, after, uid, gid, encoding='utf-8')
+
+    return changed, {'before': before, 'after': after}
@@ -0,0 +1,144 @@
+import json
+import os
+import pwd
+import signal
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ansible.module_utils.intellij.common import IntellijError, resolve_owner, user_path, write_file
+from ansible.module_utils.intellij.plugins import get_build_number
+from ansible.module_utils.intellij.timing import count, phase
+
+OUTPUT_TAIL_CHARS = 2000
+
+WARMUP_STAMPS_FORMAT = 1
+
+# Kept in the user's system directory with the indexes, so the projects are
+# warmed up again when the indexes are removed
+WARMUP_STAMPS_FILENAME = 'intellij-warmup.json'
+
+
+def warmup_command(intellij_home: Path, username: str, project_dir: Path) -> List[str]:
+    try:
+        home = pwd.getpwnam(username).pw_dir
+    except KeyError:
+        raise IntellijError(f"User '{username}' does not exist")
+    # runuser doesn't change the environment, so the IDE would otherwise use
+    # root's config and system directories
+    return [
+        'runuser', '-u', username, '--',
+        'env', f'HOME={home}', f'USER={username}', f'LOGNAME={username}',
+        str(intellij_home / 'bin' / 'idea.sh'), 'warmup', f'--project-dir={project_dir}'
+    ]
+
+
+def run_warmup(intellij_home: Path, username: str, project_dir: Path, timeout: int) -> Dict[str, Any]:
+    result: Dict[str, Any] = {'username': username, 'project': str(project_dir)}
+    if not project_dir.is_dir():
+        return dict(result, status='missing', duration=0.0)
+
+    start = time.monotonic()
+    # In a new session so the IDE started by idea.sh is killed on timeout too
+    process = subprocess.Popen(
+        warmup_command(intellij_home, username, project_dir),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        start_new_session=True
+    )
+    try:
+        output, _ = process.communicate(timeout=timeout)
+        status = 'ok' if process.returncode == 0 else 'failed'
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            # Exited since the timeout
+            pass
+        output, _ = process.communicate()
+        status = 'timeout'
+
+    return dict(
+        result,
+        status=status,
+        rc=process.returncode,
+        duration=round(time.monotonic() - start, 3),
+        output=output[-OUTPUT_TAIL_CHARS:] if status != 'ok' else ''
+    )
+
+
+def project_stamp(build_number: str, project_dir: Path) -> Optional[Dict[str, Any]]:
+    try:
+        mtime_ns = project_dir.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return {'build': build_number, 'mtime_ns': mtime_ns}
+
+
+def load_warmup_stamps(stamps_path: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(stamps_path, 'r', encoding='utf-8') as stamps_file:
+            stamps = json.load(stamps_file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(stamps, dict) or stamps.get('format') != WARMUP_STAMPS_FORMAT:
+        return {}
+    return stamps.get('projects', {})
+
+
+def save_warmup_stamps(stamps_path: Path, stamps: Dict[str, Dict[str, Any]], uid: int, gid: int) -> None:
+    if not stamps_path.parent.is_dir():
+        # The system directory is created by the IDE
+        return
+    text = json.dumps({'format': WARMUP_STAMPS_FORMAT, 'projects': stamps}, indent=2, sort_keys=True)
+    write_file(stamps_path, text, uid, gid, mode=0o644, encoding='utf-8')
+
+
+def warmup_projects(
+        intellij_home: Path,
+        users: List[Dict[str, Any]],
+        intellij_user_system_dir: str,
+        parallelism: int,
+        timeout: int,
+        check_mode: bool = False) -> List[Dict[str, Any]]:
+    launcher = intellij_home / 'bin' / 'idea.sh'
+    if not launcher.is_file():
+        raise IntellijError(f'File not found: {launcher}')
+
+    build_number = get_build_number(intellij_home)
+
+    def warmup_user(user: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # An IDE instance locks the user's system directory, so each user's
+        # projects are warmed up one at a time
+        username = user['username']
+        uid, gid, _ = resolve_owner(username, user.get('intellij_group') or username)
+        stamps_path = user_path(username, intellij_user_system_dir) / WARMUP_STAMPS_FILENAME
+        stamps = load_warmup_stamps(stamps_path)
+
+        user_results = []
+        for project in user.get('intellij_warmup_projects') or []:
+            project_dir = user_path(username, project)
+            stamp = project_stamp(build_number, project_dir)
+            if stamp is not None and stamps.get(str(project_dir)) == stamp:
+                # Already indexed by this build and unchanged since
+                user_results.append({'username': username, 'project': str(project_dir), 'status': 'up_to_date', 'duration': 0.0})
+            elif check_mode:
+                status = 'pending' if project_dir.is_dir() else 'missing'
+                user_results.append({'username': username, 'project': str(project_dir), 'status': status, 'duration': 0.0})
+            else:
+                result = run_warmup(intellij_home, username, project_dir, timeout)
+                if result['status'] == 'ok':
+                    # After the warmup, which may add the .idea directory
+                    stamps[str(project_dir)] = project_stamp(build_number, project_dir)
+                    save_warmup_stamps(stamps_path, stamps, uid, gid)
+                user_results.append(result)
+        return user_results
+
+    with phase('warmup'), ThreadPoolExecutor(max_workers=max(parallelism, 1)) as executor:
+        results = [x for user_results in executor.map(warmup_user, users) for x in user_results]
+
+    count('projects_warmed_up', len([x for x in results if x['status'] == 'ok']))
+    return results
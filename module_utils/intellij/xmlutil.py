@@ -0,0 +1,116 @@
+import re
+from pathlib import Path
+from typing import Any, Tuple
+
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.timing import phase
+
+# lxml is only used to speed things up when it's already installed, the
+# standard library ElementTree supports everything needed here.
+try:
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as etree
+    HAS_LXML = False
+
+INDENT = '  '
+
+
+def _strip_blank_text(elem: Any) -> None:
+    if elem.text is not None and not elem.text.strip():
+        elem.text = None
+    if elem.tail is not None and not elem.tail.strip():
+        elem.tail = None
+    for child in elem:
+        _strip_blank_text(child)
+
+
+def _indent(elem: Any, level: int = 0) -> None:
+    if len(elem) == 0:
+        return
+
+    child_indent = '\n' + INDENT * (level + 1)
+    if elem.text is None:
+        elem.text = child_indent
+    for child in elem:
+        _indent(child, level + 1)
+        if child.tail is None:
+            child.tail = child_indent
+    if elem[-1].tail == child_indent:
+        elem[-1].tail = '\n' + INDENT * level
+
+
+def pretty_print(elem: Any) -> str:
+    text = etree.tostring(elem, encoding='unicode')
+
+    if HAS_LXML:
+        parser = etree.XMLParser(remove_blank_text=True)
+        xml = etree.fromstring(text, parser)
+        return etree.tostring(xml, encoding='unicode', pretty_print=True, xml_declaration=False)
+
+    xml = etree.fromstring(text)
+    _strip_blank_text(xml)
+    _indent(xml)
+    # Match the lxml formatting of empty elements so the output doesn't
+    # depend on which XML library the host has.
+    return re.sub(' />', '/>', etree.tostring(xml, encoding='unicode')) + '\n'
+
+
+def parse(source: Any) -> Any:
+    if isinstance(source, Path):
+        source = str(source)
+    return etree.parse(source).getroot()
+
+
+def load_document(path: Path, root_tag: str = 'application') -> Tuple[Any, str]:
+    if not path.is_file() or path.stat().st_size == 0:
+        return etree.Element(root_tag), ''
+
+    with phase('parse'):
+        root = parse(path)
+        if root.tag != root_tag:
+            raise IntellijError(f'Unsupported root element: {root.tag}')
+        return root, pretty_print(root)
+
+
+def find_named(elem: Any, tag: str, name: str, attrib: str = 'name') -> Any:
+    # Compared in Python rather than XPath so names may contain quotes
+    for child in elem.findall(f'./{tag}'):
+        if child.get(attrib) == name:
+            return child
+    return None
+
+
+def find_or_create(elem: Any, tag: str, name: str = None) -> Any:
+    if name is None:
+        child = elem.find(f'./{tag}')
+        if child is None:
+            child = etree.SubElement(elem, tag)
+        return child
+
+    child = find_named(elem, tag, name)
+    if child is None:
+        child = etree.SubElement(elem, tag, name=name)
+    return child
+
+
+def replace_child(parent: Any, old: Any, new: Any) -> None:
+    parent[list(parent).index(old)] = new
+
+
+def set_attrib(elem: Any, key: str, value: str) -> bool:
+    if elem.attrib.get(key) == value:
+        return False
+
+    elem.set(key, value)
+    return True
+
+
+def set_option(elem: Any, key: str, value: str) -> bool:
+    return set_attrib(find_or_create(elem, 'option', key), 'value', value)
+
+
+def default_project(root: Any) -> Any:
+    project_manager = find_or_create(root, 'component', 'ProjectManager')
+    return find_or_create(project_manager, 'defaultProject')
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 
@@ -10,6 +12,12 @@ def test_idea_installed(host):
     ('options/jdk.table.xml', '/usr/lib/jvm/java-1.8.0-openjdk'),
     ('options/jdk.table.xml', '/opt/java/jdk-11.0.24+8'),
     ('options/project.default.xml', '/test/maven/home'),
+    ('options/project.default.xml',
+     'option name="vmOptionsForImporter" value="-Xmx2g"'),
+    ('options/gradle.settings.xml',
+     'component name="GradleSystemSettings"'),
+    ('options/gradle.settings.xml',
+     'option name="gradleVmOptions" value="-Xmx1g"'),
     ('codestyles/Example1.xml', 'code_scheme name="Example1"'),
     ('codestyles/Example2.xml', 'code_scheme name="Example2"'),
     ('codestyles/GoogleStyle.xml', 'code_scheme name="GoogleStyle"'),
@@ -34,6 +42,38 @@ def test_config_files(host, file_path, expected_text):
     assert host.file(config_home + '/' + file_path).contains(expected_text)
 
 
+def test_default_gradle_settings(host):
+    config_dir_pattern = (
+        '\\.config/JetBrains/(IdeaIC|IntelliJIdea)[0-9]+\\.[0-9]$')
+    config_home = host.check_output('find %s | grep --color=never -E %s',
+                                    '/home/test_usr',
+                                    config_dir_pattern)
+
+    # Read back from the components IntelliJ loads them from
+    read_option = (
+        'import sys, xml.etree.ElementTree as ET; '
+        'print(ET.parse(sys.argv[1]).find(sys.argv[2]).get("value"))')
+
+    delegated_build = host.check_output(
+        'python3 -c %s %s %s', read_option,
+        config_home + '/options/project.default.xml',
+        './component[@name="ProjectManager"]/defaultProject'
+        '/component[@name="DefaultGradleProjectSettings"]'
+        '/option[@name="delegatedBuild"]')
+    assert delegated_build == 'false'
+
+    vm_options = host.check_output(
+        'python3 -c %s %s %s', read_option,
+        config_home + '/options/gradle.settings.xml',
+        './component[@name="GradleSystemSettings"]'
+        '/option[@name="gradleVmOptions"]')
+    assert vm_options == '-Xmx1g'
+
+    gradle_properties = host.file('/home/test_usr/.gradle/gradle.properties')
+    assert gradle_properties.contains('^org.gradle.parallel=true$')
+    assert gradle_properties.user == 'test_usr'
+
+
 @pytest.mark.parametrize('plugin_dir_name', [
     'idea_plugin',
     'MavenHelper'
@@ -72,3 +112,14 @@ def test_jar_plugin_installed(host):
     assert plugin_file.user == 'test_usr'
     assert plugin_file.group == 'test_usr'
     assert plugin_file.mode == 0o644
+
+
+def test_inventory_facts(host):
+    fact_file = host.file('/etc/ansible/facts.d/intellij_inventory.fact')
+    inventory = json.loads(fact_file.content_string)
+
+    assert inventory['build_number']
+
+    test_usr = inventory['users']['test_usr']
+    assert {'1.8', '11'} <= {jdk['name'] for jdk in test_usr['jdks']}
+    assert 'MavenRunHelper' in {plugin['id'] for plugin in test_usr['plugins']}
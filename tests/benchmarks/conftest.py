@@ -0,0 +1,127 @@
+"""Synthetic fixtures for the module_utils microbenchmarks."""
+import json
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from ansible.module_utils.intellij.jdk import JDK_INFO_FIELDS, create_jdk_xml, get_jdk_info, jdk_stamp, save_jdk_catalog_entry
+from ansible.module_utils.intellij.xmlutil import etree, pretty_print
+
+JDK_MODULES = 70
+SOURCE_FILES_PER_MODULE = 200
+PLUGIN_ENTRIES = 10000
+JDK_TABLE_SIZE = 200
+PROJECT_DEFAULT_COMPONENTS = 500
+BUILD_NUMBER = '243.26053.27'
+
+
+def write_fake_java(jdk_home: Path, version: str) -> None:
+    bin_dir = jdk_home / 'bin'
+    bin_dir.mkdir(parents=True)
+    for name in ('java', 'javac'):
+        executable = bin_dir / name
+        executable.write_text(f'#!/bin/sh\necho \'openjdk version "{version}"\' >&2\n')
+        executable.chmod(0o755)
+
+
+@pytest.fixture(scope='session')
+def jdk_home(tmp_path_factory) -> Path:
+    """A Java 17 style JDK with jmods and a src.zip laid out per module."""
+    home = tmp_path_factory.mktemp('jdk') / 'jdk-17'
+    write_fake_java(home, '17.0.12')
+
+    jmods = home / 'jmods'
+    jmods.mkdir()
+    module_names = [f'jdk.module{i:02d}' for i in range(JDK_MODULES)]
+    for module_name in module_names:
+        (jmods / f'{module_name}.jmod').touch()
+
+    lib = home / 'lib'
+    lib.mkdir()
+    with zipfile.ZipFile(lib / 'src.zip', 'w') as src_zip:
+        for module_name in module_names:
+            src_zip.writestr(f'{module_name}/module-info.java', f'module {module_name} {{}}\n')
+            for i in range(SOURCE_FILES_PER_MODULE):
+                src_zip.writestr(f'{module_name}/jdk/internal/Class{i}.java', '')
+    return home
+
+
+@pytest.fixture(scope='session')
+def jdk_catalog(tmp_path_factory, jdk_home) -> Path:
+    """A JDK catalog already holding the jdk_home fixture."""
+    catalog_path = tmp_path_factory.mktemp('catalog') / 'jdk-catalog.json'
+    # The fake javac can't compile the specification version probe
+    save_jdk_catalog_entry(catalog_path, jdk_home, {'stamp': jdk_stamp(jdk_home), 'specification_version': '17'})
+    get_jdk_info(jdk_home, catalog_path, fields=JDK_INFO_FIELDS)
+    return catalog_path
+
+
+@pytest.fixture(scope='session')
+def plugin_zip(tmp_path_factory) -> Path:
+    """A plugin distribution with PLUGIN_ENTRIES files."""
+    path = tmp_path_factory.mktemp('plugins') / 'big-plugin.zip'
+    with zipfile.ZipFile(path, 'w') as z:
+        for i in range(PLUGIN_ENTRIES):
+            z.writestr(f'big-plugin/lib/dir{i % 100:02d}/file{i}.txt', b'x' * 64)
+    return path
+
+
+@pytest.fixture(scope='session', params=['jar', 'json'])
+def intellij_home(request, tmp_path_factory) -> Path:
+    """An IntelliJ home identifying its build either through resources.jar or product-info.json."""
+    home = tmp_path_factory.mktemp(f'idea-{request.param}')
+    if request.param == 'jar':
+        lib = home / 'lib'
+        lib.mkdir()
+        with zipfile.ZipFile(lib / 'resources.jar', 'w') as resources:
+            for i in range(2000):
+                resources.writestr(f'messages/Bundle{i}.properties', 'key=value\n')
+            resources.writestr(
+                'idea/IdeaApplicationInfo.xml',
+                '<component xmlns="http://jetbrains.org/intellij/schema/application-info">'
+                f'<build number="{BUILD_NUMBER}" date="202501010000"/></component>')
+    else:
+        (home / 'product-info.json').write_text(json.dumps({'buildNumber': BUILD_NUMBER, 'launch': [{'os': 'Linux'}] * 50}))
+    return home
+
+
+@pytest.fixture
+def config_dir(tmp_path, jdk_home) -> Path:
+    """A user config dir with JDK_TABLE_SIZE JDKs and PROJECT_DEFAULT_COMPONENTS default project components."""
+    options = tmp_path / 'options'
+    options.mkdir()
+
+    jdk_info = {
+        'version': 'openjdk version "11.0.24"',
+        'class_roots': [f'jrt://{jdk_home}!/java.module{i}' for i in range(JDK_MODULES)],
+        'source_roots': [f'jar://{jdk_home}/lib/src.zip!/java.module{i}' for i in range(JDK_MODULES)]
+    }
+    jdk_table = etree.Element('application')
+    project_jdk_table = etree.SubElement(jdk_table, 'component', name='ProjectJdkTable')
+    for i in range(JDK_TABLE_SIZE):
+        project_jdk_table.append(create_jdk_xml(f'jdk-{i}', Path(f'/opt/java/jdk-{i}'), jdk_info))
+    project_jdk_table.append(create_jdk_xml('17', jdk_home, jdk_info))
+    (options / 'jdk.table.xml').write_text(pretty_print(jdk_table), encoding='iso-8859-1')
+
+    project_default = etree.Element('application')
+    project_manager = etree.SubElement(project_default, 'component', name='ProjectManager')
+    default_project = etree.SubElement(project_manager, 'defaultProject')
+    for i in range(PROJECT_DEFAULT_COMPONENTS):
+        component = etree.SubElement(default_project, 'component', name=f'Component{i}')
+        for j in range(5):
+            etree.SubElement(component, 'option', name=f'option{j}', value=str(j))
+    (options / 'project.default.xml').write_text(pretty_print(project_default), encoding='iso-8859-1')
+
+    return tmp_path
+
+
+@pytest.fixture(scope='session')
+def build_number() -> str:
+    return BUILD_NUMBER
+
+
+@pytest.fixture
+def owner():
+    return os.getuid(), os.getgid()
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from ansible.module_utils.intellij.jdk import configure_jdks, get_class_path, get_source_path
+
+
+def test_get_source_path(benchmark, jdk_home):
+    roots = benchmark(get_source_path, jdk_home)
+    assert len(roots) == 70
+
+
+def test_get_class_path(benchmark, jdk_home):
+    roots = benchmark(get_class_path, jdk_home)
+    assert len(roots) == 70
+
+
+def test_configure_jdk_cold(benchmark, config_dir, jdk_home, owner):
+    uid, gid = owner
+    # Without a catalog every call inspects the JDK (including running java)
+    result, _ = benchmark(configure_jdks, config_dir, [('17', jdk_home)], uid, gid, check_mode=True)
+    assert result['updated'] == ['17']
+
+
+def test_configure_jdk_cataloged(benchmark, config_dir, jdk_home, jdk_catalog, owner):
+    uid, gid = owner
+    result, _ = benchmark(configure_jdks, config_dir, [('17', jdk_home)], uid, gid, jdk_catalog, check_mode=True)
+    assert result['updated'] == ['17']
+
+
+def test_configure_jdk_add(benchmark, config_dir, jdk_home, jdk_catalog, owner):
+    uid, gid = owner
+    result, _ = benchmark(configure_jdks, config_dir, [('new', jdk_home)], uid, gid, jdk_catalog, check_mode=True)
+    assert result['added'] == ['new']
+
+
+def test_configure_jdk_remove_missing(benchmark, config_dir, jdk_catalog, owner):
+    uid, gid = owner
+    result, _ = benchmark(configure_jdks, config_dir, [], uid, gid, jdk_catalog, remove_missing=True, check_mode=True)
+    assert len(result['removed']) == 200
+
+
+def test_configure_jdk_write(benchmark, config_dir, jdk_home, jdk_catalog, owner):
+    uid, gid = owner
+    names = iter(range(1000000))
+
+    def configure():
+        return configure_jdks(config_dir, [(f'new-{next(names)}', Path(jdk_home))], uid, gid, jdk_catalog)
+
+    result, _ = benchmark(configure)
+    assert len(result['added']) == 1
@@ -0,0 +1,27 @@
+import shutil
+
+from ansible.module_utils.intellij.plugins import extract_zip, get_build_number, get_root_dirname_from_zip
+
+
+def test_extract_zip(benchmark, tmp_path, plugin_zip, owner):
+    uid, gid = owner
+    output_dirs = []
+
+    def setup():
+        output_dir = tmp_path / f'plugins{len(output_dirs)}'
+        output_dir.mkdir()
+        output_dirs.append(output_dir)
+        if len(output_dirs) > 1:
+            shutil.rmtree(output_dirs[-2])
+        return (output_dir, plugin_zip, uid, gid), {}
+
+    benchmark.pedantic(extract_zip, setup=setup, rounds=5)
+    assert (output_dirs[-1] / 'big-plugin' / 'lib').is_dir()
+
+
+def test_get_root_dirname_from_zip(benchmark, plugin_zip):
+    assert benchmark(get_root_dirname_from_zip, plugin_zip) == 'big-plugin'
+
+
+def test_get_build_number(benchmark, intellij_home, build_number):
+    assert benchmark(get_build_number, intellij_home) == build_number
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from ansible.module_utils.intellij.project_defaults import set_default_inspection_profile, set_default_jdk, set_default_maven
+
+
+def test_set_default_jdk(benchmark, config_dir, jdk_catalog, owner):
+    uid, gid = owner
+    changed, _ = benchmark(set_default_jdk, config_dir, '17', uid, gid, jdk_catalog, check_mode=True)
+    assert changed
+
+
+def test_set_default_maven(benchmark, config_dir, owner):
+    uid, gid = owner
+    changed, _ = benchmark(set_default_maven, config_dir, Path('/opt/maven'), uid, gid, check_mode=True)
+    assert changed
+
+
+def test_set_default_inspection_profile(benchmark, config_dir, owner):
+    uid, gid = owner
+    changed, _ = benchmark(set_default_inspection_profile, config_dir, 'Acme', uid, gid, check_mode=True)
+    assert changed
+
+
+def test_set_default_maven_write(benchmark, config_dir, owner):
+    uid, gid = owner
+    homes = iter(range(1000000))
+
+    def set_maven():
+        return set_default_maven(config_dir, Path(f'/opt/maven-{next(homes)}'), uid, gid)
+
+    changed, _ = benchmark(set_maven)
+    assert changed
@@ -0,0 +1,8 @@
+"""PyTest configuration for testing the role's module_utils in-process."""
+from pathlib import Path
+
+import ansible.module_utils
+
+# Ansible only adds the role's module_utils to the package path when it builds
+# a module payload, so add it here to allow importing the code directly.
+ansible.module_utils.__path__.append(str(Path(__file__).resolve().parent.parent / 'module_utils'))
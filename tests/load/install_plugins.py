@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Load test for installing plugins against a local plugin repository.
+
+Installs plugins for many synthetic users under a temporary directory, using
+the same code as the ``intellij_install_plugin`` module, and reports the wall
+time, the requests made, the bytes transferred and the download cache hit
+rate.
+
+Example::
+
+    python tests/load/install_plugins.py --users 300 --plugins 40 --error-rate 0.05
+    python tests/load/install_plugins.py --users 50 --throttle-rate 0.1 --retry-after 2
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import ansible.module_utils
+
+# Ansible only adds the role's module_utils to the package path when it builds
+# a module payload, so add it here to allow importing the code directly.
+ansible.module_utils.__path__.append(str(Path(__file__).resolve().parents[2] / 'module_utils'))
+
+from ansible.module_utils.intellij.common import IntellijError  # noqa: E402
+from ansible.module_utils.intellij.plugins import install_plugin  # noqa: E402
+from ansible.module_utils.intellij import timing  # noqa: E402
+
+from plugin_repository import PluginRepository  # noqa: E402
+
+BUILD_NUMBER = '243.26053.27'
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=200, help='number of synthetic users (default: %(default)s)')
+    parser.add_argument('--plugins', type=int, default=50, help='number of plugins in the repository (default: %(default)s)')
+    parser.add_argument('--plugins-per-user', type=int, default=10, help='plugins installed for each user (default: %(default)s)')
+    parser.add_argument('--zip-entries', type=int, default=100, help='files in each zip plugin (default: %(default)s)')
+    parser.add_argument('--forks', type=int, default=1, help='users installed concurrently (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response (default: %(default)s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of responses that fail with 503 (default: %(default)s)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='fraction of responses that are rate limited with 429 (default: %(default)s)')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds of rate limited responses (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for plugin selection and errors (default: %(default)s)')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+    if args.plugins_per_user > args.plugins:
+        parser.error('--plugins-per-user must not be greater than --plugins')
+    return args
+
+
+def create_intellij_home(work_dir: Path) -> Path:
+    intellij_home = work_dir / 'idea'
+    intellij_home.mkdir()
+    (intellij_home / 'product-info.json').write_text(json.dumps({'buildNumber': BUILD_NUMBER}))
+    return intellij_home
+
+
+def install_user_plugins(
+        repository: PluginRepository,
+        intellij_home: Path,
+        download_cache: Path,
+        plugins_dir: Path,
+        plugin_ids: List[str]) -> Tuple[int, List[str]]:
+    uid, gid = os.getuid(), os.getgid()
+    changed = 0
+    failures = []
+    for plugin_id in plugin_ids:
+        try:
+            if install_plugin(repository.url, intellij_home, plugins_dir, uid, gid, plugin_id, download_cache):
+                changed += 1
+        except IntellijError as e:
+            failures.append(f'{plugins_dir.parent.name}/{plugin_id}: {e}')
+    return changed, failures
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    repository = PluginRepository(
+        args.plugins,
+        zip_entries=args.zip_entries,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed)
+    repository.start()
+
+    selector = random.Random(args.seed)
+    plugin_ids = [f'plugin-{i}' for i in range(args.plugins)]
+
+    try:
+        with tempfile.TemporaryDirectory(prefix='intellij-load-') as tmp:
+            work_dir = Path(tmp)
+            intellij_home = create_intellij_home(work_dir)
+            download_cache = work_dir / 'cache'
+
+            jobs = [
+                (work_dir / 'home' / f'user{n}' / 'plugins', selector.sample(plugin_ids, args.plugins_per_user))
+                for n in range(args.users)
+            ]
+
+            timing.reset()
+            start = time.monotonic()
+            with ThreadPoolExecutor(max_workers=args.forks) as executor:
+                results = list(executor.map(
+                    lambda job: install_user_plugins(repository, intellij_home, download_cache, *job), jobs))
+            wall_time = time.monotonic() - start
+    finally:
+        repository.stop()
+
+    stats = repository.stats
+    installs = args.users * args.plugins_per_user
+    failures = [failure for _, user_failures in results for failure in user_failures]
+    downloads = stats.get('downloads', 0)
+    attempted = installs - len(failures)
+
+    return {
+        'wall_time': round(wall_time, 3),
+        'installs': installs,
+        'changed': sum(changed for changed, _ in results),
+        'failed': len(failures),
+        'head_requests': stats.get('HEAD requests', 0),
+        'get_requests': stats.get('GET requests', 0),
+        'server_errors': stats.get('errors', 0),
+        'throttled': stats.get('throttled', 0),
+        'bytes_transferred': stats.get('bytes sent', 0),
+        'cache_hit_rate': round(1 - downloads / attempted, 4) if attempted else 0.0,
+        'failures': failures[:10],
+        **timing.results()
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    report = run(args)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            if key not in ('failures', 'timings', 'counters'):
+                print(f'{key.replace("_", " "):<20} {value}')
+        for phase, seconds in sorted(report['timings'].items()):
+            print(f'phase {phase:<14} {seconds:.3f}')
+        for name, value in sorted(report['counters'].items()):
+            print(f'{name.replace("_", " "):<20} {value}')
+        for failure in report['failures']:
+            print(f'failure            {failure}')
+
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
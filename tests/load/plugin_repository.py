@@ -0,0 +1,162 @@
+"""A local stand-in for the JetBrains plugin repository.
+
+Implements just enough of ``pluginManager/?action=download`` for
+``intellij_install_plugin``: a HEAD request is redirected (302) to the plugin
+file, which is then downloaded with a GET. Plugins with an even number are
+served as jar files and the rest as zip files.
+"""
+import io
+import random
+import threading
+import time
+import urllib.parse
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+
+def create_jar(plugin_id: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as jar:
+        jar.writestr('META-INF/plugin.xml', f'<idea-plugin><id>{plugin_id}</id></idea-plugin>')
+    return buffer.getvalue()
+
+
+def create_zip(plugin_id: str, entries: int, entry_size: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as plugin_zip:
+        plugin_zip.writestr(f'{plugin_id}/lib/{plugin_id}.jar', create_jar(plugin_id))
+        for i in range(entries):
+            plugin_zip.writestr(f'{plugin_id}/lib/resources/file{i}.txt', b'x' * entry_size)
+    return buffer.getvalue()
+
+
+class PluginRepository(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+            self,
+            plugins: int,
+            zip_entries: int = 100,
+            entry_size: int = 1024,
+            latency: float = 0.0,
+            error_rate: float = 0.0,
+            throttle_rate: float = 0.0,
+            retry_after: int = 1,
+            seed: int = 0) -> None:
+        super().__init__(('127.0.0.1', 0), PluginRequestHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+
+        # Payloads are shared between plugins of the same type, only the names differ
+        jar = create_jar('plugin')
+        self.payloads: Dict[str, Tuple[str, bytes]] = {}
+        for i in range(plugins):
+            plugin_id = f'plugin-{i}'
+            if i % 2 == 0:
+                self.payloads[plugin_id] = (f'{plugin_id}.jar', jar)
+            else:
+                self.payloads[plugin_id] = (f'{plugin_id}.zip', create_zip(plugin_id, zip_entries, entry_size))
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/pluginManager/'
+
+    def count(self, key: str, value: int = 1) -> None:
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + value
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def should_throttle(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.throttle_rate
+
+    def start(self) -> None:
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class PluginRequestHandler(BaseHTTPRequestHandler):
+    server: PluginRepository
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_HEAD(self) -> None:
+        self.handle_request(send_body=False)
+
+    def do_GET(self) -> None:
+        self.handle_request(send_body=True)
+
+    def handle_request(self, send_body: bool) -> None:
+        server = self.server
+        server.count(f'{self.command} requests')
+        if server.latency:
+            time.sleep(server.latency)
+
+        if server.should_fail():
+            server.count('errors')
+            self.send_empty_response(503)
+            return
+
+        if server.should_throttle():
+            server.count('throttled')
+            self.send_empty_response(429, {'Retry-After': str(server.retry_after)})
+            return
+
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == '/pluginManager/':
+            self.redirect_to_plugin(urllib.parse.parse_qs(url.query))
+        elif url.path.startswith('/files/'):
+            self.send_plugin(url.path.rsplit('/', 1)[-1], send_body)
+        else:
+            self.send_empty_response(404)
+
+    def redirect_to_plugin(self, params: Dict[str, list]) -> None:
+        plugin_id = params.get('id', [''])[0]
+        if params.get('action') != ['download'] or plugin_id not in self.server.payloads:
+            self.send_empty_response(404)
+            return
+
+        file_name, _ = self.server.payloads[plugin_id]
+        update_id = int(plugin_id.rsplit('-', 1)[-1]) + 1000
+        # Mirror the layout of the real repository: /files/<plugin>/<update>/<file>?updateId=<update>
+        self.send_response(302)
+        self.send_header('Location', f'/files/{plugin_id}/{update_id}/{file_name}?updateId={update_id}')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def send_plugin(self, file_name: str, send_body: bool) -> None:
+        plugin_id = file_name.rsplit('.', 1)[0]
+        if plugin_id not in self.server.payloads:
+            self.send_empty_response(404)
+            return
+
+        _, payload = self.server.payloads[plugin_id]
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(payload)
+            self.server.count('downloads')
+            self.server.count('bytes sent', len(payload))
+
+    def send_empty_response(self, status: int, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
@@ -0,0 +1,18 @@
+"""Fixtures for the module_utils unit tests."""
+import os
+
+import pytest
+
+from ansible.module_utils.intellij import http, plugins
+
+
+@pytest.fixture
+def owner():
+    return os.getuid(), os.getgid()
+
+
+@pytest.fixture(autouse=True)
+def reset_module_state(monkeypatch):
+    # Module wide state is only meant to live for one module invocation
+    monkeypatch.setattr(http, '_circuit_breaker', http.CircuitBreaker())
+    monkeypatch.setattr(plugins, '_plugin_indexes', {})
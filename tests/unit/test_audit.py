@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from ansible.module_utils.intellij import audit as intellij_audit
+from ansible.module_utils.intellij.audit import audit
+
+BUILD = '243.26053.27'
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """Resolves every user's home to a temporary directory named after the user."""
+    monkeypatch.setattr(intellij_audit, 'user_path', lambda username, path: tmp_path / 'home' / username / path)
+    return tmp_path / 'home'
+
+
+@pytest.fixture
+def intellij_home(tmp_path):
+    intellij_home = tmp_path / 'idea'
+    intellij_home.mkdir()
+    (intellij_home / 'product-info.json').write_text(json.dumps({'buildNumber': BUILD}))
+    return intellij_home
+
+
+def write_plugin(plugins_dir, plugin_id, since_build='243', until_build='243.*'):
+    descriptor_dir = plugins_dir / plugin_id / 'META-INF'
+    descriptor_dir.mkdir(parents=True)
+    (descriptor_dir / 'plugin.xml').write_text(
+        f'<idea-plugin><id>{plugin_id}</id><name>{plugin_id}</name><version>1.0</version>'
+        f'<idea-version since-build="{since_build}" until-build="{until_build}"/></idea-plugin>')
+
+
+def write_jdk_table(config_dir, name, jdk_home):
+    (config_dir / 'options').mkdir(parents=True, exist_ok=True)
+    (config_dir / 'options' / 'jdk.table.xml').write_text(
+        '<application><component name="ProjectJdkTable">'
+        f'<jdk version="2"><name value="{name}"/><type value="JavaSDK"/><homePath value="{jdk_home}"/></jdk>'
+        '</component></application>')
+
+
+def run_audit(tmp_path, intellij_home, users):
+    return audit(intellij_home, 'config', 'plugins', users, plugin_index_path=tmp_path / 'missing.json')
+
+
+def test_no_drift(tmp_path, home, intellij_home):
+    write_plugin(home / 'bob' / 'plugins', 'Lombook Plugin')
+    (tmp_path / 'jdk').mkdir()
+    write_jdk_table(home / 'bob' / 'config', '17', tmp_path / 'jdk')
+    users = [{'username': 'bob', 'intellij_plugins': ['Lombook Plugin'], 'intellij_jdks': [{'name': '17', 'home': str(tmp_path / 'jdk')}]}]
+
+    report = run_audit(tmp_path, intellij_home, users)
+    assert report == {'home': str(intellij_home), 'build_number': BUILD, 'users': {}, 'drifted': False}
+
+
+def test_drift(tmp_path, home, intellij_home):
+    write_plugin(home / 'bob' / 'plugins', 'Old Plugin', since_build='193', until_build='193.*')
+    write_jdk_table(home / 'bob' / 'config', '17', tmp_path / 'missing-jdk')
+    users = [{
+        'username': 'bob',
+        'intellij_plugins': ['Old Plugin', 'Lombook Plugin'],
+        'intellij_disabled_plugins': ['org.jetbrains.plugins.gradle'],
+        'intellij_jdks': [{'name': '17', 'home': str(tmp_path / 'missing-jdk')}, {'name': '21', 'home': '/opt/jdk-21'}],
+        'intellij_default_jdk': '17'
+    }]
+
+    report = run_audit(tmp_path, intellij_home, users)
+    assert report['drifted']
+    assert report['users']['bob'] == {
+        'missing_plugins': ['Lombook Plugin'],
+        'incompatible_plugins': ['Old Plugin'],
+        'plugins_not_disabled': ['org.jetbrains.plugins.gradle'],
+        'missing_jdks': ['21'],
+        'jdk_home_not_found': ['17'],
+        'default_jdk': {'expected': '17', 'actual': None}
+    }
+
+
+def test_unreadable_config_is_a_finding(tmp_path, home, intellij_home):
+    for username in ('alice', 'bob'):
+        (home / username / 'config' / 'options').mkdir(parents=True)
+    (home / 'alice' / 'config' / 'options' / 'jdk.table.xml').write_text('<project/>')
+    users = [
+        {'username': 'alice', 'intellij_jdks': [{'name': '17', 'home': '/opt/jdk-17'}]},
+        {'username': 'bob', 'intellij_jdks': [{'name': '17', 'home': '/opt/jdk-17'}]}
+    ]
+
+    report = run_audit(tmp_path, intellij_home, users)
+    assert report['users']['alice'] == {'errors': ['Unsupported root element: project']}
+    assert report['users']['bob'] == {'missing_jdks': ['17']}
+
+
+def test_missing_installation(tmp_path, home):
+    report = run_audit(tmp_path, tmp_path / 'missing', [])
+    assert report['drifted']
+    assert report['build_number'] is None
+    assert 'error' in report
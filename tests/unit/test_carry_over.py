@@ -0,0 +1,77 @@
+import zipfile
+
+import pytest
+
+from ansible.module_utils.intellij.plugins import PLUGIN_INDEX_FILENAME, carry_over_plugin, find_plugin, is_compatible
+
+BUILD_NUMBER = '243.26053.27'
+
+
+def write_plugin(plugins_dir, name, plugin_id, since_build=None, until_build=None):
+    idea_version = ''.join(f' {k}="{v}"' for k, v in (('since-build', since_build), ('until-build', until_build)) if v)
+    lib = plugins_dir / name / 'lib'
+    lib.mkdir(parents=True)
+    with zipfile.ZipFile(lib / f'{name}.jar', 'w') as jar:
+        jar.writestr('META-INF/plugin.xml', f'<idea-plugin><id>{plugin_id}</id><idea-version{idea_version}/></idea-plugin>')
+
+
+@pytest.mark.parametrize('since_build,until_build,expected', [
+    (None, None, True),
+    ('243', None, True),
+    ('243.26053.27', None, True),
+    ('243.26054', None, False),
+    ('IC-251', None, False),
+    (None, '243.*', True),
+    (None, '243', True),
+    (None, '243.26053.26', False),
+    (None, '242.*', False),
+    ('241', '243.*', True)
+])
+def test_is_compatible(since_build, until_build, expected):
+    assert is_compatible(BUILD_NUMBER, since_build, until_build) == expected
+
+
+def test_carry_over_compatible_plugin(tmp_path, owner):
+    previous_dir = tmp_path / 'IdeaIC2024.2'
+    plugins_dir = tmp_path / 'IdeaIC2024.3'
+    write_plugin(previous_dir, 'example', 'com.example', since_build='241', until_build='243.*')
+
+    assert carry_over_plugin(plugins_dir, 'com.example', BUILD_NUMBER, *owner, check_mode=True)
+    assert not plugins_dir.exists()
+
+    assert carry_over_plugin(plugins_dir, 'com.example', BUILD_NUMBER, *owner)
+    assert (plugins_dir / 'example' / 'lib' / 'example.jar').is_file()
+
+
+def test_carry_over_skips_incompatible_plugin(tmp_path, owner):
+    write_plugin(tmp_path / 'IdeaIC2024.2', 'example', 'com.example', until_build='242.*')
+
+    assert carry_over_plugin(tmp_path / 'IdeaIC2024.3', 'com.example', BUILD_NUMBER, *owner) is None
+    assert not (tmp_path / 'IdeaIC2024.3').exists()
+
+
+def test_carry_over_keeps_installed_plugin(tmp_path, owner):
+    write_plugin(tmp_path / 'IdeaIC2024.3', 'example', 'com.example', since_build='243')
+
+    assert carry_over_plugin(tmp_path / 'IdeaIC2024.3', 'com.example', BUILD_NUMBER, *owner) is False
+
+
+def test_carry_over_unknown_plugin(tmp_path, owner):
+    write_plugin(tmp_path / 'IdeaIC2024.2', 'example', 'com.example')
+
+    assert carry_over_plugin(tmp_path / 'IdeaIC2024.3', 'com.other', BUILD_NUMBER, *owner) is None
+
+
+def test_find_plugin_caches_descriptors(tmp_path, monkeypatch):
+    from ansible.module_utils.intellij import plugins
+
+    write_plugin(tmp_path / 'IdeaIC2024.3', 'example', 'com.example')
+    index_path = tmp_path / PLUGIN_INDEX_FILENAME
+
+    assert find_plugin(tmp_path / 'IdeaIC2024.3', 'com.example', index_path)[0] == tmp_path / 'IdeaIC2024.3' / 'example'
+    assert index_path.is_file()
+
+    # Another module invocation reuses the index instead of reading the jar
+    monkeypatch.setattr(plugins, '_plugin_indexes', {})
+    monkeypatch.setattr(plugins, 'read_plugin_descriptor', lambda _: pytest.fail('descriptor read again'))
+    assert find_plugin(tmp_path / 'IdeaIC2024.3', 'com.example', index_path) is not None
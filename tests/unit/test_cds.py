@@ -0,0 +1,85 @@
+import json
+import os
+import stat
+
+import pytest
+
+from ansible.module_utils.intellij.cds import cds_archive_path, generate_cds_archive
+from ansible.module_utils.intellij.common import IntellijError
+
+BUILD = '243.26053.27'
+
+
+@pytest.fixture
+def intellij_home(tmp_path):
+    intellij_home = tmp_path / 'idea'
+    (intellij_home / 'jbr' / 'bin').mkdir(parents=True)
+    (intellij_home / 'jbr' / 'bin' / 'java').touch()
+    (intellij_home / 'product-info.json').write_text(json.dumps({
+        'buildNumber': BUILD,
+        'launch': [{'os': 'Linux', 'javaExecutablePath': 'jbr/bin/java', 'bootClassPathJarNames': ['app.jar', 'util.jar']}]
+    }))
+    return intellij_home
+
+
+@pytest.fixture
+def class_list(tmp_path):
+    class_list = tmp_path / 'classes.txt'
+    class_list.write_text('java/lang/Object\n')
+    return class_list
+
+
+@pytest.fixture
+def java():
+    """Records the java commands run, creating the archive like -Xshare:dump would."""
+    commands = []
+
+    def run_command(args):
+        commands.append(args)
+        archive = next(x for x in args if x.startswith('-XX:SharedArchiveFile=')).split('=', 1)[1]
+        with open(archive, 'wb') as f:
+            f.write(b'archive')
+        return 0, '', ''
+
+    return run_command, commands
+
+
+def test_generate_cds_archive(intellij_home, class_list, owner, java):
+    run_command, commands = java
+    changed, archive_path = generate_cds_archive(intellij_home, class_list, *owner, run_command)
+    assert changed
+    assert archive_path == cds_archive_path(intellij_home, BUILD)
+    assert archive_path.read_bytes() == b'archive'
+    assert stat.S_IMODE(archive_path.stat().st_mode) == 0o644
+    assert commands[0][:3] == [str(intellij_home / 'jbr' / 'bin' / 'java'), '-Xshare:dump', f'-XX:SharedClassListFile={class_list}']
+    assert commands[0][-1] == os.pathsep.join(str(intellij_home / 'lib' / x) for x in ('app.jar', 'util.jar'))
+
+    # Only regenerated when the class list changes
+    assert generate_cds_archive(intellij_home, class_list, *owner, run_command) == (False, archive_path)
+    assert len(commands) == 1
+
+
+def test_removes_archives_of_earlier_builds(intellij_home, class_list, owner, java):
+    stale_path = cds_archive_path(intellij_home, '243.1')
+    stale_path.parent.mkdir()
+    stale_path.touch()
+
+    generate_cds_archive(intellij_home, class_list, *owner, java[0])
+    assert not stale_path.exists()
+
+
+def test_check_mode(intellij_home, class_list, owner, java):
+    run_command, commands = java
+    assert generate_cds_archive(intellij_home, class_list, *owner, run_command, check_mode=True)[0]
+    assert not commands
+
+
+def test_failure(intellij_home, class_list, owner):
+    with pytest.raises(IntellijError, match='Failed to generate the CDS archive: Error'):
+        generate_cds_archive(intellij_home, class_list, *owner, lambda args: (1, '', 'Error\n'))
+    assert not list(cds_archive_path(intellij_home, BUILD).parent.iterdir())
+
+
+def test_missing_class_list(intellij_home, tmp_path, owner, java):
+    with pytest.raises(IntellijError, match='File not found'):
+        generate_cds_archive(intellij_home, tmp_path / 'missing.txt', *owner, java[0])
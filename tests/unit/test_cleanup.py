@@ -0,0 +1,63 @@
+from ansible.module_utils.intellij.cleanup import split_version_dir, stale_user_dirs, stale_version_dirs
+
+
+def make_dirs(root, *paths):
+    for path in paths:
+        (root / path).mkdir(parents=True)
+
+
+def test_stale_version_dirs(tmp_path):
+    make_dirs(tmp_path, 'idea-2023.3', 'idea-2024.1', 'idea-2024.2', 'idea-2024.3', 'idea-2025.1', 'other-2020.1')
+
+    assert stale_version_dirs(tmp_path / 'idea-2024.3', 2) == [tmp_path / 'idea-2024.1', tmp_path / 'idea-2023.3']
+    assert stale_version_dirs(tmp_path / 'idea-2024.3', 1) == [tmp_path / 'idea-2024.2', tmp_path / 'idea-2024.1', tmp_path / 'idea-2023.3']
+
+
+def test_split_version_dir(tmp_path):
+    assert split_version_dir(tmp_path / '.IdeaIC2019.3' / 'config' / 'plugins', 'IdeaIC2019.3') == (
+        tmp_path / '.IdeaIC2019.3', tmp_path.joinpath('config', 'plugins').relative_to(tmp_path))
+    assert split_version_dir(tmp_path / 'local' / 'log', 'IdeaIC2024.3') is None
+    assert split_version_dir(tmp_path / 'IdeaIC2024.3', '') is None
+
+
+def test_stale_user_dirs_across_layouts(tmp_path):
+    make_dirs(
+        tmp_path,
+        '.cache/JetBrains/IdeaIC2024.3',
+        '.cache/JetBrains/IdeaIC2024.2',
+        '.cache/JetBrains/IdeaIC2024.1',
+        '.cache/JetBrains/IntelliJIdea2024.1',
+        '.IdeaIC2019.3/system',
+        '.IdeaIC2019.3/config/plugins',
+        'local/system/IdeaIC2024.2')
+    user_dirs = [
+        tmp_path / '.cache/JetBrains/IdeaIC2024.3',
+        tmp_path / 'local/system/IdeaIC2024.3',
+        tmp_path / '.IdeaIC2024.3/system',
+        tmp_path / '.IdeaIC2024.3/config/plugins'
+    ]
+
+    # Only the current version is kept
+    assert stale_user_dirs(user_dirs, 'IdeaIC2024.3', 1) == sorted([
+        tmp_path / '.IdeaIC2019.3/config/plugins',
+        tmp_path / '.IdeaIC2019.3/system',
+        tmp_path / '.cache/JetBrains/IdeaIC2024.1',
+        tmp_path / '.cache/JetBrains/IdeaIC2024.2',
+        tmp_path / 'local/system/IdeaIC2024.2'
+    ])
+
+    # 2024.2 is kept in every location
+    assert stale_user_dirs(user_dirs, 'IdeaIC2024.3', 2) == sorted([
+        tmp_path / '.IdeaIC2019.3/config/plugins',
+        tmp_path / '.IdeaIC2019.3/system',
+        tmp_path / '.cache/JetBrains/IdeaIC2024.1'
+    ])
+
+    assert stale_user_dirs(user_dirs, 'IdeaIC2024.3', 4) == []
+
+
+def test_stale_user_dirs_skips_symlinks(tmp_path):
+    make_dirs(tmp_path, 'system/IdeaIC2024.3', 'elsewhere')
+    (tmp_path / 'system/IdeaIC2024.2').symlink_to(tmp_path / 'elsewhere')
+
+    assert stale_user_dirs([tmp_path / 'system/IdeaIC2024.3'], 'IdeaIC2024.3', 1) == []
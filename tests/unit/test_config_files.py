@@ -0,0 +1,141 @@
+import io
+import pwd
+import stat
+
+import pytest
+
+from ansible.module_utils.intellij import config_files
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.config_files import CONFIG_FILE_MODE, install_config_files
+
+STYLE = b'<code_scheme name="Example" version="173" />\n'
+
+
+@pytest.fixture
+def home(tmp_path, owner, monkeypatch):
+    """Resolves every user's home to a temporary directory."""
+    home = tmp_path / 'home'
+    home.mkdir()
+    monkeypatch.setattr(config_files, 'user_path', lambda username, path: home / path)
+    return home
+
+
+@pytest.fixture
+def user(owner):
+    return {'username': pwd.getpwuid(owner[0]).pw_name, 'intellij_group': str(owner[1])}
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """Serves the content registered for each URL, counting the requests."""
+    content = {}
+    requests = []
+
+    def fake_http_request(url, method, timeout, follow_redirects, circuit_state=None):
+        requests.append(url)
+        return 200, io.BytesIO(content[url]), {'msg': 'OK'}
+
+    monkeypatch.setattr(config_files, 'http_request', fake_http_request)
+    return content, requests
+
+
+def test_install_from_src(tmp_path, home, user):
+    src = tmp_path / 'Example.xml'
+    src.write_bytes(STYLE)
+    user['intellij_codestyles'] = [{'name': 'Example', 'src': str(src), 'remote_src': True}]
+
+    changed, installed = install_config_files('config', [user], tmp_path / 'cache')
+    dest_path = home / 'config' / 'codestyles' / 'Example.xml'
+    assert changed
+    assert installed == [{'username': user['username'], 'path': str(dest_path)}]
+    assert dest_path.read_bytes() == STYLE
+    assert stat.S_IMODE(dest_path.stat().st_mode) == CONFIG_FILE_MODE
+    assert (home / 'config' / 'inspection').is_dir()
+
+    assert install_config_files('config', [user], tmp_path / 'cache') == (False, [])
+
+
+def test_files_on_the_controller_are_skipped(tmp_path, home, user):
+    user['intellij_codestyles'] = [{'name': 'Example', 'src': 'files/Example.xml'}]
+    install_config_files('config', [user], tmp_path / 'cache')
+    assert not (home / 'config' / 'codestyles' / 'Example.xml').exists()
+
+
+def test_downloads_each_url_once(tmp_path, home, user, downloads):
+    content, requests = downloads
+    content['https://example.com/Example.xml'] = STYLE
+    user['intellij_codestyles'] = [{'name': 'Example', 'url': 'https://example.com/Example.xml'}]
+    user['intellij_inspection_profiles'] = [{'name': 'Example', 'url': 'https://example.com/Example.xml'}]
+
+    changed, installed = install_config_files('config', [user], tmp_path / 'cache')
+    assert changed
+    assert len(installed) == 2
+    assert requests == ['https://example.com/Example.xml']
+    assert (home / 'config' / 'inspection' / 'Example.xml').read_bytes() == STYLE
+
+    # Served from the download cache
+    assert install_config_files('config', [user], tmp_path / 'cache') == (False, [])
+    assert requests == ['https://example.com/Example.xml']
+
+
+def test_check_mode_does_not_store_downloads(tmp_path, home, user, downloads):
+    content, requests = downloads
+    content['https://example.com/Example.xml'] = STYLE
+    user['intellij_codestyles'] = [{'name': 'Example', 'url': 'https://example.com/Example.xml'}]
+
+    changed, installed = install_config_files('config', [user], tmp_path / 'cache', check_mode=True)
+    assert changed
+    assert len(installed) == 1
+    assert not (home / 'config').exists()
+    assert not (tmp_path / 'cache').exists()
+
+
+def test_replaces_changed_files_and_fixes_mode(tmp_path, home, user):
+    src = tmp_path / 'Example.xml'
+    src.write_bytes(STYLE)
+    user['intellij_codestyles'] = [{'name': 'Example', 'src': str(src), 'remote_src': True}]
+    install_config_files('config', [user], tmp_path / 'cache')
+    dest_path = home / 'config' / 'codestyles' / 'Example.xml'
+
+    dest_path.chmod(0o600)
+    assert install_config_files('config', [user], tmp_path / 'cache')[0]
+    assert stat.S_IMODE(dest_path.stat().st_mode) == CONFIG_FILE_MODE
+
+    dest_path.write_bytes(b'changed')
+    assert install_config_files('config', [user], tmp_path / 'cache')[0]
+    assert dest_path.read_bytes() == STYLE
+
+
+def test_replaces_symlinks_without_following_them(tmp_path, home, user):
+    src = tmp_path / 'Example.xml'
+    src.write_bytes(STYLE)
+    user['intellij_codestyles'] = [{'name': 'Example', 'src': str(src), 'remote_src': True}]
+    codestyles_dir = home / 'config' / 'codestyles'
+    codestyles_dir.mkdir(parents=True)
+    target = tmp_path / 'target'
+    (codestyles_dir / 'Example.xml').symlink_to(target)
+    (codestyles_dir / '.Example.xml.tmp').symlink_to(target)
+
+    install_config_files('config', [user], tmp_path / 'cache')
+    assert not (codestyles_dir / 'Example.xml').is_symlink()
+    assert (codestyles_dir / 'Example.xml').read_bytes() == STYLE
+    assert not target.exists()
+
+
+def test_refuses_symlinked_config_file_dirs(tmp_path, home, user):
+    src = tmp_path / 'Example.xml'
+    src.write_bytes(STYLE)
+    user['intellij_codestyles'] = [{'name': 'Example', 'src': str(src), 'remote_src': True}]
+    (home / 'config').mkdir()
+    (tmp_path / 'elsewhere').mkdir()
+    (home / 'config' / 'codestyles').symlink_to(tmp_path / 'elsewhere')
+
+    with pytest.raises(IntellijError, match='is a symlink'):
+        install_config_files('config', [user], tmp_path / 'cache')
+    assert not list((tmp_path / 'elsewhere').iterdir())
+
+
+def test_fails_on_missing_src(tmp_path, home, user):
+    user['intellij_codestyles'] = [{'name': 'Example', 'src': str(tmp_path / 'missing.xml'), 'remote_src': True}]
+    with pytest.raises(IntellijError, match='File not found'):
+        install_config_files('config', [user], tmp_path / 'cache')
@@ -0,0 +1,70 @@
+import xml.etree.ElementTree as ET
+
+from ansible.module_utils.intellij.project_defaults import (GRADLE_SYSTEM_SETTINGS_FILENAME, gradle_properties, gradle_settings,
+                                                            set_default_gradle)
+
+DEFAULT_PROJECT = './component[@name="ProjectManager"]/defaultProject'
+
+
+def option(path, component_path, name):
+    element = ET.parse(path).find(f'{component_path}/option[@name="{name}"]')
+    return None if element is None else element.get('value')
+
+
+def test_gradle_settings():
+    assert gradle_settings(delegated_build=False, parallel_model_fetch=True, offline=True, daemon_vm_options='-Xmx2g') == {
+        'DefaultGradleProjectSettings': {'delegatedBuild': 'false'},
+        'GradleSettings': {'parallelModelFetch': 'true'},
+        'GradleSystemSettings': {'offlineWork': 'true', 'gradleVmOptions': '-Xmx2g'}
+    }
+    assert gradle_settings() == {'DefaultGradleProjectSettings': {}, 'GradleSettings': {}, 'GradleSystemSettings': {}}
+
+
+def test_gradle_properties():
+    assert gradle_properties(parallel_execution=True) == {'org.gradle.parallel': True}
+    assert gradle_properties() == {}
+
+
+def test_set_default_gradle(tmp_path, owner):
+    config_dir = tmp_path / 'config'
+    gradle_user_home = tmp_path / '.gradle'
+    settings = gradle_settings(delegated_build=False, parallel_model_fetch=True, daemon_vm_options='-Xmx2g')
+    properties = gradle_properties(parallel_execution=True)
+
+    changed, diffs = set_default_gradle(config_dir, *owner, settings, gradle_user_home, properties)
+    assert changed
+    assert len(diffs) == 3
+
+    project_default = config_dir / 'options' / 'project.default.xml'
+    assert option(project_default, f'{DEFAULT_PROJECT}/component[@name="DefaultGradleProjectSettings"]', 'delegatedBuild') == 'false'
+    assert option(project_default, f'{DEFAULT_PROJECT}/component[@name="GradleSettings"]', 'parallelModelFetch') == 'true'
+    gradle_system_settings = config_dir / 'options' / GRADLE_SYSTEM_SETTINGS_FILENAME
+    assert option(gradle_system_settings, './component[@name="GradleSystemSettings"]', 'gradleVmOptions') == '-Xmx2g'
+    assert (gradle_user_home / 'gradle.properties').read_text() == 'org.gradle.parallel=true\n'
+
+    assert not set_default_gradle(config_dir, *owner, settings, gradle_user_home, properties)[0]
+
+
+def test_set_default_gradle_keeps_other_gradle_properties(tmp_path, owner):
+    gradle_user_home = tmp_path / '.gradle'
+    gradle_user_home.mkdir()
+    (gradle_user_home / 'gradle.properties').write_text('org.gradle.caching=true\norg.gradle.parallel=false\n')
+
+    set_default_gradle(tmp_path / 'config', *owner, gradle_settings(), gradle_user_home, gradle_properties(parallel_execution=True))
+    assert (gradle_user_home / 'gradle.properties').read_text() == 'org.gradle.caching=true\norg.gradle.parallel=true\n'
+
+
+def test_set_default_gradle_leaves_unset_settings(tmp_path, owner):
+    config_dir = tmp_path / 'config'
+    set_default_gradle(config_dir, *owner, gradle_settings(delegated_build=True), tmp_path / '.gradle', {})
+    assert not (config_dir / 'options' / GRADLE_SYSTEM_SETTINGS_FILENAME).exists()
+    assert not (tmp_path / '.gradle').exists()
+
+
+def test_set_default_gradle_check_mode(tmp_path, owner):
+    config_dir = tmp_path / 'config'
+    settings = gradle_settings(offline=True)
+    changed, _ = set_default_gradle(config_dir, *owner, settings, tmp_path / '.gradle', gradle_properties(True), check_mode=True)
+    assert changed
+    assert not config_dir.exists()
+    assert not (tmp_path / '.gradle').exists()
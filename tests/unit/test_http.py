@@ -0,0 +1,139 @@
+import email.utils
+import http.client
+import json
+import time
+
+import pytest
+
+from ansible.module_utils.intellij import http as intellij_http
+from ansible.module_utils.intellij.http import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, http_request, retry_after_seconds, send_request
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    """Replaces the requests with the responses appended to the returned list, recording the sleeps."""
+    queue = []
+    calls = {'requests': 0, 'sleeps': []}
+
+    def fake_send_request(url, method, timeout, follow_redirects):
+        calls['requests'] += 1
+        return queue.pop(0) if queue else (200, None, {'msg': 'OK'})
+
+    monkeypatch.setattr(intellij_http, 'send_request', fake_send_request)
+    monkeypatch.setattr(intellij_http.time, 'sleep', lambda x: calls['sleeps'].append(x))
+    return queue, calls
+
+
+def failure(status_code, retry_after=''):
+    return status_code, None, {'msg': f'HTTP Error {status_code}', 'retry_after': retry_after}
+
+
+def test_retries_transient_failures(responses):
+    queue, calls = responses
+    queue.extend([failure(-1), failure(503), failure(502)])
+
+    assert http_request('https://example.com/a', 'GET', 1, 'all')[0] == 200
+    assert calls['requests'] == 4
+    assert len(calls['sleeps']) == 3
+
+
+def test_gives_up_after_max_attempts(responses):
+    queue, calls = responses
+    queue.extend([failure(500)] * 10)
+
+    assert http_request('https://example.com/a', 'GET', 1, 'all', max_attempts=3)[0] == 500
+    assert calls['requests'] == 3
+
+
+def test_does_not_retry_client_errors(responses):
+    queue, calls = responses
+    queue.append(failure(404))
+
+    assert http_request('https://example.com/a', 'GET', 1, 'all')[0] == 404
+    assert calls['requests'] == 1
+
+
+def test_honours_retry_after(responses):
+    queue, calls = responses
+    queue.append(failure(429, '5'))
+
+    assert http_request('https://example.com/a', 'GET', 1, 'all')[0] == 200
+    assert 5 <= calls['sleeps'][0] <= 6
+
+
+def test_fails_fast_on_long_retry_after(responses):
+    queue, calls = responses
+    queue.append(failure(503, '3600'))
+
+    status_code, _, info = http_request('https://example.com/a', 'GET', 1, 'all')
+    assert status_code == 503
+    assert 'retry after 3600 seconds' in info['msg']
+    assert calls['sleeps'] == []
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds('') is None
+    assert retry_after_seconds('12') == 12.0
+    assert retry_after_seconds('-3') == 0.0
+    assert retry_after_seconds('soon') is None
+    assert 28 <= retry_after_seconds(email.utils.formatdate(time.time() + 30, usegmt=True)) <= 30
+
+
+def test_circuit_opens_and_is_shared_through_the_state_file(responses, tmp_path, monkeypatch):
+    queue, calls = responses
+    state_path = tmp_path / 'intellij-http-circuits.json'
+    queue.extend([failure(-1)] * CIRCUIT_FAILURE_THRESHOLD)
+
+    http_request('https://example.com/a', 'GET', 1, 'all', max_attempts=CIRCUIT_FAILURE_THRESHOLD - 1, circuit_state=state_path)
+    assert 'opened' not in json.loads(state_path.read_text())['hosts']['example.com']
+
+    # A new module invocation continues counting the failures
+    monkeypatch.setattr(intellij_http, '_circuit_breaker', intellij_http.CircuitBreaker())
+    http_request('https://example.com/b', 'GET', 1, 'all', max_attempts=2, circuit_state=state_path)
+    assert calls['requests'] == CIRCUIT_FAILURE_THRESHOLD
+    assert 'opened' in json.loads(state_path.read_text())['hosts']['example.com']
+
+    status_code, _, info = http_request('https://example.com/c', 'GET', 1, 'all', circuit_state=state_path)
+    assert status_code == -1
+    assert 'Too many failed requests' in info['msg']
+    assert calls['requests'] == CIRCUIT_FAILURE_THRESHOLD
+
+    # Other hosts aren't affected
+    assert http_request('https://example.org/a', 'GET', 1, 'all', circuit_state=state_path)[0] == 200
+
+
+def test_circuit_closes_after_reset(responses, tmp_path, monkeypatch):
+    queue, calls = responses
+    state_path = tmp_path / 'intellij-http-circuits.json'
+    queue.extend([failure(-1)] * CIRCUIT_FAILURE_THRESHOLD)
+    http_request('https://example.com/a', 'GET', 1, 'all', max_attempts=CIRCUIT_FAILURE_THRESHOLD, circuit_state=state_path)
+
+    now = time.time()
+    monkeypatch.setattr(intellij_http.time, 'time', lambda: now + CIRCUIT_RESET_SECONDS + 1)
+    assert http_request('https://example.com/a', 'GET', 1, 'all', circuit_state=state_path)[0] == 200
+    assert json.loads(state_path.read_text())['hosts'] == {}
+
+
+def test_rate_limiting_does_not_open_the_circuit(responses):
+    queue, calls = responses
+    queue.extend([failure(429, '0')] * (CIRCUIT_FAILURE_THRESHOLD + 1))
+
+    assert http_request('https://example.com/a', 'GET', 1, 'all', max_attempts=CIRCUIT_FAILURE_THRESHOLD + 2)[0] == 200
+    assert calls['requests'] == CIRCUIT_FAILURE_THRESHOLD + 2
+
+
+@pytest.mark.parametrize('error', [
+    http.client.IncompleteRead(b''),
+    http.client.RemoteDisconnected('closed'),
+    ConnectionResetError('reset'),
+    intellij_http.SSLValidationError('bad certificate'),
+    intellij_http.UrlConnectionError('refused')
+])
+def test_send_request_maps_transport_errors(monkeypatch, error):
+    def fake_open_url(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(intellij_http, 'open_url', fake_open_url)
+    status_code, resp, info = send_request('https://example.com/a', 'GET', 1, 'all')
+    assert (status_code, resp) == (-1, None)
+    assert info['msg'].startswith('Request failed')
@@ -0,0 +1,82 @@
+import json
+import stat
+
+import pytest
+
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.index_cache import SHARED_INDEX_DIRNAME, seed_index_cache
+
+BUILD = '243.26053.27'
+
+
+@pytest.fixture
+def intellij_home(tmp_path):
+    intellij_home = tmp_path / 'idea'
+    intellij_home.mkdir()
+    (intellij_home / 'product-info.json').write_text(json.dumps({'buildNumber': BUILD}))
+    return intellij_home
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = tmp_path / 'mirror'
+    (mirror / BUILD / 'jdk' / 'abc').mkdir(parents=True)
+    (mirror / BUILD / 'jdk' / 'abc' / 'index.ijx').write_bytes(b'index')
+    (mirror / BUILD / 'jdk' / 'abc' / 'index.ijx').chmod(0o644)
+    (mirror / BUILD / 'jdk' / 'abc' / 'index.sha256').write_bytes(b'hash')
+    return mirror
+
+
+def test_seed_index_cache(tmp_path, intellij_home, mirror, owner):
+    system_dir = tmp_path / 'system'
+    assert seed_index_cache(intellij_home, system_dir, mirror, *owner) == {'seeded': 2, 'missing': None}
+    index_path = system_dir / SHARED_INDEX_DIRNAME / 'jdk' / 'abc' / 'index.ijx'
+    assert index_path.read_bytes() == b'index'
+    assert stat.S_IMODE(index_path.stat().st_mode) == 0o644
+
+    assert seed_index_cache(intellij_home, system_dir, mirror, *owner) == {'seeded': 0, 'missing': None}
+
+
+def test_keeps_existing_files(tmp_path, intellij_home, mirror, owner):
+    index_dir = tmp_path / 'system' / SHARED_INDEX_DIRNAME / 'jdk' / 'abc'
+    index_dir.mkdir(parents=True)
+    (index_dir / 'index.ijx').write_bytes(b'downloaded')
+
+    assert seed_index_cache(intellij_home, tmp_path / 'system', mirror, *owner)['seeded'] == 1
+    assert (index_dir / 'index.ijx').read_bytes() == b'downloaded'
+
+
+def test_does_not_follow_symlinks(tmp_path, intellij_home, mirror, owner):
+    index_dir = tmp_path / 'system' / SHARED_INDEX_DIRNAME / 'jdk' / 'abc'
+    index_dir.mkdir(parents=True)
+    target = tmp_path / 'target'
+    (index_dir / 'index.ijx').symlink_to(target)
+
+    seed_index_cache(intellij_home, tmp_path / 'system', mirror, *owner)
+    assert not target.exists()
+
+
+def test_refuses_symlinked_dirs(tmp_path, intellij_home, mirror, owner):
+    index_dir = tmp_path / 'system' / SHARED_INDEX_DIRNAME
+    index_dir.mkdir(parents=True)
+    (tmp_path / 'elsewhere').mkdir()
+    (index_dir / 'jdk').symlink_to(tmp_path / 'elsewhere')
+
+    with pytest.raises(IntellijError, match='is a symlink'):
+        seed_index_cache(intellij_home, tmp_path / 'system', mirror, *owner)
+    assert not list((tmp_path / 'elsewhere').iterdir())
+
+
+def test_hardlink(tmp_path, intellij_home, mirror, owner):
+    seed_index_cache(intellij_home, tmp_path / 'system', mirror, *owner, hardlink=True)
+    index_path = tmp_path / 'system' / SHARED_INDEX_DIRNAME / 'jdk' / 'abc' / 'index.ijx'
+    assert index_path.samefile(mirror / BUILD / 'jdk' / 'abc' / 'index.ijx')
+
+
+def test_check_mode(tmp_path, intellij_home, mirror, owner):
+    assert seed_index_cache(intellij_home, tmp_path / 'system', mirror, *owner, check_mode=True)['seeded'] == 2
+    assert not (tmp_path / 'system').exists()
+
+
+def test_missing_build(tmp_path, intellij_home, owner):
+    assert seed_index_cache(intellij_home, tmp_path / 'system', tmp_path / 'mirror', *owner) == {'seeded': 0, 'missing': BUILD}
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from ansible.module_utils.intellij import inventory as intellij_inventory
+from ansible.module_utils.intellij.inventory import INVENTORY_FORMAT, update_inventory_fact
+from ansible.module_utils.intellij.plugins import load_plugin_index
+from ansible.module_utils.intellij.timing import results
+
+BUILD = '243.26053.27'
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """Resolves every user's home to a temporary directory named after the user."""
+    monkeypatch.setattr(intellij_inventory, 'user_path', lambda username, path: tmp_path / 'home' / username / path)
+    return tmp_path / 'home'
+
+
+@pytest.fixture
+def intellij_home(tmp_path):
+    intellij_home = tmp_path / 'idea'
+    intellij_home.mkdir()
+    (intellij_home / 'product-info.json').write_text(json.dumps({'buildNumber': BUILD}))
+    return intellij_home
+
+
+def write_plugin(plugins_dir, plugin_id):
+    descriptor_dir = plugins_dir / plugin_id / 'META-INF'
+    descriptor_dir.mkdir(parents=True)
+    (descriptor_dir / 'plugin.xml').write_text(
+        f'<idea-plugin><id>{plugin_id}</id><name>{plugin_id}</name><version>1.0</version>'
+        '<idea-version since-build="243"/></idea-plugin>')
+
+
+def descriptors_read():
+    return results()['counters'].get('plugin_descriptors_read', 0)
+
+
+def test_update_inventory_fact(tmp_path, home, intellij_home):
+    write_plugin(home / 'bob' / 'plugins', 'Lombook Plugin')
+    (home / 'bob' / 'plugins' / 'broken.jar').write_bytes(b'not a jar')
+    fact_path = tmp_path / 'intellij_inventory.fact'
+
+    changed, inventory = update_inventory_fact(fact_path, intellij_home, 'config', 'plugins', ['bob'])
+    assert changed
+    assert inventory == {
+        'format': INVENTORY_FORMAT,
+        'home': str(intellij_home),
+        'build_number': BUILD,
+        'users': {
+            'bob': {
+                'plugins': [
+                    {'id': 'Lombook Plugin', 'name': 'Lombook Plugin', 'version': '1.0', 'since_build': '243', 'until_build': None,
+                     'path': str(home / 'bob' / 'plugins' / 'Lombook Plugin')},
+                    {'id': None, 'name': None, 'version': None, 'since_build': None, 'until_build': None,
+                     'path': str(home / 'bob' / 'plugins' / 'broken.jar')}
+                ],
+                'jdks': []
+            }
+        }
+    }
+    assert json.loads(fact_path.read_text()) == inventory
+
+    assert update_inventory_fact(fact_path, intellij_home, 'config', 'plugins', ['bob']) == (False, inventory)
+
+
+def test_stamps_are_kept_out_of_the_fact(tmp_path, home, intellij_home):
+    write_plugin(home / 'bob' / 'plugins', 'Lombook Plugin')
+    fact_path = tmp_path / 'intellij_inventory.fact'
+    index_path = tmp_path / 'intellij-plugin-index.json'
+
+    update_inventory_fact(fact_path, intellij_home, 'config', 'plugins', ['bob'], plugin_index_path=index_path)
+    assert '"stamp"' not in fact_path.read_text()
+    assert list(load_plugin_index(index_path)) == [str(home / 'bob' / 'plugins' / 'Lombook Plugin')]
+
+    # The descriptors are reused from the plugin index
+    read = descriptors_read()
+    update_inventory_fact(fact_path, intellij_home, 'config', 'plugins', ['bob'], plugin_index_path=index_path)
+    assert descriptors_read() == read
+
+
+def test_check_mode(tmp_path, home, intellij_home):
+    write_plugin(home / 'bob' / 'plugins', 'Lombook Plugin')
+    fact_path = tmp_path / 'intellij_inventory.fact'
+    index_path = tmp_path / 'intellij-plugin-index.json'
+
+    changed, _ = update_inventory_fact(fact_path, intellij_home, 'config', 'plugins', ['bob'], plugin_index_path=index_path, check_mode=True)
+    assert changed
+    assert not fact_path.exists()
+    assert not index_path.exists()
+
+
+def test_missing_facts_dir(tmp_path, home, intellij_home):
+    with pytest.raises(intellij_inventory.IntellijError, match='Directory not found'):
+        update_inventory_fact(tmp_path / 'missing' / 'intellij_inventory.fact', intellij_home, 'config', 'plugins', [])
@@ -0,0 +1,111 @@
+import shutil
+
+import pytest
+
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.inventory import list_jdks
+from ansible.module_utils.intellij.jdk import configure_jdks, discover_jdks, is_supported_jdk, jdk_stamp, read_release, save_jdk_catalog_entry
+
+
+def make_jdk(path, version='17.0.2'):
+    (path / 'bin').mkdir(parents=True)
+    (path / 'bin' / 'java').touch()
+    (path / 'bin' / 'javac').touch()
+    (path / 'release').write_text(f'IMPLEMENTOR="Eclipse Adoptium"\nJAVA_VERSION="{version}"\n')
+    return path
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """A JDK catalog the JDKs are added to, so java is never run."""
+    catalog_path = tmp_path / 'jdk-catalog.json'
+
+    def add(jdk_home, version='17.0.2'):
+        save_jdk_catalog_entry(catalog_path, jdk_home, {
+            'stamp': jdk_stamp(jdk_home),
+            'version': f'java version "{version}"',
+            'class_roots': [f'jrt://{jdk_home}!/java.base'],
+            'source_roots': [f'jar://{jdk_home}/lib/src.zip!/java.base']
+        })
+        return jdk_home
+
+    return catalog_path, add
+
+
+def test_read_release(tmp_path):
+    assert read_release(make_jdk(tmp_path / 'jdk-17'))['JAVA_VERSION'] == '17.0.2'
+    assert read_release(tmp_path / 'missing') == {}
+
+
+def test_is_supported_jdk(tmp_path):
+    assert is_supported_jdk(make_jdk(tmp_path / 'jdk-17'))
+
+    jre = make_jdk(tmp_path / 'jre-17')
+    (jre / 'bin' / 'javac').unlink()
+    assert not is_supported_jdk(jre)
+
+
+def test_discover_jdks(tmp_path):
+    jvm = tmp_path / 'jvm'
+    make_jdk(jvm / 'jdk-17')
+    make_jdk(jvm / 'jdk-21')
+    (jvm / 'default-java').symlink_to(jvm / 'jdk-21')
+    (jvm / 'not-a-jdk').mkdir()
+    make_jdk(tmp_path / 'opt' / 'jdk-17')
+
+    assert discover_jdks([jvm, tmp_path / 'opt', tmp_path / 'missing'], []) == [
+        ('jdk-17', jvm / 'jdk-17'),
+        ('jdk-21', jvm / 'jdk-21'),
+        (f'jdk-17 ({tmp_path / "opt"})', tmp_path / 'opt' / 'jdk-17')
+    ]
+
+
+def test_discover_jdks_skips_excluded_and_taken_names(tmp_path):
+    jvm = tmp_path / 'jvm'
+    make_jdk(jvm / 'jdk-17')
+    make_jdk(jvm / 'jdk-21')
+
+    assert discover_jdks([jvm], [jvm / 'jdk-21'], taken_names=['jdk-17']) == [(f'jdk-17 ({jvm})', jvm / 'jdk-17')]
+
+    with pytest.raises(IntellijError, match='More than one JDK'):
+        discover_jdks([jvm], [], taken_names=['jdk-17', f'jdk-17 ({jvm})'])
+
+
+def test_configure_jdks(tmp_path, owner, catalog):
+    catalog_path, add = catalog
+    jdk_17 = add(make_jdk(tmp_path / 'jvm' / 'jdk-17'))
+    jdk_21 = add(make_jdk(tmp_path / 'jvm' / 'jdk-21', '21.0.1'), '21.0.1')
+    config_dir = tmp_path / 'config'
+
+    result, _ = configure_jdks(config_dir, [('17', jdk_17), ('21', jdk_21)], *owner, catalog_path)
+    assert result == {'added': ['17', '21'], 'updated': [], 'removed': []}
+    assert [(x['name'], x['home']) for x in list_jdks(config_dir)] == [('17', str(jdk_17)), ('21', str(jdk_21))]
+
+    result, _ = configure_jdks(config_dir, [('17', jdk_17), ('21', jdk_21)], *owner, catalog_path)
+    assert result == {'added': [], 'updated': [], 'removed': []}
+
+    result, _ = configure_jdks(config_dir, [('17', jdk_21)], *owner, catalog_path)
+    assert result == {'added': [], 'updated': ['17'], 'removed': []}
+
+
+def test_configure_jdks_removes_missing(tmp_path, owner, catalog):
+    catalog_path, add = catalog
+    jdk_17 = add(make_jdk(tmp_path / 'jvm' / 'jdk-17'))
+    jdk_21 = add(make_jdk(tmp_path / 'jvm' / 'jdk-21'))
+    config_dir = tmp_path / 'config'
+    configure_jdks(config_dir, [('17', jdk_17), ('21', jdk_21)], *owner, catalog_path)
+
+    shutil.rmtree(jdk_21)
+
+    result, _ = configure_jdks(config_dir, [('17', jdk_17)], *owner, catalog_path, remove_missing=True)
+    assert result == {'added': [], 'updated': [], 'removed': ['21']}
+    assert [x['name'] for x in list_jdks(config_dir)] == ['17']
+
+
+def test_configure_jdks_check_mode(tmp_path, owner, catalog):
+    catalog_path, add = catalog
+    jdk_17 = add(make_jdk(tmp_path / 'jvm' / 'jdk-17'))
+
+    result, _ = configure_jdks(tmp_path / 'config', [('17', jdk_17)], *owner, catalog_path, check_mode=True)
+    assert result['added'] == ['17']
+    assert not (tmp_path / 'config').exists()
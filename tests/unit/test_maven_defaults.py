@@ -0,0 +1,56 @@
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from ansible.module_utils.intellij.project_defaults import maven_settings, set_default_maven
+
+MAVEN_IMPORT_PREFERENCES = './component[@name="ProjectManager"]/defaultProject/component[@name="MavenImportPreferences"]'
+
+
+SETTINGS_OPTIONS = {'MavenGeneralSettings': 'generalSettings', 'MavenImportingSettings': 'importingSettings'}
+
+
+def options(path, settings_name):
+    root = ET.parse(path).find(f'{MAVEN_IMPORT_PREFERENCES}/option[@name="{SETTINGS_OPTIONS[settings_name]}"]/{settings_name}')
+    return {x.get('name'): x.get('value') for x in root.findall('option')}
+
+
+def test_maven_settings():
+    general, importing = maven_settings(
+        threads='1C', work_offline=True, importer_heap_size='2g', importer_vm_options='-XX:+UseG1GC',
+        use_workspace_import=True, download_sources=True, download_docs=False)
+    assert general == {'threads': '1C', 'workOffline': 'true'}
+    assert importing == {
+        'vmOptionsForImporter': '-Xmx2g -XX:+UseG1GC',
+        'workspaceImportEnabled': 'true',
+        'downloadSourcesAutomatically': 'true',
+        'downloadDocsAutomatically': 'false'
+    }
+    assert maven_settings() == ({}, {})
+
+
+def test_set_default_maven(tmp_path, owner):
+    config_dir = tmp_path / 'config'
+    general, importing = maven_settings(threads='4', importer_heap_size='1g')
+
+    changed, _ = set_default_maven(config_dir, Path('/opt/maven'), *owner, general, importing)
+    assert changed
+    project_default = config_dir / 'options' / 'project.default.xml'
+    assert options(project_default, 'MavenGeneralSettings') == {'mavenHome': '/opt/maven', 'threads': '4'}
+    assert options(project_default, 'MavenImportingSettings') == {'vmOptionsForImporter': '-Xmx1g'}
+
+    assert not set_default_maven(config_dir, Path('/opt/maven'), *owner, general, importing)[0]
+
+
+def test_set_default_maven_keeps_other_options(tmp_path, owner):
+    config_dir = tmp_path / 'config'
+    set_default_maven(config_dir, Path('/opt/maven'), *owner, {'threads': '4'})
+    set_default_maven(config_dir, None, *owner, {'workOffline': 'true'})
+    assert options(config_dir / 'options' / 'project.default.xml', 'MavenGeneralSettings') == {
+        'mavenHome': '/opt/maven', 'threads': '4', 'workOffline': 'true'}
+
+
+def test_set_default_maven_check_mode(tmp_path, owner):
+    changed, diff = set_default_maven(tmp_path / 'config', Path('/opt/maven'), *owner, check_mode=True)
+    assert changed
+    assert 'mavenHome' in diff['after']
+    assert not (tmp_path / 'config').exists()
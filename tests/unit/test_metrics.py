@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.metrics import METRICS_FILENAME, collect_metrics, export_metrics
+
+
+def metric_values(text):
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if not line.startswith('#'))
+
+
+def plugin_result(changed=False, failed=False, **counters):
+    return {'changed': changed, 'failed': failed, 'timings': {'download': 0.5}, 'counters': counters}
+
+
+def test_collect_metrics(tmp_path):
+    intellij_home = tmp_path / 'idea'
+    intellij_home.mkdir()
+    (intellij_home / 'product-info.json').write_text(json.dumps({'buildNumber': '243.26053.27'}))
+    plugin_results = {'results': [
+        plugin_result(changed=True, downloads=1, bytes_downloaded=1000, http_requests=1),
+        plugin_result(download_cache_hits=1),
+        plugin_result(failed=True),
+        {'skipped': True}
+    ]}
+    # Config files share the download cache, but aren't plugins
+    config_files_result = {'changed': True, 'timings': {'download': 0.25}, 'counters': {'downloads': 2, 'bytes_downloaded': 500}}
+
+    values = metric_values(collect_metrics(100.0, 142.5, False, intellij_home, None, plugin_results, [config_files_result, None]))
+    assert values['intellij_provisioning_duration_seconds'] == '42.5'
+    assert values['intellij_provisioning_success'] == '0'
+    assert values['intellij_provisioning_phase_duration_seconds{phase="download"}'] == '1.75'
+    assert values['intellij_plugins{state="installed"}'] == '1'
+    assert values['intellij_plugins{state="skipped"}'] == '1'
+    assert values['intellij_plugins{state="failed"}'] == '1'
+    assert values['intellij_plugin_download_bytes'] == '1000'
+    assert values['intellij_plugin_download_cache_hit_ratio'] == '0.5'
+    assert values['intellij_http_requests{kind="requests"}'] == '1'
+    assert values['intellij_build_info{build="243.26053.27",home="' + str(intellij_home) + '"}'] == '1'
+
+
+def test_cache_hit_ratio_without_plugin_downloads():
+    config_files_result = {'counters': {'downloads': 2}}
+    values = metric_values(collect_metrics(0.0, 1.0, False, None, None, None, [config_files_result]))
+    assert values['intellij_plugin_download_cache_hit_ratio'] == '1'
+    assert values['intellij_provisioning_success'] == '1'
+
+
+def test_export_metrics(tmp_path):
+    path, text = export_metrics(tmp_path, 0.0, True, None, tmp_path, None, [])
+    assert path == tmp_path / METRICS_FILENAME
+    assert path.read_text() == text
+    assert 'intellij_download_cache_bytes' in text
+
+
+def test_export_metrics_check_mode(tmp_path):
+    export_metrics(tmp_path, 0.0, False, None, None, None, [], check_mode=True)
+    assert not (tmp_path / METRICS_FILENAME).exists()
+
+
+def test_export_metrics_missing_dir(tmp_path):
+    with pytest.raises(IntellijError, match='Directory not found'):
+        export_metrics(tmp_path / 'missing', 0.0, False, None, None, None, [])
@@ -0,0 +1,65 @@
+from ansible.module_utils.intellij.migration import migrate_config, previous_config_dirs
+
+
+def make_config_dir(path, *files):
+    path.mkdir(parents=True)
+    for name in files:
+        (path / name).parent.mkdir(parents=True, exist_ok=True)
+        (path / name).write_text(name)
+    return path
+
+
+def test_previous_config_dirs(tmp_path):
+    jetbrains_dir = tmp_path / '.config' / 'JetBrains'
+    make_config_dir(jetbrains_dir / 'IdeaIC2024.1')
+    make_config_dir(jetbrains_dir / 'IdeaIC2024.2')
+    make_config_dir(jetbrains_dir / 'IntelliJIdea2024.2')
+    make_config_dir(tmp_path / '.IdeaIC2019.3' / 'config')
+    make_config_dir(tmp_path / '.IdeaIC2019.2')
+
+    assert previous_config_dirs(jetbrains_dir / 'IdeaIC2024.3') == [
+        jetbrains_dir / 'IdeaIC2024.2',
+        jetbrains_dir / 'IdeaIC2024.1',
+        tmp_path / '.IdeaIC2019.3' / 'config'
+    ]
+
+
+def test_previous_config_dirs_legacy_layout(tmp_path):
+    make_config_dir(tmp_path / '.IdeaIC2019.2' / 'config')
+    assert previous_config_dirs(tmp_path / '.IdeaIC2019.3' / 'config') == [tmp_path / '.IdeaIC2019.2' / 'config']
+
+
+def test_migrate_config(tmp_path, owner):
+    jetbrains_dir = tmp_path / '.config' / 'JetBrains'
+    make_config_dir(jetbrains_dir / 'IdeaIC2024.2', 'options/editor.xml', 'keymaps/Mine.xml', 'options/other.xml')
+    config_dir = jetbrains_dir / 'IdeaIC2024.3'
+
+    result = migrate_config(config_dir, ['options/editor.xml', 'keymaps', 'codestyles'], *owner)
+    assert result == {'previous_config_dir': str(jetbrains_dir / 'IdeaIC2024.2'), 'items': ['options/editor.xml', 'keymaps']}
+    assert (config_dir / 'options' / 'editor.xml').read_text() == 'options/editor.xml'
+    assert (config_dir / 'keymaps' / 'Mine.xml').is_file()
+    assert not (config_dir / 'options' / 'other.xml').exists()
+    assert not list(jetbrains_dir.glob('.*.migrating'))
+
+    # Only a config dir that doesn't exist yet is migrated
+    assert migrate_config(config_dir, ['options/other.xml'], *owner) is None
+
+
+def test_migrate_config_without_previous_version(tmp_path, owner):
+    assert migrate_config(tmp_path / '.config' / 'JetBrains' / 'IdeaIC2024.3', ['options'], *owner) is None
+
+
+def test_migrate_config_hardlink(tmp_path, owner):
+    jetbrains_dir = tmp_path / '.config' / 'JetBrains'
+    make_config_dir(jetbrains_dir / 'IdeaIC2024.2', 'options/editor.xml')
+
+    migrate_config(jetbrains_dir / 'IdeaIC2024.3', ['options'], *owner, hardlink=True)
+    assert (jetbrains_dir / 'IdeaIC2024.3' / 'options' / 'editor.xml').samefile(jetbrains_dir / 'IdeaIC2024.2' / 'options' / 'editor.xml')
+
+
+def test_migrate_config_check_mode(tmp_path, owner):
+    jetbrains_dir = tmp_path / '.config' / 'JetBrains'
+    make_config_dir(jetbrains_dir / 'IdeaIC2024.2', 'options/editor.xml')
+
+    assert migrate_config(jetbrains_dir / 'IdeaIC2024.3', ['options'], *owner, check_mode=True)['items'] == ['options']
+    assert not (jetbrains_dir / 'IdeaIC2024.3').exists()
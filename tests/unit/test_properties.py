@@ -0,0 +1,95 @@
+import os
+import pwd
+import stat
+
+import pytest
+
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.properties import create_user_dir, create_user_dirs, merge_properties, update_properties
+
+
+def username() -> str:
+    return pwd.getpwuid(os.getuid()).pw_name
+
+
+def test_merge_replaces_adds_and_removes():
+    text = '# comment\nidea.config.path=/a\nidea.system.path = /b\nidea.log.path:/c\nidea.system.path=/d\n'
+    merged = merge_properties(text, {'idea.system.path': '/x', 'idea.log.path': None, 'idea.plugins.path': '/y', 'flag': True})
+    assert merged == '# comment\nidea.config.path=/a\nidea.system.path=/x\nidea.plugins.path=/y\nflag=true\n'
+
+
+def test_merge_is_idempotent():
+    properties = {'idea.system.path': '/x'}
+    merged = merge_properties('', properties)
+    assert merge_properties(merged, properties) == merged
+
+
+def test_update_properties(tmp_path, owner):
+    properties_path = tmp_path / 'idea.properties'
+    assert update_properties(properties_path, {'a': 'b'}, *owner)[0]
+    assert properties_path.read_text() == 'a=b\n'
+    assert not update_properties(properties_path, {'a': 'b'}, *owner)[0]
+
+
+def test_create_user_dirs_is_private(tmp_path, owner):
+    path = tmp_path / 'local' / 'system' / 'IdeaIC2024.3'
+
+    assert create_user_dirs(username(), [str(path)], *owner, check_mode=True) == [str(path)]
+    assert not path.exists()
+
+    assert create_user_dirs(username(), [str(path)], *owner) == [str(path)]
+    assert stat.S_IMODE(path.stat().st_mode) == 0o700
+
+    assert create_user_dirs(username(), [str(path)], *owner) == []
+
+
+def test_create_user_dir_parents_in_home(tmp_path, owner):
+    home = tmp_path / 'home'
+    home.mkdir()
+    path = home / '.cache' / 'JetBrains' / 'IdeaIC2024.3'
+
+    create_user_dir(path, home, *owner)
+    assert stat.S_IMODE(path.parent.stat().st_mode) == 0o775
+    assert path.parent.stat().st_uid == owner[0]
+    assert stat.S_IMODE(path.stat().st_mode) == 0o700
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason='needs to create files for other users')
+def test_create_user_dir_parents_outside_home_are_shared(tmp_path):
+    home = tmp_path / 'home'
+    home.mkdir()
+    path = tmp_path / 'local' / 'bob'
+
+    create_user_dir(path, home, 12345, 12345)
+    assert (path.parent.stat().st_uid, stat.S_IMODE(path.parent.stat().st_mode)) == (0, 0o755)
+    assert (path.stat().st_uid, stat.S_IMODE(path.stat().st_mode)) == (12345, 0o700)
+
+
+def test_create_user_dirs_refuses_symlinks(tmp_path, owner):
+    target = tmp_path / 'target'
+    target.mkdir()
+    path = tmp_path / 'system'
+    path.symlink_to(target)
+
+    with pytest.raises(IntellijError, match='symlink'):
+        create_user_dirs(username(), [str(path)], *owner)
+
+
+def test_create_user_dirs_refuses_files(tmp_path, owner):
+    path = tmp_path / 'system'
+    path.touch()
+
+    with pytest.raises(IntellijError, match='not a directory'):
+        create_user_dirs(username(), [str(path)], *owner)
+    with pytest.raises(IntellijError, match='not a directory'):
+        create_user_dirs(username(), [str(path / 'IdeaIC2024.3')], *owner)
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason='needs to create files for other users')
+def test_create_user_dirs_refuses_dirs_of_other_users(tmp_path):
+    path = tmp_path / 'system'
+    path.mkdir()
+    os.chown(path, 12345, 12345)
+
+    with pytest.raises(IntellijError, match='owned by another user'):
+        create_user_dirs(username(), [str(path)], os.getuid(), os.getgid())
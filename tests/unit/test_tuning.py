@@ -0,0 +1,87 @@
+import pytest
+
+from ansible.module_utils.intellij.tuning import at_least, compute_host_limits, limits_conf_values, parse_limit, read_sysctl_conf, sysctl_conf_values
+
+MINIMUMS = {'fs.inotify.max_user_watches': 524288, 'fs.inotify.max_user_instances': 1024, 'vm.max_map_count': 262144}
+
+
+def test_compute_host_limits():
+    limits = compute_host_limits(16384, 2, 10000)
+    assert limits['sysctl'] == MINIMUMS
+    assert limits['limits'] == {'nofile': 65536}
+
+
+def test_compute_host_limits_scales_with_projects_and_memory():
+    limits = compute_host_limits(65536, 1, 1000000)
+    assert limits['sysctl']['fs.inotify.max_user_watches'] == 2000000
+    assert limits['limits'] == {'nofile': 1000000}
+
+    # No more than 10% of the memory for all the users together
+    limits = compute_host_limits(4096, 4, 1000000)
+    assert limits['sysctl']['fs.inotify.max_user_watches'] == 4096 * 1024 // 10 // 4
+
+
+def test_sysctl_conf_never_lowers_effective_values():
+    effective = {'fs.inotify.max_user_watches': 8192, 'fs.inotify.max_user_instances': 128, 'vm.max_map_count': 1048576}
+    assert sysctl_conf_values(MINIMUMS, effective, {}) == {
+        'fs.inotify.max_user_watches': 524288,
+        'fs.inotify.max_user_instances': 1024
+    }
+
+
+def test_sysctl_conf_is_empty_when_high_enough():
+    effective = {key: value * 2 for key, value in MINIMUMS.items()}
+    assert sysctl_conf_values(MINIMUMS, effective, {}) == {}
+
+
+def test_sysctl_conf_keeps_managed_values():
+    # Set by the drop-in, which would be lost on reboot if left out
+    effective = {'fs.inotify.max_user_watches': 524288, 'fs.inotify.max_user_instances': 2048, 'vm.max_map_count': 1048576}
+    managed = {'fs.inotify.max_user_watches': 524288, 'fs.inotify.max_user_instances': 1024}
+    assert sysctl_conf_values(MINIMUMS, effective, managed) == {
+        'fs.inotify.max_user_watches': 524288,
+        'fs.inotify.max_user_instances': 2048
+    }
+
+
+def test_sysctl_conf_unreadable_values():
+    assert sysctl_conf_values(MINIMUMS, {}, {}) == MINIMUMS
+
+
+def test_read_sysctl_conf(tmp_path):
+    conf_path = tmp_path / '60-intellij.conf'
+    assert read_sysctl_conf(conf_path) == {}
+
+    conf_path.write_text('# Ansible managed\n; comment\nvm.max_map_count = 262144\nfs.inotify.max_user_instances=1024\nbroken =\n')
+    assert read_sysctl_conf(conf_path) == {'vm.max_map_count': 262144, 'fs.inotify.max_user_instances': 1024}
+
+
+def test_limits_conf_never_lowers_effective_limits():
+    assert limits_conf_values(65536, {'soft': 1024, 'hard': 4096}) == {'hard': 65536, 'soft': 65536}
+    assert limits_conf_values(65536, {'soft': 1024, 'hard': 524288}) == {'hard': 524288, 'soft': 65536}
+    assert limits_conf_values(65536, {'soft': 100000, 'hard': 524288}) == {'hard': 524288, 'soft': 100000}
+
+
+def test_limits_conf_leaves_out_unlimited():
+    assert limits_conf_values(65536, {'soft': 1024, 'hard': -1}) == {'soft': 65536}
+    assert limits_conf_values(65536, {'soft': -1, 'hard': -1}) == {}
+
+
+def test_limits_conf_unreadable_limits():
+    assert limits_conf_values(65536, {'soft': None, 'hard': None}) == {'hard': 65536, 'soft': 65536}
+
+
+@pytest.mark.parametrize('effective,expected,ok', [
+    (None, 1, False),
+    (-1, 65536, True),
+    (65535, 65536, False),
+    (65536, 65536, True)
+])
+def test_at_least(effective, expected, ok):
+    assert at_least(effective, expected) == ok
+
+
+def test_parse_limit():
+    assert parse_limit('unlimited') == -1
+    assert parse_limit('1024') == 1024
+    assert parse_limit('?') is None
@@ -0,0 +1,113 @@
+import hashlib
+import io
+import pwd
+import stat
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.user_files import apply_user_files
+
+
+def write_archive(path: Path, *contents: bytes) -> None:
+    with tarfile.open(path, 'w:gz') as archive:
+        for content in contents:
+            info = tarfile.TarInfo(hashlib.sha256(content).hexdigest())
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+
+
+def digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+@pytest.fixture
+def user(owner):
+    return {'username': pwd.getpwuid(owner[0]).pw_name, 'group': str(owner[1])}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / 'user-files.tar.gz'
+    write_archive(path, b'key\n', b'org.jetbrains.plugins.gradle\n')
+    return path
+
+
+def test_apply_is_idempotent(tmp_path, archive, user):
+    base_dir = str(tmp_path / 'config')
+    directories = [dict(user, path='', mode='0775'), dict(user, path='options', mode='0775')]
+    files = [
+        dict(user, path='idea.key', content=digest(b'key\n'), force=True, mode='0600'),
+        dict(user, path='disabled_plugins.txt', content=digest(b'org.jetbrains.plugins.gradle\n'), force=False, mode='0664')
+    ]
+
+    changed, paths, _ = apply_user_files(base_dir, archive, directories, files, check_mode=True)
+    assert changed
+    assert len(paths) == 4
+    assert not Path(base_dir).exists()
+
+    changed, paths, _ = apply_user_files(base_dir, archive, directories, files)
+    assert changed
+    assert Path(base_dir, 'idea.key').read_bytes() == b'key\n'
+    assert stat.S_IMODE(Path(base_dir, 'idea.key').stat().st_mode) == 0o600
+    assert stat.S_IMODE(Path(base_dir, 'options').stat().st_mode) == 0o775
+
+    assert apply_user_files(base_dir, archive, directories, files) == (False, [], [])
+
+
+def test_apply_replaces_forced_files_only(tmp_path, archive, user):
+    base_dir = tmp_path / 'config'
+    base_dir.mkdir()
+    (base_dir / 'idea.key').write_bytes(b'old\n')
+    (base_dir / 'disabled_plugins.txt').write_bytes(b'changed by the user\n')
+    files = [
+        dict(user, path='idea.key', content=digest(b'key\n'), force=True, mode='0664'),
+        dict(user, path='disabled_plugins.txt', content=digest(b'org.jetbrains.plugins.gradle\n'), force=False, mode='0664')
+    ]
+
+    changed, paths, _ = apply_user_files(str(base_dir), archive, [], files)
+    assert paths == [str(base_dir / 'idea.key')]
+    assert (base_dir / 'idea.key').read_bytes() == b'key\n'
+    assert (base_dir / 'disabled_plugins.txt').read_bytes() == b'changed by the user\n'
+
+
+def test_apply_fixes_mode(tmp_path, archive, user):
+    base_dir = tmp_path / 'config'
+    base_dir.mkdir()
+    (base_dir / 'idea.key').write_bytes(b'key\n')
+    (base_dir / 'idea.key').chmod(0o644)
+    files = [dict(user, path='idea.key', content=digest(b'key\n'), force=True, mode='0600')]
+
+    changed, _, diff = apply_user_files(str(base_dir), archive, [], files, diff=True)
+    assert changed
+    assert stat.S_IMODE((base_dir / 'idea.key').stat().st_mode) == 0o600
+    assert diff[0]['before']['mode'] == '0644'
+    assert diff[0]['after']['mode'] == '0600'
+
+
+def test_apply_reports_diff(tmp_path, archive, user):
+    base_dir = tmp_path / 'config'
+    files = [dict(user, path='idea.key', content=digest(b'key\n'), force=True, mode='0664')]
+
+    _, _, diff = apply_user_files(str(base_dir), archive, [], files, check_mode=True, diff=True)
+    assert diff == [{'before': '', 'after': 'key\n', 'before_header': str(base_dir / 'idea.key'), 'after_header': str(base_dir / 'idea.key')}]
+
+
+def test_apply_fails_on_missing_content(tmp_path, archive, user):
+    files = [dict(user, path='idea.key', content=digest(b'other\n'), force=True, mode='0664')]
+
+    with pytest.raises(IntellijError, match='missing from archive'):
+        apply_user_files(str(tmp_path), archive, [], files)
+
+
+def test_apply_fails_on_corrupt_archive(tmp_path, user):
+    path = tmp_path / 'user-files.tar.gz'
+    with tarfile.open(path, 'w:gz') as archive:
+        info = tarfile.TarInfo(digest(b'key\n'))
+        info.size = 4
+        archive.addfile(info, io.BytesIO(b'bad\n'))
+
+    with pytest.raises(IntellijError, match='Corrupt content'):
+        apply_user_files(str(tmp_path), path, [], [])
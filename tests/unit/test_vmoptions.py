@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from ansible.module_utils.intellij.vmoptions import merge_vmoptions, shared_archive_options, size_vmoptions, update_vmoptions
+
+
+def test_size_heap_is_a_third_of_memory():
+    options, warnings = size_vmoptions(24576, 8)
+    assert options == ['-Xmx8192m', '-XX:ReservedCodeCacheSize=1024m', '-XX:+UseG1GC', '-XX:ParallelGCThreads=8']
+    assert warnings == []
+
+
+def test_size_heap_is_limited():
+    options, _ = size_vmoptions(262144, 64)
+    assert options[0] == '-Xmx16384m'
+
+    options, _ = size_vmoptions(2048, 1)
+    assert options[0] == '-Xmx1024m'
+
+
+def test_size_heap_is_shared_between_concurrent_users():
+    options, _ = size_vmoptions(24576, 8, concurrent_users=4)
+    assert options == ['-Xmx2048m', '-XX:ReservedCodeCacheSize=512m', '-XX:+UseG1GC', '-XX:ParallelGCThreads=2']
+
+
+def test_size_heap_never_exceeds_each_users_share():
+    options, warnings = size_vmoptions(4096, 8, concurrent_users=8)
+    assert options[0] == '-Xmx512m'
+    assert len(warnings) == 1
+    assert '512 MB of 4096 MB for 8 concurrent users' in warnings[0]
+
+
+def test_size_explicit_heap():
+    options, _ = size_vmoptions(4096, 1, heap_size='6g', reserved_code_cache_size='256m', gc='parallel')
+    assert options == ['-Xmx6g', '-XX:ReservedCodeCacheSize=256m', '-XX:+UseParallelGC', '-XX:ParallelGCThreads=1']
+
+
+def test_size_parallel_gc_threads_only_for_parallel_collectors():
+    for gc in ('zgc', 'shenandoah', 'serial'):
+        options, _ = size_vmoptions(16384, 8, gc=gc)
+        assert not [x for x in options if x.startswith('-XX:ParallelGCThreads')], gc
+
+    options, _ = size_vmoptions(16384, 8, gc='zgc', parallel_gc_threads=3)
+    assert options[-1] == '-XX:ParallelGCThreads=3'
+
+
+def test_merge_replaces_options_that_set_the_same_thing():
+    text = '# comment\n-Xms128m\n-Xmx750m\n-XX:+UseG1GC\n-Dfoo=bar\n-Xmx2g\n'
+    merged = merge_vmoptions(text, ['-Xmx4g', '-XX:+UseZGC', '-XX:ReservedCodeCacheSize=512m'])
+    assert merged == '# comment\n-Xms128m\n-Xmx4g\n-XX:+UseZGC\n-Dfoo=bar\n-XX:ReservedCodeCacheSize=512m\n'
+
+
+def test_shared_archive_options(tmp_path):
+    archive = tmp_path / 'idea.jsa'
+    assert shared_archive_options(archive) == ([], ['-XX:SharedArchiveFile'])
+    assert shared_archive_options(archive, check_mode=True) == ([f'-XX:SharedArchiveFile={archive}'], [])
+    archive.touch()
+    assert shared_archive_options(archive) == ([f'-XX:SharedArchiveFile={archive}'], [])
+    assert shared_archive_options(None) == ([], ['-XX:SharedArchiveFile'])
+
+
+def test_update_vmoptions(tmp_path, owner):
+    vmoptions_path = Path(tmp_path, 'config', 'idea64.vmoptions')
+
+    changed, _ = update_vmoptions(vmoptions_path, ['-Xmx2g'], *owner, check_mode=True)
+    assert changed
+    assert not vmoptions_path.exists()
+
+    changed, diff = update_vmoptions(vmoptions_path, ['-Xmx2g'], *owner)
+    assert changed
+    assert diff == {'before': '', 'after': '-Xmx2g\n'}
+
+    changed, _ = update_vmoptions(vmoptions_path, ['-Xmx2g'], *owner)
+    assert not changed
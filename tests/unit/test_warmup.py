@@ -0,0 +1,98 @@
+import json
+import pwd
+
+import pytest
+
+from ansible.module_utils.intellij import warmup
+from ansible.module_utils.intellij.common import IntellijError
+from ansible.module_utils.intellij.warmup import WARMUP_STAMPS_FILENAME, load_warmup_stamps, run_warmup, warmup_projects
+
+BUILD = '243.26053.27'
+
+
+@pytest.fixture
+def intellij_home(tmp_path):
+    intellij_home = tmp_path / 'idea'
+    (intellij_home / 'bin').mkdir(parents=True)
+    (intellij_home / 'bin' / 'idea.sh').touch()
+    (intellij_home / 'product-info.json').write_text(json.dumps({'buildNumber': BUILD}))
+    return intellij_home
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """Resolves every user's home to a temporary directory."""
+    home = tmp_path / 'home'
+    (home / 'system').mkdir(parents=True)
+    monkeypatch.setattr(warmup, 'user_path', lambda username, path: home / path)
+    return home
+
+
+@pytest.fixture
+def user(owner, home):
+    (home / 'project').mkdir()
+    return {'username': pwd.getpwuid(owner[0]).pw_name, 'intellij_group': str(owner[1]), 'intellij_warmup_projects': ['project', 'missing']}
+
+
+@pytest.fixture
+def warmups(monkeypatch):
+    """Records the projects warmed up, which all succeed."""
+    projects = []
+
+    def fake_run_warmup(intellij_home, username, project_dir, timeout):
+        projects.append(project_dir)
+        status = 'ok' if project_dir.is_dir() else 'missing'
+        return {'username': username, 'project': str(project_dir), 'status': status, 'duration': 0.0}
+
+    monkeypatch.setattr(warmup, 'run_warmup', fake_run_warmup)
+    return projects
+
+
+def test_warmup_projects(intellij_home, home, user, warmups):
+    results = warmup_projects(intellij_home, [user], 'system', 2, 60)
+    assert [x['status'] for x in results] == ['ok', 'missing']
+    assert list(load_warmup_stamps(home / 'system' / WARMUP_STAMPS_FILENAME)) == [str(home / 'project')]
+
+    # Unchanged projects aren't warmed up again by the same build
+    results = warmup_projects(intellij_home, [user], 'system', 2, 60)
+    assert [x['status'] for x in results] == ['up_to_date', 'missing']
+    assert warmups == [home / 'project', home / 'missing', home / 'missing']
+
+
+def test_warmup_projects_again_after_changes(intellij_home, home, user, warmups):
+    warmup_projects(intellij_home, [user], 'system', 2, 60)
+    (home / 'project' / 'build.gradle').touch()
+
+    results = warmup_projects(intellij_home, [user], 'system', 2, 60)
+    assert results[0]['status'] == 'ok'
+
+
+def test_warmup_projects_check_mode(intellij_home, home, user, warmups):
+    results = warmup_projects(intellij_home, [user], 'system', 2, 60, check_mode=True)
+    assert [x['status'] for x in results] == ['pending', 'missing']
+    assert not warmups
+    assert not (home / 'system' / WARMUP_STAMPS_FILENAME).exists()
+
+
+def test_warmup_projects_missing_launcher(tmp_path, user):
+    with pytest.raises(IntellijError, match='File not found'):
+        warmup_projects(tmp_path, [user], 'system', 2, 60)
+
+
+@pytest.mark.parametrize('command,timeout,status', [
+    ('exit 0', 10, 'ok'),
+    ('echo Indexing failed; exit 1', 10, 'failed'),
+    ('sleep 10', 0.5, 'timeout')
+])
+def test_run_warmup(tmp_path, monkeypatch, command, timeout, status):
+    monkeypatch.setattr(warmup, 'warmup_command', lambda intellij_home, username, project_dir: ['sh', '-c', command])
+
+    result = run_warmup(tmp_path, 'bob', tmp_path, timeout)
+    assert result['status'] == status
+    assert result['duration'] < 10
+    if status == 'failed':
+        assert result['output'] == 'Indexing failed\n'
+
+
+def test_run_warmup_missing_project(tmp_path):
+    assert run_warmup(tmp_path, 'bob', tmp_path / 'missing', 10)['status'] == 'missing'